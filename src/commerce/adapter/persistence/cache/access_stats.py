@@ -0,0 +1,148 @@
+"""
+상품 상세/목록 페이지 조회수 집계 (캐시 warm-up 대상 선정용)
+
+- 시간(hour) 단위 버킷으로 집계해서 최근 N 시간 기준 상위 항목을 조회
+- Redis 가 설정돼 있으면 ZSET 에 기록 (워커 프로세스간 합산), 아니면 프로세스 메모리에 기록
+- 요청마다 Redis 를 호출하지 않도록 프로세스 안에서 모았다가 주기적으로 flush
+- 집계는 best-effort. Redis 에러는 로그만 남기고 버림
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+import redis
+
+from common.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+PRODUCTS = "products"
+LISTINGS = "listings"
+_HOUR = 3600
+_BUCKET_TTL = 48 * _HOUR
+
+
+class ListingPage(NamedTuple):
+    product_name: str | None
+    page_size: int
+    page_index: int
+
+
+def _current_hour() -> int:
+    return int(time.time() // _HOUR)
+
+
+class AccessStats:
+    def __init__(
+        self,
+        redis_getter: Callable[[], Any] = get_redis,
+        key_prefix: str = "milly:access",
+        flush_interval: float = 5.0,
+        flush_size: int = 200,
+    ) -> None:
+        self._redis_getter = redis_getter
+        self._key_prefix = key_prefix
+        self._flush_interval = flush_interval
+        self._flush_size = flush_size
+        self._lock = threading.Lock()
+        # (kind, hour) -> member 별 조회수. Redis 사용시엔 flush 전 버퍼, 아니면 저장소
+        self._counts: dict[tuple[str, int], Counter[str]] = {}
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+
+    def record_product(self, product_id: str) -> None:
+        self._record(PRODUCTS, product_id)
+
+    def record_listing(
+        self, product_name: str | None, page_size: int, page_index: int
+    ) -> None:
+        self._record(LISTINGS, json.dumps([product_name, page_size, page_index]))
+
+    def top_products(self, limit: int, hours: int = 24) -> list[str]:
+        return [member for member, _ in self._top(PRODUCTS, limit, hours)]
+
+    def top_listings(self, limit: int, hours: int = 24) -> list[ListingPage]:
+        return [
+            ListingPage(*json.loads(member))
+            for member, _ in self._top(LISTINGS, limit, hours)
+        ]
+
+    def flush(self) -> None:
+        if (client := self._redis_getter()) is None:
+            self._prune()
+            return
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            self._pending = 0
+            self._flushed_at = time.monotonic()
+        if not counts:
+            return
+        pipe = client.pipeline(transaction=False)
+        for (kind, hour), counter in counts.items():
+            key = self._key(kind, hour)
+            for member, count in counter.items():
+                pipe.zincrby(key, count, member)
+            pipe.expire(key, _BUCKET_TTL)
+        try:
+            pipe.execute()
+        except redis.RedisError:
+            logger.warning("access stats flush failed", exc_info=True)
+
+    def clear(self) -> None:
+        """프로세스 메모리의 집계/버퍼 비우기 (Redis 에 기록된 값은 유지)"""
+        with self._lock:
+            self._counts = {}
+            self._pending = 0
+
+    def _prune(self) -> None:
+        """프로세스 메모리에 기록하는 경우 보관 기간이 지난 버킷 삭제"""
+        cutoff = _current_hour() - _BUCKET_TTL // _HOUR
+        with self._lock:
+            for key in [key for key in self._counts if key[1] < cutoff]:
+                del self._counts[key]
+            self._pending = 0
+            self._flushed_at = time.monotonic()
+
+    def _key(self, kind: str, hour: int) -> str:
+        return f"{self._key_prefix}:{kind}:{hour}"
+
+    def _record(self, kind: str, member: str) -> None:
+        with self._lock:
+            self._counts.setdefault((kind, _current_hour()), Counter())[member] += 1
+            self._pending += 1
+            due = (
+                self._pending >= self._flush_size
+                or time.monotonic() - self._flushed_at >= self._flush_interval
+            )
+        if due:
+            self.flush()
+
+    def _top(self, kind: str, limit: int, hours: int) -> list[tuple[str, float]]:
+        self.flush()
+        now = _current_hour()
+        hour_range = range(now - hours + 1, now + 1)
+        if (client := self._redis_getter()) is None:
+            total: Counter[str] = Counter()
+            with self._lock:
+                for hour in hour_range:
+                    total.update(self._counts.get((kind, hour), {}))
+            return [
+                (member, float(count)) for member, count in total.most_common(limit)
+            ]
+
+        keys = [self._key(kind, hour) for hour in hour_range]
+        try:
+            scores = client.zunion(keys, withscores=True)
+        except redis.RedisError:
+            logger.warning("access stats read failed", exc_info=True)
+            return []
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return [(member.decode(), score) for member, score in scores[:limit]]
+
+
+access_stats = AccessStats()
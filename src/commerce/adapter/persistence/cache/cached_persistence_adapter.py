@@ -0,0 +1,291 @@
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import date, datetime
+from hashlib import sha1
+
+from django.conf import settings
+
+from commerce.app.ports.interfaces import IProductPersistenceAdapter
+from commerce.domain.entities import (
+    CuponEntity,
+    ProductDiscountEntity,
+    ProductEntity,
+    ProductStockEventEntity,
+    StockDailyRollupEntity,
+)
+from common.cache import MISSING, InstrumentedCache
+
+DEFAULT_PRODUCT_CACHE = {
+    "DETAIL_TTL": 300,
+    # 목록의 재고 수량은 재고 변경시 무효화하지 않으므로 이 시간만큼 늦게 반영될 수 있음
+    "LISTING_TTL": 30,
+    # TTL(soft) 이 지난 뒤에도 이 시간 동안은 저장된 값을 바로 반환하고 백그라운드에서 갱신
+    # (요청이 없던 키는 TTL + STALE_TTL 만큼 오래된 값이 한 번 반환될 수 있음)
+    "DETAIL_STALE_TTL": 300,
+    "LISTING_STALE_TTL": 60,
+    # 목록 total. 전체 상품 수는 카운터를, 검색어별 수는 백그라운드 집계 결과를 캐시
+    "COUNT_TTL": 60,
+    "COUNT_STALE_TTL": 600,
+    # 만료 직후 동시 miss 는 lock 을 잡은 요청 하나만 DB 를 조회하고 나머지는 최대 이 시간만큼 대기
+    "FILL_LOCK_SECONDS": 2,
+    "FILL_WAIT_SECONDS": 1,
+}
+
+_LISTING_GENERATION_KEY = "products:listing:gen"
+_TOTAL_KEY = "products:count:total"
+
+
+def _detail_key(product_id: str) -> str:
+    return f"products:detail:{product_id}"
+
+
+def _name_hash(product_name: str | None) -> str:
+    # 검색어는 길이/문자 제한이 없으므로 hash 해서 키에 사용
+    return sha1((product_name or "").encode()).hexdigest()[:16]
+
+
+class CachedProductPersistenceAdapter(IProductPersistenceAdapter):
+    """
+    조회가 많은 상품 상세/목록을 캐시하는 영속성 어댑터 (다른 어댑터를 감싸서 사용)
+    - 상세: 할인 변경시 해당 상품 키 삭제
+    - 목록: 상품 생성/할인 변경시 세대 번호를 올려서 전체 무효화
+    - TTL 만료는 stale-while-revalidate (무효화된 키는 stale 값을 반환하지 않고 다시 조회)
+    """
+
+    def __init__(self, inner: IProductPersistenceAdapter) -> None:
+        self._inner = inner
+        config = {**DEFAULT_PRODUCT_CACHE, **getattr(settings, "PRODUCT_CACHE", {})}
+        fill = {
+            "fill_lock_seconds": config["FILL_LOCK_SECONDS"],
+            "fill_wait_seconds": config["FILL_WAIT_SECONDS"],
+        }
+        self._detail_cache = InstrumentedCache("product_detail", **fill)
+        self._listing_cache = InstrumentedCache("product_listing", **fill)
+        self._count_cache = InstrumentedCache("product_count", **fill)
+        self._detail_ttl = config["DETAIL_TTL"]
+        self._listing_ttl = config["LISTING_TTL"]
+        self._detail_stale_ttl = config["DETAIL_STALE_TTL"]
+        self._listing_stale_ttl = config["LISTING_STALE_TTL"]
+        self._count_ttl = config["COUNT_TTL"]
+        self._count_stale_ttl = config["COUNT_STALE_TTL"]
+
+    def create_product(
+        self, product: ProductEntity, stock_event: ProductStockEventEntity
+    ) -> tuple[ProductEntity, ProductStockEventEntity]:
+        result = self._inner.create_product(product, stock_event)
+        self._listing_cache.bump_generation(_LISTING_GENERATION_KEY)
+        self._count_cache.delete(_TOTAL_KEY)
+        return result
+
+    def create_product_stock_event(
+        self, stock_event: ProductStockEventEntity, reservation_ids: Iterable[str] = ()
+    ) -> ProductStockEventEntity:
+        return self._inner.create_product_stock_event(stock_event, reservation_ids)
+
+    def get_applied_reservation_ids(
+        self, product_id: str, reservation_ids: Iterable[str]
+    ) -> set[str]:
+        return self._inner.get_applied_reservation_ids(product_id, reservation_ids)
+
+    def get_last_stock_event(self, product_id: str) -> ProductStockEventEntity | None:
+        return self._inner.get_last_stock_event(product_id)
+
+    def get_last_stock_events(
+        self, product_ids: Iterable[str]
+    ) -> dict[str, ProductStockEventEntity]:
+        return self._inner.get_last_stock_events(product_ids)
+
+    def get_stock_events(
+        self,
+        product_id: str,
+        after_version: int = 0,
+        until_version: int | None = None,
+        limit: int = 100,
+    ) -> list[ProductStockEventEntity]:
+        return self._inner.get_stock_events(
+            product_id, after_version, until_version, limit
+        )
+
+    def find_stock_event_version(
+        self, product_id: str, created_at: datetime, before: bool = False
+    ) -> int | None:
+        return self._inner.find_stock_event_version(product_id, created_at, before)
+
+    def get_stock_event_as_of(
+        self, product_id: str, at: datetime
+    ) -> ProductStockEventEntity | None:
+        return self._inner.get_stock_event_as_of(product_id, at)
+
+    def get_stock_events_after(
+        self, after_id: str, before_id: str, limit: int
+    ) -> list[ProductStockEventEntity]:
+        return self._inner.get_stock_events_after(after_id, before_id, limit)
+
+    def get_checkpoint(self, name: str) -> str:
+        return self._inner.get_checkpoint(name)
+
+    def move_checkpoint(self, name: str, previous: str, position: str) -> None:
+        self._inner.move_checkpoint(name, previous, position)
+
+    def get_stock_event_min_versions(
+        self, after_id: str, before_id: str
+    ) -> dict[str, int]:
+        return self._inner.get_stock_event_min_versions(after_id, before_id)
+
+    def iter_stock_events(
+        self, from_versions: Mapping[str, int], chunk_size: int = 1000
+    ) -> Iterator[ProductStockEventEntity]:
+        return self._inner.iter_stock_events(from_versions, chunk_size)
+
+    def add_stock_daily_rollups(
+        self,
+        rollups: Sequence[StockDailyRollupEntity],
+        checkpoint_name: str,
+        previous: str,
+        position: str,
+    ) -> None:
+        self._inner.add_stock_daily_rollups(
+            rollups, checkpoint_name, previous, position
+        )
+
+    def get_stock_daily_rollups(
+        self, product_id: str, day_from: date, day_to: date
+    ) -> list[StockDailyRollupEntity]:
+        return self._inner.get_stock_daily_rollups(product_id, day_from, day_to)
+
+    def get_top_outbound_rollups(
+        self, day: date, limit: int
+    ) -> list[StockDailyRollupEntity]:
+        return self._inner.get_top_outbound_rollups(day, limit)
+
+    def create_product_discount(
+        self, discount: ProductDiscountEntity, deactivate_others: bool = False
+    ) -> ProductDiscountEntity:
+        result = self._inner.create_product_discount(discount, deactivate_others)
+        self._detail_cache.delete(_detail_key(discount.product_id))
+        self._listing_cache.bump_generation(_LISTING_GENERATION_KEY)
+        return result
+
+    def create_product_discounts(
+        self,
+        discounts: Sequence[ProductDiscountEntity],
+        deactivate_others: bool = False,
+    ) -> list[ProductDiscountEntity]:
+        result = self._inner.create_product_discounts(discounts, deactivate_others)
+        self._invalidate_products(discount.product_id for discount in result)
+        return result
+
+    def create_cupon(self, cupon: CuponEntity) -> CuponEntity:
+        return self._inner.create_cupon(cupon)
+
+    def activate_scheduled_discounts(self, now: datetime, limit: int) -> list[str]:
+        product_ids = self._inner.activate_scheduled_discounts(now, limit)
+        self._invalidate_products(product_ids)
+        return product_ids
+
+    def expire_discounts(self, now: datetime, limit: int) -> list[str]:
+        product_ids = self._inner.expire_discounts(now, limit)
+        self._invalidate_products(product_ids)
+        return product_ids
+
+    # 쿠폰은 캐시하지 않음
+    def activate_scheduled_cupons(self, now: datetime, limit: int) -> list[str]:
+        return self._inner.activate_scheduled_cupons(now, limit)
+
+    def expire_cupons(self, now: datetime, limit: int) -> list[str]:
+        return self._inner.expire_cupons(now, limit)
+
+    def _invalidate_products(self, product_ids: Iterable[str]) -> None:
+        if keys := [_detail_key(product_id) for product_id in set(product_ids)]:
+            self._detail_cache.delete_many(keys)
+            self._listing_cache.bump_generation(_LISTING_GENERATION_KEY)
+
+    def get_products(
+        self,
+        product_name: str | None,
+        page_size: int = 30,
+        page_index: int = 1,
+        peek_next: bool = False,
+    ) -> Iterable[tuple[ProductEntity, Iterable[ProductDiscountEntity], int]]:
+        generation = self._listing_cache.generation(_LISTING_GENERATION_KEY)
+        key = (
+            f"products:listing:{generation}:{_name_hash(product_name)}"
+            f":{page_size}:{page_index}:{int(peek_next)}"
+        )
+        return self._listing_cache.get_or_load(
+            key,
+            lambda: list(
+                self._inner.get_products(product_name, page_size, page_index, peek_next)
+            ),
+            self._listing_ttl,
+            self._listing_stale_ttl,
+        )
+
+    def count_products(self, product_name: str | None) -> int:
+        return self._inner.count_products(product_name)
+
+    def estimate_product_count(self, product_name: str | None) -> int | None:
+        if not product_name:
+            # 카운터 조회 (PK 1건) 결과를 캐시, 상품 생성시 삭제
+            return self._count_cache.get_or_load(
+                _TOTAL_KEY,
+                lambda: self._inner.estimate_product_count(None),
+                self._count_ttl,
+            )
+        # 검색어별 COUNT(*) 는 요청에서 실행하지 않고 백그라운드에서 집계 (그 전까지는 None)
+        # 상품 생성시 무효화하지 않으므로 COUNT_TTL + COUNT_STALE_TTL 만큼 늦게 반영될 수 있음
+        count = self._count_cache.get_or_load_later(
+            f"products:count:{_name_hash(product_name)}",
+            lambda: self._inner.count_products(product_name),
+            self._count_ttl,
+            self._count_stale_ttl,
+        )
+        return None if count is MISSING else count
+
+    def sync_product_count(self) -> int:
+        total = self._inner.sync_product_count()
+        self._count_cache.delete(_TOTAL_KEY)
+        return total
+
+    def get_product_ids(
+        self, product_name: str | None, chunk_size: int = 1000
+    ) -> Iterable[list[str]]:
+        return self._inner.get_product_ids(product_name, chunk_size)
+
+    def get_product(
+        self, product_id: str
+    ) -> tuple[ProductEntity, Iterable[ProductDiscountEntity]]:
+        return self._detail_cache.get_or_load(
+            _detail_key(product_id),
+            lambda: self._load_product(product_id),
+            self._detail_ttl,
+            self._detail_stale_ttl,
+        )
+
+    def _load_product(
+        self, product_id: str
+    ) -> tuple[ProductEntity, list[ProductDiscountEntity]]:
+        product, discounts = self._inner.get_product(product_id)
+        return product, list(discounts)
+
+    def get_products_by_ids(
+        self, product_ids: Iterable[str]
+    ) -> dict[str, tuple[ProductEntity, list[ProductDiscountEntity]]]:
+        # 상세 캐시를 같이 사용. 캐시에 없는 상품만 한 번에 조회
+        keys = {_detail_key(product_id): product_id for product_id in product_ids}
+        cached = self._detail_cache.get_many(list(keys))
+        result = {keys[key]: value for key, value in cached.items()}
+        if missing := [pid for pid in keys.values() if pid not in result]:
+            loaded = self._inner.get_products_by_ids(missing)
+            self._detail_cache.set_many(
+                {_detail_key(pid): value for pid, value in loaded.items()},
+                self._detail_ttl,
+                self._detail_stale_ttl,
+            )
+            result.update(loaded)
+        return result
+
+    def get_cupons(self, user_id: str) -> Iterable[CuponEntity]:
+        return self._inner.get_cupons(user_id)
+
+    def is_user_exist(self, user_id: str) -> bool:
+        return self._inner.is_user_exist(user_id)
@@ -0,0 +1,138 @@
+"""
+배포/Redis failover 직후 상품 캐시 warm-up
+
+- 대상: 최근 조회수 상위 상품/목록 페이지 (access_stats) 또는 직접 지정한 목록
+- get_product_detail_view / ProductsView.get 과 같은 유스케이스 + 어댑터 구성으로 조회해서 캐시를 채움
+- 배치 단위로 워커 스레드에 나눠서 실행하고, DB 부하를 막기 위해 초당 조회 수를 제한
+"""
+
+import logging
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from django.db import connections
+
+from commerce.adapter.persistence.cache.access_stats import ListingPage
+from commerce.adapter.persistence.cache.cached_persistence_adapter import (
+    CachedProductPersistenceAdapter,
+)
+from commerce.adapter.persistence.django_orm.django_orm_persistence_adpater import (
+    DjangoORMPersistenceAdapter,
+)
+from commerce.app.services import CalcProductDiscountService
+from commerce.app.usecases import (
+    GetProductsUsecase,
+    GetProductWithCuponDiscountUsecase,
+)
+from common.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# 익명 사용자로 조회 (상품 캐시는 사용자와 무관)
+_WARMUP_USER_ID = "anonymous"
+
+type Target = str | ListingPage
+
+
+@dataclass
+class WarmupReport:
+    total: int
+    warmed: int = 0
+    failed: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def done(self) -> int:
+        return self.warmed + len(self.failed)
+
+
+def _warm_product(product_id: str) -> None:
+    usecase = GetProductWithCuponDiscountUsecase(
+        product_persistence_adapter=CachedProductPersistenceAdapter(
+            DjangoORMPersistenceAdapter()
+        ),
+        calc_product_discount_service=CalcProductDiscountService(),
+    )
+    usecase.execute(user_id=_WARMUP_USER_ID, product_id=product_id)
+
+
+def _warm_listing(page: ListingPage) -> None:
+    usecase = GetProductsUsecase(
+        product_persistence_adapter=CachedProductPersistenceAdapter(
+            DjangoORMPersistenceAdapter()
+        ),
+        calc_product_discount_service=CalcProductDiscountService(),
+    )
+    list(
+        usecase.execute(
+            product_name=page.product_name,
+            page_size=page.page_size,
+            page_index=page.page_index,
+        )
+    )
+
+
+def _warm_batch(
+    batch: list[Target], bucket: TokenBucket | None
+) -> tuple[int, list[str]]:
+    warmed, failed = 0, []
+    for target in batch:
+        if bucket is not None:
+            bucket.wait()
+        try:
+            if isinstance(target, ListingPage):
+                _warm_listing(target)
+            else:
+                _warm_product(target)
+            warmed += 1
+        except Exception:
+            logger.warning("cache warm-up failed", extra={"target": str(target)})
+            failed.append(str(target))
+    return warmed, failed
+
+
+def _warm_batch_in_worker(
+    batch: list[Target], bucket: TokenBucket | None
+) -> tuple[int, list[str]]:
+    try:
+        return _warm_batch(batch, bucket)
+    finally:
+        # 워커 스레드가 연 DB 커넥션 정리
+        connections.close_all()
+
+
+def warm_cache(
+    targets: Iterable[Target],
+    workers: int = 4,
+    rate: float = 50.0,
+    batch_size: int = 20,
+    on_progress: Callable[[WarmupReport], None] | None = None,
+) -> WarmupReport:
+    """rate: 초당 최대 조회 수 (0 이면 제한 없음). workers 가 1 이면 현재 스레드에서 실행"""
+    targets = list(targets)
+    report = WarmupReport(total=len(targets))
+    bucket = TokenBucket(rate=rate, burst=max(1, workers)) if rate > 0 else None
+    batches = [targets[i : i + batch_size] for i in range(0, len(targets), batch_size)]
+    started = time.perf_counter()
+
+    def _collect(warmed: int, failed: list[str]) -> None:
+        report.warmed += warmed
+        report.failed.extend(failed)
+        report.elapsed = time.perf_counter() - started
+        if on_progress is not None:
+            on_progress(report)
+
+    if workers <= 1:
+        for batch in batches:
+            _collect(*_warm_batch(batch, bucket))
+        return report
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_warm_batch_in_worker, batch, bucket) for batch in batches
+        ]
+        for future in as_completed(futures):
+            _collect(*future.result())
+    return report
@@ -1,24 +1,57 @@
-from collections.abc import Iterable
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import date, datetime
+from functools import partial
+from itertools import takewhile
+from typing import Any
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError, transaction
+from django.db.models import F, Min, OuterRef, Prefetch, Q, QuerySet, Subquery
+from django.utils import timezone
 
 from commerce.adapter.persistence.django_orm.models import (
+    AppliedStockReservation,
     Cupons,
+    JobCheckpoint,
     Product,
+    ProductCounter,
     ProductDiscount,
     ProductStockEvents,
+    StockDailyRollup,
 )
+from commerce.adapter.stream.stock_broker import StockUpdate, stock_broker
 from commerce.app.ports.interfaces import IProductPersistenceAdapter
 from commerce.domain.entities import (
     CuponEntity,
     ProductDiscountEntity,
     ProductEntity,
     ProductStockEventEntity,
+    StockDailyRollupEntity,
 )
-from common.exceptions import DBOptimisticLockError
+from common.exceptions import DBOptimisticLockError, Duplicated
+from common.instrumentation import instrument_adapter
 
+DEFAULT_STOCK_HISTORY = {
+    # 이력 조회에 사용할 DB alias (읽기 replica 가 있으면 지정해서 쓰기 DB 부하와 분리)
+    "DB_ALIAS": "default",
+    "PAGE_SIZE": 100,
+    "MAX_PAGE_SIZE": 1_000,
+    # 스트리밍 응답에서 한 번에 조회하는 이벤트 수
+    "STREAM_CHUNK_SIZE": 1_000,
+}
 
+
+# as-of 조회에서 version 으로 확인할 때 한 번에 읽는 다음 이벤트 수
+_AS_OF_STEP = 10
+
+
+def stock_history_settings() -> dict[str, Any]:
+    return {**DEFAULT_STOCK_HISTORY, **getattr(settings, "STOCK_HISTORY", {})}
+
+
+@instrument_adapter
 class DjangoORMPersistenceAdapter(IProductPersistenceAdapter):
     @transaction.atomic
     def create_product(self, product_entity, stock_event):
@@ -26,23 +59,61 @@ class DjangoORMPersistenceAdapter(IProductPersistenceAdapter):
         orm_product.save()
         orm_stock_event = ProductStockEvents.from_domain(stock_event)
         orm_stock_event.save()
+        ProductCounter.objects.filter(name=ProductCounter.PRODUCTS).update(
+            value=F("value") + 1
+        )
         return Product.to_domain(orm_product), ProductStockEvents.to_domain(
             orm_stock_event
         )
 
     def create_product_stock_event(
-        self, stock_event: ProductStockEventEntity
+        self, stock_event: ProductStockEventEntity, reservation_ids: Iterable[str] = ()
     ) -> ProductStockEventEntity:
         try:
             with transaction.atomic():
                 orm_stock_event = ProductStockEvents.from_domain(stock_event)
                 orm_stock_event.save()
-                return ProductStockEvents.to_domain(orm_stock_event)
+                self._mark_reservations_applied(orm_stock_event, reservation_ids)
+                created = ProductStockEvents.to_domain(orm_stock_event)
+                # 커밋된 재고 변경만 실시간 구독자(SSE)에게 전달
+                transaction.on_commit(
+                    partial(stock_broker.publish, StockUpdate.from_event(created))
+                )
+                return created
         except IntegrityError as e:
             if "unique constraint" in str(e).lower():
                 raise DBOptimisticLockError
             raise
 
+    @staticmethod
+    def _mark_reservations_applied(
+        orm_stock_event: ProductStockEvents, reservation_ids: Iterable[str]
+    ) -> None:
+        if not (reservation_ids := list(reservation_ids)):
+            return
+        try:
+            # 이벤트 저장과 같은 트랜잭션. 다른 reconcile 이 먼저 반영한 예약이면 이벤트까지 롤백
+            with transaction.atomic():
+                AppliedStockReservation.objects.bulk_create(
+                    AppliedStockReservation(
+                        reservation_id=reservation_id,
+                        product_id=orm_stock_event.product_id,  # type: ignore[attr-defined]
+                        stock_event=orm_stock_event,
+                    )
+                    for reservation_id in reservation_ids
+                )
+        except IntegrityError as e:
+            raise Duplicated("stock reservation already applied") from e
+
+    def get_applied_reservation_ids(
+        self, product_id: str, reservation_ids: Iterable[str]
+    ) -> set[str]:
+        return set(
+            AppliedStockReservation.objects.filter(
+                product_id=product_id, reservation_id__in=list(reservation_ids)
+            ).values_list("reservation_id", flat=True)
+        )
+
     def get_last_stock_event(self, product_id: str) -> ProductStockEventEntity | None:
         orm_stock_event = (
             ProductStockEvents.objects.filter(product_id=product_id)
@@ -53,6 +124,224 @@ class DjangoORMPersistenceAdapter(IProductPersistenceAdapter):
             return None
         return ProductStockEvents.to_domain(orm_stock_event)
 
+    def get_last_stock_events(
+        self, product_ids: Iterable[str]
+    ) -> dict[str, ProductStockEventEntity]:
+        latest = (
+            ProductStockEvents.objects.filter(product_id=OuterRef("pk"))
+            .order_by("-version")
+            .values("pk")[:1]
+        )
+        latest_ids = (
+            Product.objects.filter(id__in=list(product_ids))
+            .annotate(latest_id=Subquery(latest))
+            .values("latest_id")
+        )
+        return {
+            orm_stock_event.product_id: ProductStockEvents.to_domain(orm_stock_event)  # type: ignore[attr-defined]
+            for orm_stock_event in ProductStockEvents.objects.filter(pk__in=latest_ids)
+        }
+
+    def get_stock_events(
+        self,
+        product_id: str,
+        after_version: int = 0,
+        until_version: int | None = None,
+        limit: int = 100,
+    ) -> list[ProductStockEventEntity]:
+        # (product, version) unique 인덱스로 마지막 version 이후부터 조회 (OFFSET 없음)
+        query = ProductStockEvents.objects.using(
+            stock_history_settings()["DB_ALIAS"]
+        ).filter(product_id=product_id, version__gt=after_version)
+        if until_version is not None:
+            query = query.filter(version__lte=until_version)
+        return [
+            ProductStockEvents.to_domain(orm_stock_event)
+            for orm_stock_event in query.order_by("version")[:limit]
+        ]
+
+    def find_stock_event_version(
+        self, product_id: str, created_at: datetime, before: bool = False
+    ) -> int | None:
+        # (product, created_at, version) 인덱스 seek 1번
+        query = ProductStockEvents.objects.using(
+            stock_history_settings()["DB_ALIAS"]
+        ).filter(product_id=product_id)
+        if before:
+            query = query.filter(created_at__lt=created_at).order_by(
+                "-created_at", "-version"
+            )
+        else:
+            query = query.filter(created_at__gte=created_at).order_by(
+                "created_at", "version"
+            )
+        return query.values_list("version", flat=True).first()
+
+    def get_stock_event_as_of(
+        self, product_id: str, at: datetime
+    ) -> ProductStockEventEntity | None:
+        alias = stock_history_settings()["DB_ALIAS"]
+        events = ProductStockEvents.objects.using(alias).filter(product_id=product_id)
+        # 1. (product, created_at, version) 인덱스로 at 이전 마지막 이벤트 seek
+        candidate = (
+            events.filter(created_at__lte=at)
+            .order_by("-created_at", "-version")
+            .first()
+        )
+        # 2. 전날까지의 일별 집계를 checkpoint 로 사용 (그 마감 version 까지는 at 이전에 생성됨)
+        checkpoint = (
+            StockDailyRollup.objects.using(alias)
+            .filter(product_id=product_id, day__lt=timezone.localtime(at).date())
+            .order_by("-day")
+            .values_list("last_version", flat=True)
+            .first()
+        )
+        if checkpoint and (candidate is None or candidate.version < checkpoint):
+            candidate = events.filter(version=checkpoint).first() or candidate
+        if candidate is None:
+            return None
+        # 3. version 으로 확인: 서버 시계 차이로 생성 시각이 앞선 다음 version 이 있으면 그 이벤트까지 이동
+        while following := list(
+            events.filter(version__gt=candidate.version).order_by("version")[
+                :_AS_OF_STEP
+            ]
+        ):
+            created_before = list(takewhile(lambda e: e.created_at <= at, following))
+            if created_before:
+                candidate = created_before[-1]
+            if len(created_before) < len(following):
+                break
+        return ProductStockEvents.to_domain(candidate)
+
+    def get_stock_events_after(
+        self, after_id: str, before_id: str, limit: int
+    ) -> list[ProductStockEventEntity]:
+        # PK 범위 조회 (쓰기 직후의 이벤트도 놓치지 않도록 replica 가 아닌 기본 DB 사용)
+        return [
+            ProductStockEvents.to_domain(orm_stock_event)
+            for orm_stock_event in ProductStockEvents.objects.filter(
+                id__gt=after_id, id__lt=before_id
+            ).order_by("id")[:limit]
+        ]
+
+    def get_checkpoint(self, name: str) -> str:
+        checkpoint = JobCheckpoint.objects.filter(name=name).first()
+        return checkpoint.position if checkpoint else ""
+
+    def move_checkpoint(self, name: str, previous: str, position: str) -> None:
+        JobCheckpoint.objects.get_or_create(name=name)
+        if not JobCheckpoint.objects.filter(name=name, position=previous).update(
+            position=position
+        ):
+            raise DBOptimisticLockError
+
+    def get_stock_event_min_versions(
+        self, after_id: str, before_id: str
+    ) -> dict[str, int]:
+        # PK 범위만 읽고 상품별로 묶음 (검증 조회는 이력 조회와 같은 DB 사용)
+        return dict(
+            ProductStockEvents.objects.using(stock_history_settings()["DB_ALIAS"])
+            .filter(id__gt=after_id, id__lt=before_id)
+            .values("product_id")
+            .annotate(min_version=Min("version"))
+            .values_list("product_id", "min_version")
+        )
+
+    def iter_stock_events(
+        self, from_versions: Mapping[str, int], chunk_size: int = 1000
+    ) -> Iterator[ProductStockEventEntity]:
+        if not from_versions:
+            return
+        # 시작 version 이 같은 상품끼리 묶어서 조건 수를 줄임
+        products_by_version: dict[int, list[str]] = defaultdict(list)
+        for product_id, version in from_versions.items():
+            products_by_version[version].append(product_id)
+        starts = Q()
+        for version, product_ids in products_by_version.items():
+            starts |= Q(product_id__in=product_ids, version__gte=version)
+        query = (
+            ProductStockEvents.objects.using(stock_history_settings()["DB_ALIAS"])
+            .filter(starts)
+            .order_by("product_id", "version")
+        )
+        # MySQL 드라이버는 iterator() 결과도 한 번에 메모리로 읽으므로
+        # (product, version) unique 인덱스 위에서 keyset 으로 chunk_size 개씩 읽음
+        last: ProductStockEvents | None = None
+        while True:
+            page = query
+            if last is not None:
+                page = query.filter(
+                    Q(product_id__gt=last.product_id)  # type: ignore[attr-defined]
+                    | Q(
+                        product_id=last.product_id,  # type: ignore[attr-defined]
+                        version__gt=last.version,
+                    )
+                )
+            orm_events = list(page[:chunk_size])
+            yield from map(ProductStockEvents.to_domain, orm_events)
+            if len(orm_events) < chunk_size:
+                return
+            last = orm_events[-1]
+
+    @transaction.atomic
+    def add_stock_daily_rollups(
+        self,
+        rollups: Sequence[StockDailyRollupEntity],
+        checkpoint_name: str,
+        previous: str,
+        position: str,
+    ) -> None:
+        # checkpoint 를 먼저 옮겨서 다른 작업이 같은 구간을 동시에 더하지 않도록 (행 잠금)
+        JobCheckpoint.objects.get_or_create(name=checkpoint_name)
+        if not JobCheckpoint.objects.filter(
+            name=checkpoint_name, position=previous
+        ).update(position=position):
+            raise DBOptimisticLockError
+
+        existing = {
+            (row.product_id, row.day): row  # type: ignore[attr-defined]
+            for row in StockDailyRollup.objects.filter(
+                product_id__in={r.product_id for r in rollups},
+                day__in={r.day for r in rollups},
+            )
+        }
+        created, updated = [], []
+        for rollup in rollups:
+            if (row := existing.get((rollup.product_id, rollup.day))) is None:
+                created.append(StockDailyRollup.from_domain(rollup))
+                continue
+            merged = StockDailyRollup.to_domain(row)
+            merged.merge(rollup)
+            merged_row = StockDailyRollup.from_domain(merged)
+            merged_row.pk = row.pk
+            updated.append(merged_row)
+        StockDailyRollup.objects.bulk_create(created)
+        StockDailyRollup.objects.bulk_update(
+            updated,
+            ["inbound", "outbound", "closing_total", "event_count", "last_version"],
+        )
+
+    def get_stock_daily_rollups(
+        self, product_id: str, day_from: date, day_to: date
+    ) -> list[StockDailyRollupEntity]:
+        return [
+            StockDailyRollup.to_domain(row)
+            for row in StockDailyRollup.objects.filter(
+                product_id=product_id, day__gte=day_from, day__lte=day_to
+            ).order_by("day")
+        ]
+
+    def get_top_outbound_rollups(
+        self, day: date, limit: int
+    ) -> list[StockDailyRollupEntity]:
+        # (day, outbound) 인덱스를 역순으로 읽고 limit 에서 멈춤
+        return [
+            StockDailyRollup.to_domain(row)
+            for row in StockDailyRollup.objects.filter(day=day).order_by("-outbound")[
+                :limit
+            ]
+        ]
+
     @transaction.atomic
     def create_product_discount(
         self, discount: ProductDiscountEntity, deactivate_others: bool = False
@@ -67,36 +356,176 @@ class DjangoORMPersistenceAdapter(IProductPersistenceAdapter):
         orm_discount.save()
         return ProductDiscount.to_domain(orm_discount)
 
+    @transaction.atomic
+    def create_product_discounts(
+        self,
+        discounts: Sequence[ProductDiscountEntity],
+        deactivate_others: bool = False,
+    ) -> list[ProductDiscountEntity]:
+        # 상품별 update + insert 대신 묶음 단위로 UPDATE 1번 + bulk INSERT 1번
+        product_ids = set(
+            Product.objects.filter(
+                id__in={discount.product_id for discount in discounts}
+            ).values_list("id", flat=True)
+        )
+        discounts = [d for d in discounts if d.product_id in product_ids]
+        if deactivate_others:
+            ProductDiscount.objects.filter(
+                product_id__in=product_ids,
+                active=True,
+            ).update(active=False)
+
+        ProductDiscount.objects.bulk_create(
+            [ProductDiscount.from_domain(discount) for discount in discounts]
+        )
+        return discounts
+
     def create_cupon(self, cupon: CuponEntity) -> CuponEntity:
         orm_cupon = Cupons.from_domain(cupon)
         orm_cupon.save()
         return Cupons.to_domain(orm_cupon)
 
+    @transaction.atomic
+    def activate_scheduled_discounts(self, now: datetime, limit: int) -> list[str]:
+        due = list(
+            ProductDiscount.objects.select_for_update(skip_locked=True)
+            .filter(scheduled=True, start_date__lte=now)
+            .order_by("start_date")
+            .values_list("id", "product_id", "end_date")[:limit]
+        )
+        # 상품별로 시작 시각이 가장 늦은 할인 하나만 활성화하고 기존 할인은 비활성화
+        # (이미 기간이 끝난 할인은 활성화하지 않음)
+        latest = {product_id: pk for pk, product_id, end_date in due if end_date > now}
+        ProductDiscount.objects.filter(product_id__in=latest, active=True).update(
+            active=False
+        )
+        ProductDiscount.objects.filter(pk__in=latest.values()).update(
+            active=True, scheduled=False
+        )
+        ProductDiscount.objects.filter(pk__in=[pk for pk, _, _ in due]).update(
+            scheduled=False
+        )
+        return [product_id for _, product_id, _ in due]
+
+    def expire_discounts(self, now: datetime, limit: int) -> list[str]:
+        return self._flip_due(
+            ProductDiscount.objects.filter(active=True, end_date__lte=now),
+            "product_id",
+            limit,
+            active=False,
+        )
+
+    @transaction.atomic
+    def activate_scheduled_cupons(self, now: datetime, limit: int) -> list[str]:
+        due = list(
+            Cupons.objects.select_for_update(skip_locked=True)
+            .filter(scheduled=True, valid_from__lte=now)
+            .values_list("id", "user_id", "valid_to")[:limit]
+        )
+        Cupons.objects.filter(
+            pk__in=[pk for pk, _, valid_to in due if valid_to > now]
+        ).update(active=True)
+        Cupons.objects.filter(pk__in=[pk for pk, _, _ in due]).update(scheduled=False)
+        return [str(user_id) for _, user_id, _ in due]
+
+    def expire_cupons(self, now: datetime, limit: int) -> list[str]:
+        return [
+            str(user_id)
+            for user_id in self._flip_due(
+                Cupons.objects.filter(active=True, valid_to__lte=now),
+                "user_id",
+                limit,
+                active=False,
+            )
+        ]
+
+    @transaction.atomic
+    def _flip_due(
+        self, query: QuerySet[Any], owner_field: str, limit: int, **updates: Any
+    ) -> list[Any]:
+        # 다른 스케줄러 인스턴스가 잡고 있는 행은 건너뜀
+        due = list(
+            query.select_for_update(skip_locked=True).values_list("id", owner_field)[
+                :limit
+            ]
+        )
+        query.model.objects.filter(pk__in=[pk for pk, _ in due]).update(**updates)
+        return [owner for _, owner in due]
+
     def get_products(
-        self, product_name: str | None, page_size: int = 30, cur_page: int = 1
+        self,
+        product_name: str | None,
+        page_size: int = 30,
+        cur_page: int = 1,
+        peek_next: bool = False,
     ) -> Iterable[
         tuple[ProductEntity, Iterable[ProductDiscountEntity], int]
     ]:  # product, product_discounts, stock_count
-        query = Product.objects.all()
+        # 상품별 할인/재고 조회로 N+1 이 생기지 않도록 할인은 prefetch, 재고는 서브쿼리로 함께 조회
+        latest_stock = (
+            ProductStockEvents.objects.filter(product_id=OuterRef("pk"))
+            .order_by("-version")
+            .values("total_after_change")[:1]
+        )
+        query = Product.objects.annotate(
+            stock_count=Subquery(latest_stock)
+        ).prefetch_related(
+            Prefetch(
+                "discounts",
+                queryset=ProductDiscount.objects.filter(active=True),
+                to_attr="active_discounts",
+            )
+        )
         if product_name:
             query = query.filter(name__icontains=product_name)
-        products = query[(cur_page - 1) * page_size : cur_page * page_size]
+        # peek_next 면 다음 페이지가 있는지 확인하기 위해 1개 더 조회
+        products = query[
+            (cur_page - 1) * page_size : cur_page * page_size + int(peek_next)
+        ]
 
         for orm_product in products:
             product_entity = Product.to_domain(orm_product)
             discounts = [
                 ProductDiscount.to_domain(discount)
-                for discount in ProductDiscount.objects.filter(
-                    product_id=orm_product.id, active=True
-                )
+                for discount in orm_product.active_discounts
             ]
-            stock_count = (
-                ProductStockEvents.objects.filter(product_id=orm_product.id)
-                .order_by("-version")
-                .first()
-            )
-            total_stock = stock_count.total_after_change if stock_count else 0
-            yield (product_entity, discounts, total_stock)
+            yield (product_entity, discounts, orm_product.stock_count or 0)
+
+    def count_products(self, product_name: str | None) -> int:
+        query = Product.objects.all()
+        if product_name:
+            query = query.filter(name__icontains=product_name)
+        return query.count()
+
+    def estimate_product_count(self, product_name: str | None) -> int | None:
+        # 검색어별 수는 카운터가 없으므로 모름 (캐시 어댑터가 백그라운드에서 집계)
+        if product_name:
+            return None
+        counter = ProductCounter.objects.filter(name=ProductCounter.PRODUCTS).first()
+        return counter.value if counter else None
+
+    def sync_product_count(self) -> int:
+        total = Product.objects.count()
+        ProductCounter.objects.update_or_create(
+            name=ProductCounter.PRODUCTS, defaults={"value": total}
+        )
+        return total
+
+    def get_product_ids(
+        self, product_name: str | None, chunk_size: int = 1000
+    ) -> Iterable[list[str]]:
+        # OFFSET 대신 마지막 id 이후부터 조회 (keyset)
+        query = Product.objects.order_by("id")
+        if product_name:
+            query = query.filter(name__icontains=product_name)
+        last_id = None
+        while True:
+            page = query.filter(id__gt=last_id) if last_id else query
+            ids = list(page.values_list("id", flat=True)[:chunk_size])
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
 
     def get_product(
         self, product_id: str
@@ -111,6 +540,28 @@ class DjangoORMPersistenceAdapter(IProductPersistenceAdapter):
         ]
         return product_entity, discounts
 
+    def get_products_by_ids(
+        self, product_ids: Iterable[str]
+    ) -> dict[str, tuple[ProductEntity, list[ProductDiscountEntity]]]:
+        # 상품 1번 + 활성 할인 prefetch 1번
+        products = Product.objects.filter(id__in=list(product_ids)).prefetch_related(
+            Prefetch(
+                "discounts",
+                queryset=ProductDiscount.objects.filter(active=True),
+                to_attr="active_discounts",
+            )
+        )
+        return {
+            orm_product.id: (
+                Product.to_domain(orm_product),
+                [
+                    ProductDiscount.to_domain(discount)
+                    for discount in orm_product.active_discounts
+                ],
+            )
+            for orm_product in products
+        }
+
     def get_cupons(self, user_id: str) -> Iterable[CuponEntity]:
         orm_cupons = Cupons.objects.filter(user_id=user_id, active=True)
         for orm_cupon in orm_cupons:
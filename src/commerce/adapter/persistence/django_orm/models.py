@@ -6,6 +6,7 @@ from commerce.domain.entities import (
     ProductDiscountEntity,
     ProductEntity,
     ProductStockEventEntity,
+    StockDailyRollupEntity,
 )
 
 
@@ -40,6 +41,18 @@ class Product(models.Model):
         )
 
 
+class ProductCounter(models.Model):
+    """
+    COUNT(*) 없이 상품 수를 조회하기 위한 카운터 (상품 생성과 같은 트랜잭션에서 증가)
+    어댑터를 거치지 않고 추가/삭제한 경우 sync_product_counters 명령으로 다시 맞춤
+    """
+
+    PRODUCTS = "products"
+
+    name = models.CharField(primary_key=True, max_length=32)
+    value = models.BigIntegerField(default=0)
+
+
 class ProductStockEvents(models.Model):
     id = models.CharField(primary_key=True, max_length=18)
     product = models.ForeignKey(
@@ -54,6 +67,10 @@ class ProductStockEvents(models.Model):
 
     class Meta:
         unique_together = ("product", "version")
+        indexes = [
+            # 재고 이력의 시간 범위를 version 범위로 바꿀 때 시각으로 seek (version 까지 인덱스에서 읽음)
+            models.Index(fields=["product", "created_at", "version"]),
+        ]
 
     @classmethod
     def from_domain(cls, stock_event: ProductStockEventEntity) -> "ProductStockEvents":
@@ -70,7 +87,7 @@ class ProductStockEvents(models.Model):
     def to_domain(cls, orm_stock_event: "ProductStockEvents"):
         return ProductStockEventEntity(
             id=orm_stock_event.id,
-            product_id=orm_stock_event.product.id,
+            product_id=orm_stock_event.product_id,  # type: ignore[attr-defined]
             change=orm_stock_event.change,
             total_after_change=orm_stock_event.total_after_change,
             created_at=orm_stock_event.created_at,
@@ -78,6 +95,81 @@ class ProductStockEvents(models.Model):
         )
 
 
+class AppliedStockReservation(models.Model):
+    """재고 이벤트로 반영된 확정 예약 (reconcile 을 다시 실행해도 같은 예약을 두 번 차감하지 않도록)"""
+
+    reservation_id = models.CharField(max_length=64)
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        related_name="applied_stock_reservations",
+    )
+    stock_event = models.ForeignKey(
+        ProductStockEvents,
+        on_delete=models.DO_NOTHING,
+        related_name="applied_stock_reservations",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("product", "reservation_id")
+
+
+class StockDailyRollup(models.Model):
+    """상품별 하루 재고 집계 (rollup_stock_events 명령이 재고 이벤트를 증분으로 더함)"""
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        related_name="stock_daily_rollups",
+    )
+    day = models.DateField()
+    inbound = models.BigIntegerField(default=0)
+    outbound = models.BigIntegerField(default=0)
+    closing_total = models.IntegerField(default=0)
+    event_count = models.IntegerField(default=0)
+    last_version = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("product", "day")
+        indexes = [
+            # 날짜별 판매량(outbound) 상위 상품 조회
+            models.Index(fields=["day", "outbound"]),
+        ]
+
+    @classmethod
+    def from_domain(cls, rollup: StockDailyRollupEntity) -> "StockDailyRollup":
+        return cls(
+            product=Product(id=rollup.product_id),
+            day=rollup.day,
+            inbound=rollup.inbound,
+            outbound=rollup.outbound,
+            closing_total=rollup.closing_total,
+            event_count=rollup.event_count,
+            last_version=rollup.last_version,
+        )
+
+    @classmethod
+    def to_domain(cls, orm_rollup: "StockDailyRollup") -> StockDailyRollupEntity:
+        return StockDailyRollupEntity(
+            product_id=orm_rollup.product_id,  # type: ignore[attr-defined]
+            day=orm_rollup.day,
+            inbound=orm_rollup.inbound,
+            outbound=orm_rollup.outbound,
+            closing_total=orm_rollup.closing_total,
+            event_count=orm_rollup.event_count,
+            last_version=orm_rollup.last_version,
+        )
+
+
+class JobCheckpoint(models.Model):
+    """증분 배치 작업이 어디까지 처리했는지 (작업 이름 -> 마지막으로 처리한 위치)"""
+
+    name = models.CharField(primary_key=True, max_length=64)
+    position = models.CharField(max_length=64, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+
 class ProductDiscount(models.Model):
     id = models.CharField(primary_key=True, max_length=18)
     product = models.ForeignKey(
@@ -89,6 +181,16 @@ class ProductDiscount(models.Model):
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     active = models.BooleanField(default=True)
+    scheduled = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # 스케줄러가 만료/시작 시각이 지난 행만 범위 조회
+            models.Index(fields=["active", "end_date"]),
+            models.Index(fields=["scheduled", "start_date"]),
+            # 상품 조회시 상품별 활성 할인만 조회
+            models.Index(fields=["product", "active"]),
+        ]
 
     @classmethod
     def from_domain(cls, discount: ProductDiscountEntity) -> "ProductDiscount":
@@ -99,17 +201,19 @@ class ProductDiscount(models.Model):
             start_date=discount.start_date,
             end_date=discount.end_date,
             active=discount.active,
+            scheduled=discount.scheduled,
         )
 
     @classmethod
     def to_domain(cls, orm_discount: "ProductDiscount"):
         return ProductDiscountEntity(
             id=orm_discount.id,
-            product_id=orm_discount.product.id,
+            product_id=orm_discount.product_id,  # type: ignore[attr-defined]
             percentage=float(orm_discount.percentage),
             start_date=orm_discount.start_date,
             end_date=orm_discount.end_date,
             active=orm_discount.active,
+            scheduled=orm_discount.scheduled,
         )
 
 
@@ -121,10 +225,15 @@ class Cupons(models.Model):
     valid_from = models.DateTimeField()
     valid_to = models.DateTimeField()
     active = models.BooleanField(default=True)
+    scheduled = models.BooleanField(default=False)
 
     class Meta:
         indexes = [
             models.Index(fields=["code"]),
+            models.Index(fields=["active", "valid_to"]),
+            models.Index(fields=["scheduled", "valid_from"]),
+            # 사용자별 활성 쿠폰 조회
+            models.Index(fields=["user", "active"]),
         ]
 
     @classmethod
@@ -137,16 +246,18 @@ class Cupons(models.Model):
             valid_from=cupon.valid_from,
             valid_to=cupon.valid_to,
             active=cupon.active,
+            scheduled=cupon.scheduled,
         )
 
     @classmethod
     def to_domain(cls, orm_cupon: "Cupons"):
         return CuponEntity(
             id=orm_cupon.id,
-            user_id=str(orm_cupon.user.id),
+            user_id=str(orm_cupon.user_id),  # type: ignore[attr-defined]
             code=orm_cupon.code,
             discount_percentage=float(orm_cupon.discount_percentage),
             valid_from=orm_cupon.valid_from,
             valid_to=orm_cupon.valid_to,
             active=orm_cupon.active,
+            scheduled=orm_cupon.scheduled,
         )
@@ -0,0 +1,376 @@
+import threading
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from datetime import date, datetime
+
+from commerce.app.ports.interfaces import IProductPersistenceAdapter
+from commerce.domain.entities import (
+    CuponEntity,
+    ProductDiscountEntity,
+    ProductEntity,
+    ProductStockEventEntity,
+    StockDailyRollupEntity,
+)
+from common.exceptions import DBOptimisticLockError, Duplicated, NotFound
+
+
+class InMemoryPersistenceAdapter(IProductPersistenceAdapter):
+    """
+    dict 기반 영속성 어댑터 (DB 없이 유스케이스 CPU 비용 측정, 단위 테스트용)
+    DjangoORMPersistenceAdapter 와 같은 제약 (product+version unique, 쿠폰 code unique)을 흉내냄
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._products: dict[str, ProductEntity] = {}
+        # product_id -> version 오름차순 이벤트 목록
+        self._stock_events: dict[str, list[ProductStockEventEntity]] = {}
+        self._discounts: dict[str, list[ProductDiscountEntity]] = {}
+        self._cupons_by_user: dict[str, list[CuponEntity]] = {}
+        self._cupon_codes: set[str] = set()
+        self._user_ids: set[str] = set()
+        self._rollups: dict[tuple[str, date], StockDailyRollupEntity] = {}
+        self._checkpoints: dict[str, str] = {}
+        # product_id -> 재고 이벤트로 반영된 확정 예약 id
+        self._applied_reservations: dict[str, set[str]] = {}
+
+    def add_user(self, user_id: str) -> None:
+        self._user_ids.add(user_id)
+
+    def create_product(self, product, stock_event):
+        with self._lock:
+            self._products[product.id] = product
+            self._stock_events.setdefault(product.id, []).append(stock_event)
+        return product, stock_event
+
+    def create_product_stock_event(
+        self, stock_event: ProductStockEventEntity, reservation_ids: Iterable[str] = ()
+    ) -> ProductStockEventEntity:
+        with self._lock:
+            events = self._stock_events.setdefault(stock_event.product_id, [])
+            if events and events[-1].version >= stock_event.version:
+                raise DBOptimisticLockError
+            applied = self._applied_reservations.setdefault(
+                stock_event.product_id, set()
+            )
+            if applied.intersection(reservation_ids):
+                raise Duplicated("stock reservation already applied")
+            events.append(stock_event)
+            applied.update(reservation_ids)
+        return stock_event
+
+    def get_applied_reservation_ids(
+        self, product_id: str, reservation_ids: Iterable[str]
+    ) -> set[str]:
+        return self._applied_reservations.get(product_id, set()).intersection(
+            reservation_ids
+        )
+
+    def get_last_stock_event(self, product_id: str) -> ProductStockEventEntity | None:
+        events = self._stock_events.get(product_id)
+        return events[-1] if events else None
+
+    def get_last_stock_events(
+        self, product_ids: Iterable[str]
+    ) -> dict[str, ProductStockEventEntity]:
+        return {
+            product_id: events[-1]
+            for product_id in product_ids
+            if (events := self._stock_events.get(product_id))
+        }
+
+    def get_stock_events(
+        self,
+        product_id: str,
+        after_version: int = 0,
+        until_version: int | None = None,
+        limit: int = 100,
+    ) -> list[ProductStockEventEntity]:
+        events = [
+            event
+            for event in self._stock_events.get(product_id, [])
+            if event.version > after_version
+            and (until_version is None or event.version <= until_version)
+        ]
+        return events[:limit]
+
+    def find_stock_event_version(
+        self, product_id: str, created_at: datetime, before: bool = False
+    ) -> int | None:
+        events = sorted(
+            self._stock_events.get(product_id, []),
+            key=lambda e: (e.created_at, e.version),
+        )
+        if before:
+            matched = [e for e in events if e.created_at < created_at]
+            return matched[-1].version if matched else None
+        matched = [e for e in events if e.created_at >= created_at]
+        return matched[0].version if matched else None
+
+    def get_stock_event_as_of(
+        self, product_id: str, at: datetime
+    ) -> ProductStockEventEntity | None:
+        # version 오름차순 목록에서 at 까지 생성된 마지막 version
+        events = [
+            e for e in self._stock_events.get(product_id, []) if e.created_at <= at
+        ]
+        return events[-1] if events else None
+
+    def get_stock_events_after(
+        self, after_id: str, before_id: str, limit: int
+    ) -> list[ProductStockEventEntity]:
+        events = sorted(
+            (
+                event
+                for events in self._stock_events.values()
+                for event in events
+                if after_id < event.id < before_id
+            ),
+            key=lambda e: e.id,
+        )
+        return events[:limit]
+
+    def get_checkpoint(self, name: str) -> str:
+        return self._checkpoints.get(name, "")
+
+    def move_checkpoint(self, name: str, previous: str, position: str) -> None:
+        with self._lock:
+            if self._checkpoints.get(name, "") != previous:
+                raise DBOptimisticLockError
+            self._checkpoints[name] = position
+
+    def get_stock_event_min_versions(
+        self, after_id: str, before_id: str
+    ) -> dict[str, int]:
+        min_versions: dict[str, int] = {}
+        for product_id, events in self._stock_events.items():
+            versions = [e.version for e in events if after_id < e.id < before_id]
+            if versions:
+                min_versions[product_id] = min(versions)
+        return min_versions
+
+    def iter_stock_events(
+        self, from_versions: Mapping[str, int], chunk_size: int = 1000
+    ) -> Iterator[ProductStockEventEntity]:
+        for product_id in sorted(from_versions):
+            for event in self._stock_events.get(product_id, []):
+                if event.version >= from_versions[product_id]:
+                    yield event
+
+    def add_stock_daily_rollups(
+        self,
+        rollups: Sequence[StockDailyRollupEntity],
+        checkpoint_name: str,
+        previous: str,
+        position: str,
+    ) -> None:
+        with self._lock:
+            if self._checkpoints.get(checkpoint_name, "") != previous:
+                raise DBOptimisticLockError
+            self._checkpoints[checkpoint_name] = position
+            for rollup in rollups:
+                key = (rollup.product_id, rollup.day)
+                if (existing := self._rollups.get(key)) is None:
+                    self._rollups[key] = rollup.model_copy()
+                else:
+                    existing.merge(rollup)
+
+    def get_stock_daily_rollups(
+        self, product_id: str, day_from: date, day_to: date
+    ) -> list[StockDailyRollupEntity]:
+        return sorted(
+            (
+                rollup
+                for (pid, day), rollup in self._rollups.items()
+                if pid == product_id and day_from <= day <= day_to
+            ),
+            key=lambda r: r.day,
+        )
+
+    def get_top_outbound_rollups(
+        self, day: date, limit: int
+    ) -> list[StockDailyRollupEntity]:
+        rollups = [r for r in self._rollups.values() if r.day == day]
+        return sorted(rollups, key=lambda r: r.outbound, reverse=True)[:limit]
+
+    def create_product_discount(
+        self, discount: ProductDiscountEntity, deactivate_others: bool = False
+    ) -> ProductDiscountEntity:
+        with self._lock:
+            discounts = self._discounts.setdefault(discount.product_id, [])
+            if deactivate_others:
+                discounts[:] = [
+                    d.model_copy(update={"active": False}) if d.active else d
+                    for d in discounts
+                ]
+            discounts.append(discount)
+        return discount
+
+    def create_product_discounts(
+        self,
+        discounts: Sequence[ProductDiscountEntity],
+        deactivate_others: bool = False,
+    ) -> list[ProductDiscountEntity]:
+        discounts = [d for d in discounts if d.product_id in self._products]
+        for discount in discounts:
+            self.create_product_discount(discount, deactivate_others)
+        return discounts
+
+    def create_cupon(self, cupon: CuponEntity) -> CuponEntity:
+        with self._lock:
+            if cupon.code in self._cupon_codes:
+                raise Duplicated(f"cupon code {cupon.code}")
+            self._cupon_codes.add(cupon.code)
+            self._cupons_by_user.setdefault(cupon.user_id, []).append(cupon)
+        return cupon
+
+    def activate_scheduled_discounts(self, now: datetime, limit: int) -> list[str]:
+        with self._lock:
+            due = sorted(
+                (
+                    d
+                    for discounts in self._discounts.values()
+                    for d in discounts
+                    if d.scheduled and d.start_date <= now
+                ),
+                key=lambda d: d.start_date,
+            )[:limit]
+            latest = {d.product_id: d.id for d in due if d.end_date > now}
+            due_ids = {d.id for d in due}
+            for product_id in {d.product_id for d in due}:
+                discounts = self._discounts[product_id]
+                for index, d in enumerate(discounts):
+                    if d.id in due_ids:
+                        discounts[index] = d.model_copy(
+                            update={
+                                "active": d.id == latest.get(product_id),
+                                "scheduled": False,
+                            }
+                        )
+                    elif d.active and product_id in latest:
+                        discounts[index] = d.model_copy(update={"active": False})
+        return [d.product_id for d in due]
+
+    def expire_discounts(self, now: datetime, limit: int) -> list[str]:
+        with self._lock:
+            due = [
+                d
+                for discounts in self._discounts.values()
+                for d in discounts
+                if d.active and d.end_date <= now
+            ][:limit]
+            due_ids = {d.id for d in due}
+            for product_id in {d.product_id for d in due}:
+                self._discounts[product_id] = [
+                    d.model_copy(update={"active": False}) if d.id in due_ids else d
+                    for d in self._discounts[product_id]
+                ]
+        return [d.product_id for d in due]
+
+    def activate_scheduled_cupons(self, now: datetime, limit: int) -> list[str]:
+        return self._flip_cupons(
+            lambda c: c.scheduled and c.valid_from <= now,
+            lambda c: {"active": c.valid_to > now, "scheduled": False},
+            limit,
+        )
+
+    def expire_cupons(self, now: datetime, limit: int) -> list[str]:
+        return self._flip_cupons(
+            lambda c: c.active and c.valid_to <= now,
+            lambda c: {"active": False},
+            limit,
+        )
+
+    def _flip_cupons(
+        self,
+        is_due: Callable[[CuponEntity], bool],
+        updates: Callable[[CuponEntity], dict[str, bool]],
+        limit: int,
+    ) -> list[str]:
+        with self._lock:
+            due = [
+                c
+                for cupons in self._cupons_by_user.values()
+                for c in cupons
+                if is_due(c)
+            ][:limit]
+            due_ids = {c.id for c in due}
+            for user_id in {c.user_id for c in due}:
+                self._cupons_by_user[user_id] = [
+                    c.model_copy(update=updates(c)) if c.id in due_ids else c
+                    for c in self._cupons_by_user[user_id]
+                ]
+        return [c.user_id for c in due]
+
+    def get_products(
+        self,
+        product_name: str | None,
+        page_size: int = 30,
+        page_index: int = 1,
+        peek_next: bool = False,
+    ) -> Iterable[tuple[ProductEntity, Iterable[ProductDiscountEntity], int]]:
+        products: Iterable[ProductEntity] = self._products.values()
+        if product_name:
+            needle = product_name.lower()
+            products = (p for p in products if needle in p.name.lower())
+        start = (page_index - 1) * page_size
+        end = start + page_size + int(peek_next)
+        for index, product in enumerate(products):
+            if index >= end:
+                break
+            if index < start:
+                continue
+            last_event = self.get_last_stock_event(product.id)
+            yield (
+                product,
+                self._active_discounts(product.id),
+                last_event.total_after_change if last_event else 0,
+            )
+
+    def count_products(self, product_name: str | None) -> int:
+        return len(self._product_ids(product_name))
+
+    def estimate_product_count(self, product_name: str | None) -> int | None:
+        return self.count_products(product_name)
+
+    def sync_product_count(self) -> int:
+        return self.count_products(None)
+
+    def get_product_ids(
+        self, product_name: str | None, chunk_size: int = 1000
+    ) -> Iterable[list[str]]:
+        ids = self._product_ids(product_name)
+        for start in range(0, len(ids), chunk_size):
+            yield ids[start : start + chunk_size]
+
+    def get_product(
+        self, product_id: str
+    ) -> tuple[ProductEntity, Iterable[ProductDiscountEntity]]:
+        if (product := self._products.get(product_id)) is None:
+            raise NotFound(f"product {product_id}")
+        return product, self._active_discounts(product_id)
+
+    def get_products_by_ids(
+        self, product_ids: Iterable[str]
+    ) -> dict[str, tuple[ProductEntity, list[ProductDiscountEntity]]]:
+        return {
+            product_id: (product, self._active_discounts(product_id))
+            for product_id in product_ids
+            if (product := self._products.get(product_id)) is not None
+        }
+
+    def get_cupons(self, user_id: str) -> Iterable[CuponEntity]:
+        return [c for c in self._cupons_by_user.get(user_id, []) if c.active]
+
+    def is_user_exist(self, user_id: str) -> bool:
+        return user_id in self._user_ids
+
+    def _product_ids(self, product_name: str | None) -> list[str]:
+        needle = (product_name or "").lower()
+        return sorted(
+            product.id
+            for product in self._products.values()
+            if needle in product.name.lower()
+        )
+
+    def _active_discounts(self, product_id: str) -> list[ProductDiscountEntity]:
+        return [d for d in self._discounts.get(product_id, []) if d.active]
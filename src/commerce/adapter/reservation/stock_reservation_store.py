@@ -0,0 +1,346 @@
+"""
+재고 홀드(예약) 저장소
+
+- 예약마다 상품별 수량을 홀드하고 TTL 이 지나면 자동으로 풀림 (재고 이벤트를 쓰지 않음)
+- 예약 가능 수량 = 마지막 재고 이벤트의 total (호출하는 쪽에서 전달) - 유효한 홀드 합계
+- 확정된 예약은 만료되지 않고, reconcile 에서 재고 이벤트로 기록된 뒤(ack) 홀드가 지워짐
+  (이벤트 기록 -> ack 순서라 그 사이에는 재고가 이중으로 차감된 것처럼 보수적으로 계산됨)
+
+Redis: 상품별 홀드는 ZSET(reservation_id -> 만료 시각) + HASH(reservation_id -> 수량)
+       예약/확정/처리중 목록과 함께 Lua 스크립트로 원자적으로 변경
+       (키는 모두 같은 hash tag 를 써서 Redis Cluster 에서도 한 슬롯에 위치)
+REDIS_URL 미설정시(테스트, 벤치마크) 같은 동작을 프로세스 메모리로 구현한 저장소 사용
+"""
+
+import math
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from functools import cache
+from typing import Any
+
+from django.conf import settings
+
+from commerce.app.ports.interfaces import IStockReservationStore
+from common.redis_client import get_redis
+
+DEFAULT_STOCK_RESERVATION = {
+    "TTL_SECONDS": 600,
+    "KEY_PREFIX": "milly:{stock}",
+    # reconcile 중 죽은 프로세스가 가져간 확정 예약을 다시 처리하기까지의 시간
+    "CLAIM_LEASE_SECONDS": 60,
+}
+
+
+def reservation_settings() -> dict[str, Any]:
+    return {**DEFAULT_STOCK_RESERVATION, **getattr(settings, "STOCK_RESERVATION", {})}
+
+
+# KEYS: 예약 키, prefix, ARGV: now, ttl, reservation_id, (product_id, 수량, 재고 total) * n
+_RESERVE = """
+local prefix = KEYS[2]
+local now = tonumber(ARGV[1])
+local expires_at = now + tonumber(ARGV[2])
+local reservation_id = ARGV[3]
+local short = {}
+for i = 4, #ARGV, 3 do
+    local product_id = ARGV[i]
+    local holds_key = prefix .. ':holds:' .. product_id
+    local qty_key = prefix .. ':qty:' .. product_id
+    local expired = redis.call('ZRANGEBYSCORE', holds_key, '-inf', now)
+    if #expired > 0 then
+        redis.call('ZREM', holds_key, unpack(expired))
+        redis.call('HDEL', qty_key, unpack(expired))
+    end
+    local held = 0
+    for _, qty in ipairs(redis.call('HVALS', qty_key)) do
+        held = held + tonumber(qty)
+    end
+    if tonumber(ARGV[i + 2]) - held < tonumber(ARGV[i + 1]) then
+        table.insert(short, product_id)
+    end
+end
+if #short > 0 then
+    return short
+end
+for i = 4, #ARGV, 3 do
+    local product_id = ARGV[i]
+    redis.call('ZADD', prefix .. ':holds:' .. product_id, expires_at, reservation_id)
+    redis.call('HSET', prefix .. ':qty:' .. product_id, reservation_id, ARGV[i + 1])
+    redis.call('HSET', KEYS[1], product_id, ARGV[i + 1])
+end
+redis.call('PEXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2]) * 1000))
+return short
+"""
+
+# KEYS: 예약 키, prefix, ARGV: reservation_id
+_RELEASE = """
+local lines = redis.call('HGETALL', KEYS[1])
+if #lines == 0 or redis.call('PTTL', KEYS[1]) == -1 then
+    return 0
+end
+for i = 1, #lines, 2 do
+    redis.call('ZREM', KEYS[2] .. ':holds:' .. lines[i], ARGV[1])
+    redis.call('HDEL', KEYS[2] .. ':qty:' .. lines[i], ARGV[1])
+end
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+# KEYS: 예약 키, prefix, 확정 목록, ARGV: reservation_id, now
+_CONFIRM = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if redis.call('PTTL', KEYS[1]) == -1 then
+    return 1
+end
+local lines = redis.call('HGETALL', KEYS[1])
+for i = 1, #lines, 2 do
+    local score = redis.call('ZSCORE', KEYS[2] .. ':holds:' .. lines[i], ARGV[1])
+    if not score or tonumber(score) <= tonumber(ARGV[2]) then
+        return 0
+    end
+end
+for i = 1, #lines, 2 do
+    redis.call('ZADD', KEYS[2] .. ':holds:' .. lines[i], 'XX', '+inf', ARGV[1])
+end
+redis.call('PERSIST', KEYS[1])
+redis.call('RPUSH', KEYS[3], ARGV[1])
+return 1
+"""
+
+# KEYS: prefix, 확정 목록, 처리중 ZSET, ARGV: now, lease, limit
+_CLAIM = """
+local now = tonumber(ARGV[1])
+local ids = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now, 'LIMIT', 0, tonumber(ARGV[3]))
+local remaining = tonumber(ARGV[3]) - #ids
+if remaining > 0 then
+    for _, id in ipairs(redis.call('LRANGE', KEYS[2], 0, remaining - 1)) do
+        table.insert(ids, id)
+    end
+    redis.call('LTRIM', KEYS[2], remaining, -1)
+end
+local claimed = {}
+for _, id in ipairs(ids) do
+    redis.call('ZADD', KEYS[3], now + tonumber(ARGV[2]), id)
+    table.insert(claimed, {id, redis.call('HGETALL', KEYS[1] .. ':reservation:' .. id)})
+end
+return claimed
+"""
+
+# KEYS: prefix, 처리중 ZSET, ARGV: product_id, reservation_id * n
+# (예약의 모든 상품이 ack 되면 처리중 목록에서 제거)
+_ACK = """
+local product_id = ARGV[1]
+for i = 2, #ARGV do
+    local reservation_key = KEYS[1] .. ':reservation:' .. ARGV[i]
+    redis.call('ZREM', KEYS[1] .. ':holds:' .. product_id, ARGV[i])
+    redis.call('HDEL', KEYS[1] .. ':qty:' .. product_id, ARGV[i])
+    redis.call('HDEL', reservation_key, product_id)
+    if redis.call('HLEN', reservation_key) == 0 then
+        redis.call('ZREM', KEYS[2], ARGV[i])
+    end
+end
+return 1
+"""
+
+
+def _pairs(flat: list[Any]) -> dict[str, int]:
+    return {_str(flat[i]): int(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+
+def _str(value: str | bytes) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _group_by_product(
+    claimed: Iterable[tuple[str, Mapping[str, int]]],
+) -> dict[str, dict[str, int]]:
+    by_product: dict[str, dict[str, int]] = {}
+    for reservation_id, lines in claimed:
+        for product_id, quantity in lines.items():
+            by_product.setdefault(product_id, {})[reservation_id] = quantity
+    return by_product
+
+
+class RedisStockReservationStore(IStockReservationStore):
+    def __init__(self, client: Any, key_prefix: str, lease: float) -> None:
+        self._client = client
+        self._prefix = key_prefix
+        self._lease = lease
+        self._reserve = client.register_script(_RESERVE)
+        self._release = client.register_script(_RELEASE)
+        self._confirm = client.register_script(_CONFIRM)
+        self._claim = client.register_script(_CLAIM)
+        self._ack = client.register_script(_ACK)
+
+    def _key(self, reservation_id: str) -> str:
+        return f"{self._prefix}:reservation:{reservation_id}"
+
+    @property
+    def _confirmed_key(self) -> str:
+        return f"{self._prefix}:confirmed"
+
+    @property
+    def _processing_key(self) -> str:
+        return f"{self._prefix}:processing"
+
+    def reserve(
+        self,
+        reservation_id: str,
+        quantities: Mapping[str, int],
+        totals: Mapping[str, int],
+        ttl: float,
+    ) -> list[str]:
+        args: list[Any] = [time.time(), ttl, reservation_id]
+        for product_id, quantity in quantities.items():
+            args += [product_id, quantity, totals.get(product_id, 0)]
+        short = self._reserve(keys=[self._key(reservation_id), self._prefix], args=args)
+        return [_str(product_id) for product_id in short]
+
+    def release(self, reservation_id: str) -> bool:
+        return bool(
+            self._release(
+                keys=[self._key(reservation_id), self._prefix], args=[reservation_id]
+            )
+        )
+
+    def confirm(self, reservation_id: str) -> bool:
+        return bool(
+            self._confirm(
+                keys=[self._key(reservation_id), self._prefix, self._confirmed_key],
+                args=[reservation_id, time.time()],
+            )
+        )
+
+    def claim_confirmed(self, limit: int) -> dict[str, dict[str, int]]:
+        claimed = self._claim(
+            keys=[self._prefix, self._confirmed_key, self._processing_key],
+            args=[time.time(), self._lease, limit],
+        )
+        return _group_by_product(
+            (_str(reservation_id), _pairs(lines)) for reservation_id, lines in claimed
+        )
+
+    def ack(self, product_id: str, reservation_ids: Iterable[str]) -> None:
+        self._ack(
+            keys=[self._prefix, self._processing_key],
+            args=[product_id, *reservation_ids],
+        )
+
+
+class InMemoryStockReservationStore(IStockReservationStore):
+    """RedisStockReservationStore 와 같은 동작 (단일 프로세스용)"""
+
+    def __init__(
+        self, lease: float = 60.0, clock: Callable[[], float] = time.time
+    ) -> None:
+        self._lease = lease
+        self._clock = clock
+        self._lock = threading.Lock()
+        # product_id -> reservation_id -> (만료 시각, 수량)
+        self._holds: dict[str, dict[str, tuple[float, int]]] = {}
+        # reservation_id -> (만료 시각, product_id -> 남은 수량). 확정되면 만료 시각 inf
+        self._reservations: dict[str, tuple[float, dict[str, int]]] = {}
+        self._confirmed: list[str] = []
+        self._processing: dict[str, float] = {}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._holds.clear()
+            self._reservations.clear()
+            self._confirmed.clear()
+            self._processing.clear()
+
+    def reserve(
+        self,
+        reservation_id: str,
+        quantities: Mapping[str, int],
+        totals: Mapping[str, int],
+        ttl: float,
+    ) -> list[str]:
+        now = self._clock()
+        with self._lock:
+            short = [
+                product_id
+                for product_id, quantity in quantities.items()
+                if totals.get(product_id, 0) - self._held(product_id, now) < quantity
+            ]
+            if short:
+                return short
+            for product_id, quantity in quantities.items():
+                self._holds.setdefault(product_id, {})[reservation_id] = (
+                    now + ttl,
+                    quantity,
+                )
+            self._reservations[reservation_id] = (now + ttl, dict(quantities))
+        return []
+
+    def release(self, reservation_id: str) -> bool:
+        with self._lock:
+            expires_at, lines = self._reservations.get(reservation_id, (0.0, {}))
+            if expires_at <= self._clock() or math.isinf(expires_at):
+                return False
+            for product_id in lines:
+                self._holds[product_id].pop(reservation_id, None)
+            del self._reservations[reservation_id]
+        return True
+
+    def confirm(self, reservation_id: str) -> bool:
+        with self._lock:
+            expires_at, lines = self._reservations.get(reservation_id, (0.0, {}))
+            if math.isinf(expires_at):
+                return True
+            if expires_at <= self._clock():
+                return False
+            for product_id, quantity in lines.items():
+                self._holds[product_id][reservation_id] = (math.inf, quantity)
+            self._reservations[reservation_id] = (math.inf, lines)
+            self._confirmed.append(reservation_id)
+        return True
+
+    def claim_confirmed(self, limit: int) -> dict[str, dict[str, int]]:
+        now = self._clock()
+        with self._lock:
+            ids = [rid for rid, lease in self._processing.items() if lease <= now]
+            ids = ids[:limit]
+            taken = self._confirmed[: limit - len(ids)]
+            del self._confirmed[: len(taken)]
+            ids += taken
+            for reservation_id in ids:
+                self._processing[reservation_id] = now + self._lease
+            return _group_by_product(
+                (rid, dict(self._reservations[rid][1])) for rid in ids
+            )
+
+    def ack(self, product_id: str, reservation_ids: Iterable[str]) -> None:
+        with self._lock:
+            for reservation_id in reservation_ids:
+                self._holds.get(product_id, {}).pop(reservation_id, None)
+                if (reservation := self._reservations.get(reservation_id)) is None:
+                    # 이미 모두 ack 된 예약 (lease 가 지나 다시 가져간 실행이 먼저 ack)
+                    self._processing.pop(reservation_id, None)
+                    continue
+                _, lines = reservation
+                lines.pop(product_id, None)
+                if not lines:
+                    del self._reservations[reservation_id]
+                    self._processing.pop(reservation_id, None)
+
+    def _held(self, product_id: str, now: float) -> int:
+        holds = self._holds.get(product_id, {})
+        for reservation_id in [r for r, (exp, _) in holds.items() if exp <= now]:
+            del holds[reservation_id]
+            self._reservations.pop(reservation_id, None)
+        return sum(quantity for _, quantity in holds.values())
+
+
+@cache
+def get_stock_reservation_store() -> IStockReservationStore:
+    config = reservation_settings()
+    if (client := get_redis()) is None:
+        return InMemoryStockReservationStore(lease=config["CLAIM_LEASE_SECONDS"])
+    return RedisStockReservationStore(
+        client, config["KEY_PREFIX"], config["CLAIM_LEASE_SECONDS"]
+    )
@@ -0,0 +1,227 @@
+"""
+재고 변경 실시간 전달 (SSE 구독자 fan-out)
+
+- 재고 이벤트 커밋 후 publish() -> Redis pub/sub 채널 -> 각 노드의 listener 스레드 -> 로컬 구독자
+  (REDIS_URL 미설정시 Redis 를 거치지 않고 바로 로컬 구독자에게 전달)
+- 구독자는 이벤트 루프 단위 hub 에 등록되고, 스레드에서 루프로 넘어가는 호출은 이벤트당 루프별 1회
+- backpressure: 구독자별 버퍼는 상품당 최신 값 1개만 유지 (느린 클라이언트는 중간 값을 건너뜀)
+- 아무 이벤트가 없으면 heartbeat 를 보내서 끊어진 연결을 정리
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import redis
+from django.conf import settings
+
+from commerce.domain.entities import ProductStockEventEntity
+from common.exceptions import ServiceUnavailable
+from common.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STOCK_STREAM = {
+    "CHANNEL": "milly:stock",
+    "HEARTBEAT_SECONDS": 15.0,
+    # 연결 하나가 구독할 수 있는 상품 수
+    "MAX_PRODUCTS": 100,
+    # 노드(프로세스)당 최대 동시 구독자 수
+    "MAX_SUBSCRIBERS": 50_000,
+}
+
+
+def stream_settings() -> dict[str, Any]:
+    return {**DEFAULT_STOCK_STREAM, **getattr(settings, "STOCK_STREAM", {})}
+
+
+@dataclass(frozen=True)
+class StockUpdate:
+    product_id: str
+    total: int
+    version: int
+
+    @classmethod
+    def from_event(cls, event: ProductStockEventEntity) -> "StockUpdate":
+        return cls(
+            product_id=event.product_id,
+            total=event.total_after_change,
+            version=event.version,
+        )
+
+    def to_sse(self) -> str:
+        return (
+            f"event: stock\nid: {self.product_id}:{self.version}\n"
+            f"data: {json.dumps(asdict(self))}\n\n"
+        )
+
+
+HEARTBEAT = ": ping\n\n"
+
+
+class Subscription:
+    """연결 하나의 구독 상태. 이벤트 루프 스레드에서만 접근"""
+
+    def __init__(
+        self, hub: "_LoopHub", product_ids: frozenset[str], heartbeat: float
+    ) -> None:
+        self.product_ids = product_ids
+        self._hub = hub
+        self._heartbeat = heartbeat
+        self._pending: dict[str, StockUpdate] = {}
+        self._versions: dict[str, int] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, update: StockUpdate) -> None:
+        # 이미 보낸(또는 대기중인) 것보다 오래된 버전은 무시, 대기중인 값은 최신 값으로 덮어씀
+        if update.version <= self._versions.get(update.product_id, 0):
+            return
+        self._versions[update.product_id] = update.version
+        self._pending[update.product_id] = update
+        self._ready.set()
+
+    async def messages(self) -> AsyncIterator[str]:
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), self._heartbeat)
+            except TimeoutError:
+                yield HEARTBEAT
+                continue
+            self._ready.clear()
+            pending, self._pending = self._pending, {}
+            for update in pending.values():
+                yield update.to_sse()
+
+    def close(self) -> None:
+        self._hub.remove(self)
+
+
+class _LoopHub:
+    """이벤트 루프 하나에 속한 구독자 목록 (상품 id -> 구독자)"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.by_product: dict[str, set[Subscription]] = {}
+        self.count = 0
+
+    def add(self, subscription: Subscription) -> None:
+        for product_id in subscription.product_ids:
+            self.by_product.setdefault(product_id, set()).add(subscription)
+        self.count += 1
+
+    def remove(self, subscription: Subscription) -> None:
+        for product_id in subscription.product_ids:
+            if subscribers := self.by_product.get(product_id):
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.by_product[product_id]
+        self.count -= 1
+
+    def dispatch(self, update: StockUpdate) -> None:
+        for subscription in self.by_product.get(update.product_id, ()):
+            subscription.offer(update)
+
+
+class StockBroker:
+    def __init__(self) -> None:
+        self._hubs: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopHub] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self._listener: threading.Thread | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(hub.count for hub in self._hubs.values())
+
+    def subscribe(self, product_ids: Iterable[str]) -> Subscription:
+        """이벤트 루프 안에서 호출. 반환된 Subscription 은 사용 후 close() 해야 함"""
+        config = stream_settings()
+        ids = frozenset(product_ids)
+        if len(ids) > config["MAX_PRODUCTS"]:
+            raise ServiceUnavailable(
+                f"too many products (max {config['MAX_PRODUCTS']})"
+            )
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if (
+                sum(hub.count for hub in self._hubs.values())
+                >= config["MAX_SUBSCRIBERS"]
+            ):
+                raise ServiceUnavailable("too many stream subscribers")
+            hub = self._hubs.setdefault(loop, _LoopHub(loop))
+        subscription = Subscription(hub, ids, config["HEARTBEAT_SECONDS"])
+        hub.add(subscription)
+        self._ensure_listener()
+        return subscription
+
+    def publish(self, update: StockUpdate) -> None:
+        """모든 노드의 구독자에게 전달 (커밋 후 호출)"""
+        if (client := get_redis()) is not None:
+            try:
+                client.publish(stream_settings()["CHANNEL"], json.dumps(asdict(update)))
+                return
+            except redis.RedisError:
+                logger.warning("stock update publish failed", exc_info=True)
+        self.publish_local(update)
+
+    def publish_local(self, update: StockUpdate) -> None:
+        """이 노드의 구독자에게만 전달. 어느 스레드에서나 호출 가능"""
+        with self._lock:
+            hubs = [
+                hub
+                for hub in self._hubs.values()
+                if update.product_id in hub.by_product
+            ]
+        for hub in hubs:
+            try:
+                hub.loop.call_soon_threadsafe(hub.dispatch, update)
+            except RuntimeError:
+                # 이미 닫힌 루프
+                pass
+
+    def _ensure_listener(self) -> None:
+        if self._listener is not None or get_redis() is None:
+            return
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(
+                target=self._listen, name="stock-stream-listener", daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self) -> None:
+        """Redis 채널 구독 (연결이 끊기면 재연결)"""
+        backoff = 0.5
+        while True:
+            try:
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)  # type: ignore[union-attr]
+                pubsub.subscribe(stream_settings()["CHANNEL"])
+                backoff = 0.5
+                for message in pubsub.listen():
+                    self._deliver(message)
+            except redis.RedisError:
+                logger.warning("stock stream listener disconnected", exc_info=True)
+            except Exception:
+                # listener 가 끝나면 이 노드의 모든 구독자가 더 이상 변경을 받지 못하므로 다시 구독
+                logger.error("stock stream listener failed", exc_info=True)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 10.0)
+
+    def _deliver(self, message: dict[str, Any]) -> None:
+        """메시지 하나 전달. 잘못된 메시지나 전달 실패는 기록만 하고 다음 메시지를 계속 받음"""
+        try:
+            self.publish_local(StockUpdate(**json.loads(message["data"])))
+        except Exception:
+            logger.warning("stock stream message dropped", exc_info=True)
+
+
+stock_broker = StockBroker()
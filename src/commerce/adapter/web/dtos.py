@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 
-from commerce.domain.entities import ProductEntity
+from commerce.domain.entities import CheckoutQuote, ProductEntity
 
 
 class ProductDTO(BaseModel):
@@ -37,3 +37,28 @@ class ProductDetailDTO(BaseModel):
             "cupon_discount_amount": self.cupon_discount_amount,
             "final_price": self.final_price,
         }
+
+
+class CheckoutQuoteDTO(BaseModel):
+    quote: CheckoutQuote
+
+    def to_dict(self) -> dict:
+        return {
+            "lines": [
+                {
+                    "product_id": line.product.id,
+                    "name": line.product.name,
+                    "unit_price": line.product.price,
+                    "quantity": line.quantity,
+                    "product_discount_amount": line.product_discount_amount,
+                    "cupon_discount_amount": line.cupon_discount_amount,
+                    "line_total": line.line_total,
+                }
+                for line in self.quote.lines
+            ],
+            "cupon_code": self.quote.cupon.code if self.quote.cupon else None,
+            "subtotal": self.quote.subtotal,
+            "product_discount_total": self.quote.product_discount_total,
+            "cupon_discount_total": self.quote.cupon_discount_total,
+            "total": self.quote.total,
+        }
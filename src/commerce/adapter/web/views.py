@@ -1,33 +1,97 @@
-from datetime import datetime, timedelta
+import json
+from collections.abc import AsyncIterator, Iterator
+from datetime import date, datetime, timedelta
 from typing import Any
 
-from django.http import HttpRequest, JsonResponse
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.http import require_http_methods
+from pydantic import ValidationError
 
+from commerce.adapter.persistence.cache.access_stats import access_stats
+from commerce.adapter.persistence.cache.cached_persistence_adapter import (
+    CachedProductPersistenceAdapter,
+)
 from commerce.adapter.persistence.django_orm.django_orm_persistence_adpater import (
     DjangoORMPersistenceAdapter,
+    stock_history_settings,
+)
+from commerce.adapter.reservation.stock_reservation_store import (
+    get_stock_reservation_store,
+    reservation_settings,
 )
-from commerce.adapter.web.dtos import ProductDTO
+from commerce.adapter.stream.stock_broker import StockUpdate, stock_broker
+from commerce.adapter.web.dtos import CheckoutQuoteDTO, ProductDTO
 from commerce.app.services import CalcProductDiscountService
 from commerce.app.usecases import (
+    BulkUpsertProductDiscountUsecase,
+    CartLine,
+    ConfirmStockReservationUsecase,
     CreateCuponUsecase,
     CreateProductUsecase,
     GetProductsUsecase,
+    GetProductsWithCuponDiscountUsecase,
     GetProductWithCuponDiscountUsecase,
+    GetStockAsOfUsecase,
+    GetStockDailyRollupsUsecase,
+    GetStockHistoryUsecase,
+    GetTopOutboundProductsUsecase,
+    QuoteCheckoutUsecase,
+    ReleaseStockReservationUsecase,
+    ReserveStockUsecase,
     UpdateProductStockUsecase,
     UpsertProductDiscountUsecase,
 )
+from commerce.domain.entities import ProductStockEventEntity
+from common import tracing
+from common.cache import MISSING, InstrumentedCache
 from common.decorators import parse_json_form_body
-from common.utils import get_or_raise, parse_datetime_with_default
+from common.exceptions import (
+    Duplicated,
+    InvalidParameter,
+    NotFound,
+    ParameterRequired,
+    StreamingNotSupported,
+)
+from common.idempotency import idempotent
+from common.utils import get_or_raise, new_id, parse_datetime_with_default
+
+
+def _parse_cart_lines(payload: dict[str, Any]) -> list[CartLine]:
+    try:
+        return [
+            CartLine.model_validate(line) for line in get_or_raise(payload, "lines")
+        ]
+    except (ValidationError, TypeError) as e:
+        raise InvalidParameter("lines") from e
+
+
+# 상품 목록 페이지 (목록 캐시 키가 page_size, page_index 별로 생기므로 범위를 제한)
+_PRODUCTS_PAGE_SIZE = 30
+_PRODUCTS_MAX_PAGE_SIZE = 100
+_PRODUCTS_MAX_PAGE_INDEX = 1_000
+
+
+# 일괄 할인 작업 진행 상황 (다른 요청에서 조회할 수 있도록 캐시에 저장)
+_bulk_discount_jobs = InstrumentedCache("bulk_discount_job")
+_BULK_DISCOUNT_JOB_TTL = 60 * 60
+
+
+def _bulk_discount_job_key(job_id: str) -> str:
+    return f"discounts:bulk:{job_id}"
 
 
 @require_http_methods(["GET"])
 def get_product_detail_view(request: HttpRequest, product_id: str) -> JsonResponse:
     usecase = GetProductWithCuponDiscountUsecase(
-        product_persistence_adapter=DjangoORMPersistenceAdapter(),
+        product_persistence_adapter=CachedProductPersistenceAdapter(
+            DjangoORMPersistenceAdapter()
+        ),
         calc_product_discount_service=CalcProductDiscountService(),
     )
     # 익명 사용자인 경우 기본 user_id 사용
@@ -36,17 +100,55 @@ def get_product_detail_view(request: HttpRequest, product_id: str) -> JsonRespon
         user_id=user_id,
         product_id=product_id,
     )
+    access_stats.record_product(product_id)
 
     # 도메인 객체를 DTO로 변환
     from commerce.adapter.web.dtos import ProductDetailDTO
 
-    dto = ProductDetailDTO(
-        product=res.product,
-        product_discount_amount=res.product_discount_amount,
-        cupon_discount_amount=res.cupon_discount_amount,
-        final_price=res.final_price,
+    with tracing.start_span("serialize", tracing.WEB):
+        dto = ProductDetailDTO(
+            product=res.product,
+            product_discount_amount=res.product_discount_amount,
+            cupon_discount_amount=res.cupon_discount_amount,
+            final_price=res.final_price,
+        )
+        return JsonResponse(dto.to_dict())
+
+
+@require_http_methods(["GET"])
+def get_product_details_view(request: HttpRequest) -> JsonResponse:
+    """여러 상품 상세 조회 (장바구니/위시리스트). ?product_ids=a,b,c"""
+    from commerce.adapter.web.dtos import ProductDetailDTO
+
+    # parse
+    product_ids = [pid for pid in request.GET.get("product_ids", "").split(",") if pid]
+    if not product_ids:
+        raise ParameterRequired("product_ids")
+
+    # execute
+    usecase = GetProductsWithCuponDiscountUsecase(
+        product_persistence_adapter=CachedProductPersistenceAdapter(
+            DjangoORMPersistenceAdapter()
+        ),
+        calc_product_discount_service=CalcProductDiscountService(),
     )
-    return JsonResponse(dto.to_dict())
+    user_id = str(request.user.id) if request.user.is_authenticated else "anonymous"  # type: ignore
+    results, not_found = usecase.execute(user_id=user_id, product_ids=product_ids)
+    for res in results:
+        access_stats.record_product(res.product.id)
+
+    # resp
+    with tracing.start_span("serialize", tracing.WEB):
+        dtos = [
+            ProductDetailDTO(
+                product=res.product,
+                product_discount_amount=res.product_discount_amount,
+                cupon_discount_amount=res.cupon_discount_amount,
+                final_price=res.final_price,
+            ).to_dict()
+            for res in results
+        ]
+        return JsonResponse({"products": dtos, "not_found": not_found})
 
 
 class ProductsView(View):
@@ -56,24 +158,35 @@ class ProductsView(View):
         """상품 목록 조회"""
         # parse
         product_name = request.GET.get("product_name")
-        page_size = int(request.GET.get("page_size", 30))
-        page_index = int(request.GET.get("page_index", 1))
+        try:
+            page_size = int(request.GET.get("page_size", _PRODUCTS_PAGE_SIZE))
+            page_index = int(request.GET.get("page_index", 1))
+        except ValueError as e:
+            raise InvalidParameter("page_size, page_index") from e
+        if page_size < 1 or not 1 <= page_index <= _PRODUCTS_MAX_PAGE_INDEX:
+            raise InvalidParameter("page_size, page_index")
+        page_size = min(page_size, _PRODUCTS_MAX_PAGE_SIZE)
+        include_total = request.GET.get("include_total") in ("1", "true")
 
         # execute
-        product_persistence_adapter = DjangoORMPersistenceAdapter()
+        product_persistence_adapter = CachedProductPersistenceAdapter(
+            DjangoORMPersistenceAdapter()
+        )
         usecase = GetProductsUsecase(
             product_persistence_adapter=product_persistence_adapter,
             calc_product_discount_service=CalcProductDiscountService(),
         )
-        results = usecase.execute(
+        page = usecase.execute_page(
             product_name=product_name,
             page_size=page_size,
             page_index=page_index,
+            with_total=include_total,
         )
+        access_stats.record_listing(product_name, page_size, page_index)
 
         # resp
         dtos = []
-        for result in results:
+        for result in page.items:
             dto = ProductDTO(
                 id=result.product.id,
                 name=result.product.name,
@@ -84,8 +197,13 @@ class ProductsView(View):
                 final_price=result.total_amount,
             )
             dtos.append(dto.to_dict())
-        return JsonResponse({"products": dtos})
+        body: dict[str, Any] = {"products": dtos, "has_next": page.has_next}
+        if include_total:
+            # 검색어별 수가 아직 집계되지 않았으면 null
+            body["total"] = page.total
+        return JsonResponse(body)
 
+    @method_decorator(idempotent)
     @method_decorator(parse_json_form_body)
     def post(self, request: HttpRequest, payload: dict[str, Any]) -> JsonResponse:
         """상품 생성"""
@@ -97,7 +215,9 @@ class ProductsView(View):
 
         # execute
         usecase = CreateProductUsecase(
-            product_persistence_adapter=DjangoORMPersistenceAdapter()
+            product_persistence_adapter=CachedProductPersistenceAdapter(
+                DjangoORMPersistenceAdapter()
+            )
         )
         product, stock_event = usecase.execute(
             CreateProductUsecase.Cmd(
@@ -117,19 +237,22 @@ class ProductsView(View):
 
 
 @require_http_methods(["POST"])
+@idempotent
 @parse_json_form_body
-def update_product_stock_view(
+async def update_product_stock_view(
     request: HttpRequest, payload: dict[str, Any], product_id: str
 ) -> JsonResponse:
     # parse
     stock_change = get_or_raise(payload, "change")
 
     # execute
-    product_persistence_adapter = DjangoORMPersistenceAdapter()
+    product_persistence_adapter = CachedProductPersistenceAdapter(
+        DjangoORMPersistenceAdapter()
+    )
     usecase = UpdateProductStockUsecase(
         product_persistence_adapter=product_persistence_adapter,
     )
-    stock_event = usecase.execute(
+    stock_event = await usecase.aexecute(
         product_id=product_id,
         change=stock_change,
     )
@@ -138,6 +261,205 @@ def update_product_stock_view(
     return JsonResponse({"new_stock_count": stock_event.total_after_change})
 
 
+def _parse_stock_history_query(
+    request: HttpRequest, product_id: str
+) -> GetStockHistoryUsecase.Query:
+    params: dict[str, Any] = {"product_id": product_id}
+    for name, parse in (
+        ("version_from", int),
+        ("version_to", int),
+        ("created_from", parse_datetime_with_default),
+        ("created_to", parse_datetime_with_default),
+    ):
+        if value := request.GET.get(name):
+            try:
+                params[name] = parse(value)
+            except ValueError as e:
+                raise InvalidParameter(name) from e
+    return GetStockHistoryUsecase.Query(**params)
+
+
+@require_http_methods(["GET"])
+def get_stock_history_view(
+    request: HttpRequest, product_id: str
+) -> JsonResponse | StreamingHttpResponse:
+    """
+    재고 이벤트 이력 (version 오름차순)
+    ?version_from&version_to&created_from&created_to(미포함)&page_size&cursor
+    format=ndjson 이면 범위 전체를 chunk 단위로 조회하면서 한 줄에 이벤트 하나씩 스트리밍
+    """
+    # parse
+    query = _parse_stock_history_query(request, product_id)
+    history_settings = stock_history_settings()
+    try:
+        page_size = min(
+            int(request.GET.get("page_size", history_settings["PAGE_SIZE"])),
+            history_settings["MAX_PAGE_SIZE"],
+        )
+        cursor = int(request.GET["cursor"]) if request.GET.get("cursor") else None
+    except ValueError as e:
+        raise InvalidParameter("page_size, cursor") from e
+
+    # execute
+    usecase = GetStockHistoryUsecase(
+        product_persistence_adapter=DjangoORMPersistenceAdapter()
+    )
+    if request.GET.get("format") == "ndjson":
+        chunks = iter(
+            usecase.iter_chunks(query, history_settings["STREAM_CHUNK_SIZE"], cursor)
+        )
+
+        def _encode(events: list[ProductStockEventEntity]) -> str:
+            return "".join(
+                json.dumps(event.model_dump(mode="json")) + "\n" for event in events
+            )
+
+        def _lines() -> Iterator[str]:
+            for events in chunks:
+                yield _encode(events)
+
+        def _next_chunk() -> list[ProductStockEventEntity] | None:
+            return next(chunks, None)
+
+        async def _alines() -> AsyncIterator[str]:
+            # ASGI 는 sync iterator 를 전부 읽은 뒤 보내므로, chunk 하나씩 조회해서 바로 보냄
+            next_chunk = sync_to_async(_next_chunk)
+            while (events := await next_chunk()) is not None:
+                yield _encode(events)
+
+        # resp
+        return StreamingHttpResponse(
+            _alines() if isinstance(request, ASGIRequest) else _lines(),
+            content_type="application/x-ndjson",
+        )
+
+    page = usecase.execute(query, page_size, cursor)
+
+    # resp
+    return JsonResponse(
+        {
+            "events": [event.model_dump(mode="json") for event in page.items],
+            "next_cursor": page.next_cursor,
+        }
+    )
+
+
+@require_http_methods(["GET"])
+def get_stock_as_of_view(request: HttpRequest, product_id: str) -> JsonResponse:
+    """과거 시점의 재고. ?at=2025-01-01T12:00:00+09:00"""
+    # parse
+    if not (value := request.GET.get("at")):
+        raise ParameterRequired("at")
+    try:
+        at = parse_datetime_with_default(value)
+    except ValueError as e:
+        raise InvalidParameter("at") from e
+
+    # execute
+    usecase = GetStockAsOfUsecase(
+        product_persistence_adapter=DjangoORMPersistenceAdapter()
+    )
+    result = usecase.execute(product_id, at)
+
+    # resp
+    return JsonResponse(result.model_dump(mode="json"))
+
+
+def _parse_day(request: HttpRequest, name: str) -> date:
+    if not (value := request.GET.get(name)):
+        raise ParameterRequired(name)
+    try:
+        if (day := parse_date(value)) is None:
+            raise ValueError(value)
+    except ValueError as e:
+        raise InvalidParameter(name) from e
+    return day
+
+
+@require_http_methods(["GET"])
+def get_stock_daily_rollups_view(request: HttpRequest, product_id: str) -> JsonResponse:
+    """상품 일별 재고 집계. ?day_from=YYYY-MM-DD&day_to=YYYY-MM-DD (둘 다 포함)"""
+    # parse
+    day_from = _parse_day(request, "day_from")
+    day_to = _parse_day(request, "day_to")
+
+    # execute
+    usecase = GetStockDailyRollupsUsecase(
+        product_persistence_adapter=DjangoORMPersistenceAdapter()
+    )
+    rollups = usecase.execute(product_id, day_from, day_to)
+
+    # resp
+    return JsonResponse(
+        {"days": [rollup.model_dump(mode="json") for rollup in rollups]}
+    )
+
+
+@require_http_methods(["GET"])
+def get_top_outbound_products_view(request: HttpRequest) -> JsonResponse:
+    """하루 출고량 상위 상품. ?day=YYYY-MM-DD&limit=20"""
+    # parse
+    day = _parse_day(request, "day")
+    try:
+        limit = int(request.GET.get("limit", 20))
+    except ValueError as e:
+        raise InvalidParameter("limit") from e
+
+    # execute
+    usecase = GetTopOutboundProductsUsecase(
+        product_persistence_adapter=DjangoORMPersistenceAdapter()
+    )
+    rollups = usecase.execute(day, limit)
+
+    # resp
+    return JsonResponse(
+        {
+            "day": day.isoformat(),
+            "products": [rollup.model_dump(mode="json") for rollup in rollups],
+        }
+    )
+
+
+@require_http_methods(["GET"])
+async def stream_product_stock_view(request: HttpRequest) -> StreamingHttpResponse:
+    """
+    재고 변경 SSE 스트림 (polling 대체). ?product_ids=a,b,c
+    연결 직후 현재 재고를 먼저 보내고, 이후 커밋된 변경을 전달
+    """
+    # WSGI 에서는 끝나지 않는 스트림을 전부 읽은 뒤 응답하므로 (워커 하나를 계속 점유) ASGI 로만 제공
+    if not isinstance(request, ASGIRequest):
+        raise StreamingNotSupported
+    # parse
+    product_ids = [pid for pid in request.GET.get("product_ids", "").split(",") if pid]
+    if not product_ids:
+        raise ParameterRequired("product_ids")
+
+    # execute (스냅샷 조회 전에 구독해야 그 사이의 변경을 놓치지 않음, 중복은 version 으로 걸러짐)
+    subscription = stock_broker.subscribe(product_ids)
+    try:
+        adapter = CachedProductPersistenceAdapter(DjangoORMPersistenceAdapter())
+        snapshot = await sync_to_async(adapter.get_last_stock_events)(product_ids)
+    except BaseException:
+        subscription.close()
+        raise
+    for stock_event in snapshot.values():
+        subscription.offer(StockUpdate.from_event(stock_event))
+
+    async def _events():  # type: ignore[no-untyped-def]
+        try:
+            async for message in subscription.messages():
+                yield message
+        finally:
+            subscription.close()
+
+    # resp
+    response = StreamingHttpResponse(_events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # nginx 등 프록시가 응답을 버퍼링하지 않도록
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @require_http_methods(["POST"])
 @parse_json_form_body
 def upsert_product_discount_view(
@@ -148,7 +470,9 @@ def upsert_product_discount_view(
 
     # execute
     usecase = UpsertProductDiscountUsecase(
-        product_persistence_adapter=DjangoORMPersistenceAdapter(),
+        product_persistence_adapter=CachedProductPersistenceAdapter(
+            DjangoORMPersistenceAdapter()
+        ),
     )
     discount = usecase.execute(
         UpsertProductDiscountUsecase.Cmd(
@@ -172,6 +496,153 @@ def upsert_product_discount_view(
 
 @require_http_methods(["POST"])
 @parse_json_form_body
+def bulk_upsert_product_discount_view(
+    request: HttpRequest, payload: dict[str, Any]
+) -> JsonResponse:
+    """
+    여러 상품에 같은 할인 적용 (product_ids 또는 product_name 필터)
+    완료될 때까지 응답하지 않으므로, 진행 상황은 같은 job_id 로 GET 해서 확인
+    """
+    # parse
+    percentage = get_or_raise(payload, "percentage")
+    try:
+        start_date = (
+            parse_datetime_with_default(str(payload["start_date"]))
+            if payload.get("start_date")
+            else timezone.now()
+        )
+        end_date = (
+            parse_datetime_with_default(str(payload["end_date"]))
+            if payload.get("end_date")
+            else start_date + timedelta(days=30)
+        )
+    except ValueError as e:
+        raise InvalidParameter("start_date, end_date") from e
+    job_id = str(payload.get("job_id") or new_id())
+    job_key = _bulk_discount_job_key(job_id)
+    job: dict[str, Any] = {"job_id": job_id, "status": "running"}
+    # 다른 작업의 진행 상황을 덮어쓰지 않도록 이미 있는 job_id 는 거절 (실패한 작업의 재시도는 허용)
+    if not _bulk_discount_jobs.add(job_key, job, _BULK_DISCOUNT_JOB_TTL):
+        existing = _bulk_discount_jobs.get(job_key)
+        if existing is not MISSING and existing.get("status") != "failed":
+            raise Duplicated("job_id")
+        _bulk_discount_jobs.set(job_key, job, _BULK_DISCOUNT_JOB_TTL)
+
+    def _save(
+        progress: BulkUpsertProductDiscountUsecase.Progress | None = None,
+        **updates: Any,
+    ) -> None:
+        if progress is not None:
+            job.update(progress.model_dump())
+        job.update(updates)
+        _bulk_discount_jobs.set(job_key, job, _BULK_DISCOUNT_JOB_TTL)
+
+    # execute
+    usecase = BulkUpsertProductDiscountUsecase(
+        product_persistence_adapter=CachedProductPersistenceAdapter(
+            DjangoORMPersistenceAdapter()
+        ),
+    )
+    try:
+        result = usecase.execute(
+            BulkUpsertProductDiscountUsecase.Cmd(
+                product_ids=payload.get("product_ids"),
+                product_name=payload.get("product_name"),
+                percentage=percentage,
+                start_date=start_date,
+                end_date=end_date,
+            ),
+            on_progress=_save,
+        )
+    except Exception:
+        _save(status="failed")
+        raise
+    _save(result, status="done")
+
+    # resp
+    return JsonResponse(job)
+
+
+@require_http_methods(["GET"])
+def get_bulk_discount_job_view(request: HttpRequest, job_id: str) -> JsonResponse:
+    if (job := _bulk_discount_jobs.get(_bulk_discount_job_key(job_id))) is MISSING:
+        raise NotFound(f"bulk discount job {job_id}")
+    return JsonResponse(job)
+
+
+@require_http_methods(["POST"])
+@parse_json_form_body
+def quote_checkout_view(request: HttpRequest, payload: dict[str, Any]) -> JsonResponse:
+    """장바구니 주문 견적. {"lines": [{"product_id": ..., "quantity": ...}]}"""
+    # parse
+    lines = _parse_cart_lines(payload)
+
+    # execute
+    usecase = QuoteCheckoutUsecase(
+        product_persistence_adapter=CachedProductPersistenceAdapter(
+            DjangoORMPersistenceAdapter()
+        ),
+        calc_product_discount_service=CalcProductDiscountService(),
+    )
+    user_id = str(request.user.id) if request.user.is_authenticated else "anonymous"  # type: ignore
+    quote = usecase.execute(user_id=user_id, lines=lines)
+
+    # resp
+    return JsonResponse(CheckoutQuoteDTO(quote=quote).to_dict())
+
+
+@require_http_methods(["POST"])
+@parse_json_form_body
+def reserve_stock_view(request: HttpRequest, payload: dict[str, Any]) -> JsonResponse:
+    """주문 진행 중 재고 홀드. {"lines": [{"product_id": ..., "quantity": ...}]}"""
+    # parse
+    lines = _parse_cart_lines(payload)
+
+    # execute
+    usecase = ReserveStockUsecase(
+        product_persistence_adapter=CachedProductPersistenceAdapter(
+            DjangoORMPersistenceAdapter()
+        ),
+        reservation_store=get_stock_reservation_store(),
+        ttl=reservation_settings()["TTL_SECONDS"],
+    )
+    reservation = usecase.execute(lines=lines)
+
+    # resp
+    return JsonResponse(
+        {
+            "reservation_id": reservation.id,
+            "quantities": reservation.quantities,
+            "expires_at": reservation.expires_at.isoformat(),
+        }
+    )
+
+
+@require_http_methods(["POST"])
+def confirm_stock_reservation_view(
+    request: HttpRequest, reservation_id: str
+) -> JsonResponse:
+    usecase = ConfirmStockReservationUsecase(
+        reservation_store=get_stock_reservation_store()
+    )
+    usecase.execute(reservation_id)
+    return JsonResponse({"reservation_id": reservation_id, "status": "confirmed"})
+
+
+@require_http_methods(["POST"])
+def release_stock_reservation_view(
+    request: HttpRequest, reservation_id: str
+) -> JsonResponse:
+    usecase = ReleaseStockReservationUsecase(
+        reservation_store=get_stock_reservation_store()
+    )
+    usecase.execute(reservation_id)
+    return JsonResponse({"reservation_id": reservation_id, "status": "released"})
+
+
+@require_http_methods(["POST"])
+@idempotent
+@parse_json_form_body
 def create_cupon_view(request: HttpRequest, payload: dict[str, Any]) -> JsonResponse:
     # 쿠폰 생성은 인증된 사용자만 가능
     if not request.user.is_authenticated:
@@ -184,10 +655,11 @@ def create_cupon_view(request: HttpRequest, payload: dict[str, Any]) -> JsonResp
     code = payload.get("code", f"COUPON_{datetime.now().timestamp()}")
     valid_from = parse_datetime_with_default(str(get_or_raise(payload, "valid_from")))
     valid_to = parse_datetime_with_default(str(get_or_raise(payload, "valid_to")))
-    
 
     # execute
-    product_persistence_adapter = DjangoORMPersistenceAdapter()
+    product_persistence_adapter = CachedProductPersistenceAdapter(
+        DjangoORMPersistenceAdapter()
+    )
     usecase = CreateCuponUsecase(
         product_persistence_adapter=product_persistence_adapter,
     )
@@ -1,4 +1,5 @@
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import date, datetime
 from typing import Protocol
 
 from commerce.domain.entities import (
@@ -6,6 +7,7 @@ from commerce.domain.entities import (
     ProductDiscountEntity,
     ProductEntity,
     ProductStockEventEntity,
+    StockDailyRollupEntity,
 )
 
 
@@ -16,25 +18,129 @@ class IProductPersistenceAdapter(Protocol):
         stock_event: ProductStockEventEntity,
     ) -> tuple[ProductEntity, ProductStockEventEntity]: ...
 
+    # reservation_ids: 이 이벤트로 반영한 확정 예약 (같은 트랜잭션에 기록). 이미 반영된 예약이 있으면 Duplicated
     def create_product_stock_event(
-        self, stock_event: ProductStockEventEntity
+        self, stock_event: ProductStockEventEntity, reservation_ids: Iterable[str] = ()
     ) -> ProductStockEventEntity: ...
 
+    # reservation_ids 중 이미 이 상품의 재고 이벤트로 반영된 예약
+    def get_applied_reservation_ids(
+        self, product_id: str, reservation_ids: Iterable[str]
+    ) -> set[str]: ...
+
     def get_last_stock_event(
         self, product_id: str
     ) -> ProductStockEventEntity | None: ...
 
+    def get_last_stock_events(
+        self, product_ids: Iterable[str]
+    ) -> dict[str, ProductStockEventEntity]:  # product_id -> 마지막 재고 이벤트
+        ...
+
+    # 재고 이력 조회용. version 오름차순으로 after_version 초과 until_version 이하 (keyset)
+    def get_stock_events(
+        self,
+        product_id: str,
+        after_version: int = 0,
+        until_version: int | None = None,
+        limit: int = 100,
+    ) -> list[ProductStockEventEntity]: ...
+
+    # created_at 이후(포함) 첫 재고 이벤트의 version. before 면 created_at 이전 마지막 이벤트. 없으면 None
+    def find_stock_event_version(
+        self, product_id: str, created_at: datetime, before: bool = False
+    ) -> int | None: ...
+
+    # at 시점의 재고 = at 까지 생성된 마지막 version 의 재고 이벤트 (없으면 None). 전체 이력을 읽지 않음
+    def get_stock_event_as_of(
+        self, product_id: str, at: datetime
+    ) -> ProductStockEventEntity | None: ...
+
+    # 재고 일별 집계용. id 가 after_id 초과 before_id 미만인 재고 이벤트 (id 는 시간순이므로 id 오름차순)
+    def get_stock_events_after(
+        self, after_id: str, before_id: str, limit: int
+    ) -> list[ProductStockEventEntity]: ...
+
+    # 증분 배치 작업의 마지막 처리 위치 (없으면 "")
+    def get_checkpoint(self, name: str) -> str: ...
+
+    # checkpoint 를 previous 에서 position 으로 옮김. 다른 작업이 먼저 옮겼으면 DBOptimisticLockError
+    def move_checkpoint(self, name: str, previous: str, position: str) -> None: ...
+
+    # 재고 이벤트 검증용. id 가 after_id 초과 before_id 미만인 이벤트가 있는 상품 -> 그중 가장 작은 version
+    def get_stock_event_min_versions(
+        self, after_id: str, before_id: str
+    ) -> dict[str, int]: ...
+
+    # 상품별 from_versions[product_id] 이상의 재고 이벤트를 (product_id, version) 순서로 chunk_size 개씩 읽으며 반환
+    def iter_stock_events(
+        self, from_versions: Mapping[str, int], chunk_size: int = 1000
+    ) -> Iterator[ProductStockEventEntity]: ...
+
+    # 같은 상품/날짜의 집계에 더하고 checkpoint 를 previous 에서 position 으로 옮김 (한 트랜잭션)
+    # 다른 작업이 먼저 checkpoint 를 옮겼으면 DBOptimisticLockError
+    def add_stock_daily_rollups(
+        self,
+        rollups: Sequence[StockDailyRollupEntity],
+        checkpoint_name: str,
+        previous: str,
+        position: str,
+    ) -> None: ...
+
+    # 날짜 오름차순, day_from ~ day_to (둘 다 포함)
+    def get_stock_daily_rollups(
+        self, product_id: str, day_from: date, day_to: date
+    ) -> list[StockDailyRollupEntity]: ...
+
+    # 하루 감소량(outbound) 상위 상품
+    def get_top_outbound_rollups(
+        self, day: date, limit: int
+    ) -> list[StockDailyRollupEntity]: ...
+
     def create_product_discount(
         self, discount: ProductDiscountEntity, deactivate_others: bool = False
     ) -> ProductDiscountEntity: ...
 
+    def create_product_discounts(
+        self,
+        discounts: Sequence[ProductDiscountEntity],
+        deactivate_others: bool = False,
+    ) -> list[ProductDiscountEntity]:  # 존재하지 않는 상품의 할인은 제외하고 생성
+        ...
+
     def create_cupon(self, cupon: CuponEntity) -> CuponEntity: ...
 
+    # 할인/쿠폰 기간 스케줄러용. 최대 limit 행을 처리하고, 처리한 행마다 product_id(할인) 또는 user_id(쿠폰) 반환
+    def activate_scheduled_discounts(self, now: datetime, limit: int) -> list[str]: ...
+
+    def expire_discounts(self, now: datetime, limit: int) -> list[str]: ...
+
+    def activate_scheduled_cupons(self, now: datetime, limit: int) -> list[str]: ...
+
+    def expire_cupons(self, now: datetime, limit: int) -> list[str]: ...
+
     def get_products(
-        self, product_name: str | None, page_size: int = 30, page_index: int = 1
+        self,
+        product_name: str | None,
+        page_size: int = 30,
+        page_index: int = 1,
+        peek_next: bool = False,
     ) -> Iterable[
         tuple[ProductEntity, Iterable[ProductDiscountEntity], int]
-    ]:  # product, product_discounts, stock_count
+    ]:  # product, product_discounts, stock_count. peek_next 면 다음 페이지 확인용으로 최대 1개 더 반환
+        ...
+
+    def count_products(self, product_name: str | None) -> int: ...
+
+    # COUNT(*) 없이 구할 수 있는 상품 수 (유지되는 카운터, 캐시된 집계). 모르면 None
+    def estimate_product_count(self, product_name: str | None) -> int | None: ...
+
+    # 상품 수 카운터를 실제 상품 수로 다시 맞추고 반환
+    def sync_product_count(self) -> int: ...
+
+    def get_product_ids(
+        self, product_name: str | None, chunk_size: int = 1000
+    ) -> Iterable[list[str]]:  # id 오름차순, chunk_size 개씩
         ...
 
     def get_product(
@@ -44,6 +150,37 @@ class IProductPersistenceAdapter(Protocol):
     ]:  # product, product_discounts
         ...
 
+    def get_products_by_ids(
+        self, product_ids: Iterable[str]
+    ) -> dict[
+        str, tuple[ProductEntity, list[ProductDiscountEntity]]
+    ]:  # product_id -> (product, product_discounts), 없는 상품은 제외
+        ...
+
     def get_cupons(self, user_id: str) -> Iterable[CuponEntity]: ...
 
     def is_user_exist(self, user_id: str) -> bool: ...
+
+
+class IStockReservationStore(Protocol):
+    def reserve(
+        self,
+        reservation_id: str,
+        quantities: Mapping[str, int],
+        totals: Mapping[str, int],
+        ttl: float,
+    ) -> list[
+        str
+    ]:  # 가능 수량(total - 유효한 홀드)이 부족한 product_id, 있으면 아무것도 홀드하지 않음
+        ...
+
+    def release(self, reservation_id: str) -> bool: ...  # 만료/확정된 예약이면 False
+
+    def confirm(self, reservation_id: str) -> bool: ...  # 만료된 예약이면 False
+
+    def claim_confirmed(
+        self, limit: int
+    ) -> dict[str, dict[str, int]]:  # product_id -> reservation_id -> 수량
+        ...
+
+    def ack(self, product_id: str, reservation_ids: Iterable[str]) -> None: ...
@@ -7,8 +7,10 @@ from commerce.domain.entities import (
     ProductEntity,
 )
 from common.exceptions import ServiceException
+from common.instrumentation import instrument_service
 
 
+@instrument_service
 class CalcProductDiscountService:
     def execute(
         self,
@@ -1,29 +1,46 @@
-from collections.abc import Iterable
-from datetime import datetime
+import logging
+from collections.abc import Callable, Iterable
+from datetime import date, datetime
 
+from asgiref.sync import sync_to_async
 from django.utils import timezone
 from pydantic import BaseModel
-from retry import retry
 
 from commerce.app.ports.interfaces import (
     IProductPersistenceAdapter,
+    IStockReservationStore,
 )
 from commerce.app.services import CalcProductDiscountService
 from commerce.domain.entities import (
+    CheckoutQuote,
     CuponEntity,
     ProductDiscountEntity,
     ProductEntity,
     ProductStockEventEntity,
     ProductWithDiscountInfo,
+    QuoteLine,
+    StockDailyRollupEntity,
+    StockEventIssue,
+    StockReservationEntity,
 )
-from commerce.domain.exceptions import InvalidStockChange
+from commerce.domain.exceptions import InsufficientStock, InvalidStockChange
+from common import metrics
 from common.exceptions import (
     DBOptimisticLockError,
+    Duplicated,
     InvalidParameter,
+    MillyException,
+    NotFound,
+    ParameterRequired,
     ServiceException,
 )
+from common.instrumentation import instrument_usecase
+from common.retry import RetryPolicy
 
+logger = logging.getLogger(__name__)
 
+
+@instrument_usecase
 class CreateProductUsecase:
     class Cmd(BaseModel):
         name: str
@@ -57,20 +74,40 @@ class CreateProductUsecase:
         return self._product_persistence_adapter.create_product(product, stock)
 
 
+@instrument_usecase
 class UpdateProductStockUsecase:
+    # 같은 상품에 대한 낙관적 잠금 충돌은 jitter 를 두고 재시도 (상품별 충돌률에 따라 횟수 조정)
+    retry_policy = RetryPolicy(
+        name="UpdateProductStockUsecase", exceptions=(DBOptimisticLockError,)
+    )
+
     def __init__(
         self,
         product_persistence_adapter: IProductPersistenceAdapter,
     ):
         self._product_persistence_adapter = product_persistence_adapter
 
-    @retry(
-        tries=3,
-        delay=0.2,
-        backoff=2,
-        exceptions=(DBOptimisticLockError,),
-    )
-    def execute(self, product_id: str, change: int) -> ProductStockEventEntity:
+    def execute(
+        self, product_id: str, change: int, reservation_ids: Iterable[str] = ()
+    ) -> ProductStockEventEntity:
+        return self.retry_policy.run(
+            product_id,
+            lambda: self._update_stock(product_id, change, reservation_ids),
+        )
+
+    async def aexecute(self, product_id: str, change: int) -> ProductStockEventEntity:
+        """ASGI 용. 재시도 대기 동안 이벤트 루프를 막지 않음"""
+        update_stock = sync_to_async(self._update_stock)
+        return await self.retry_policy.arun(
+            product_id, lambda: update_stock(product_id, change)
+        )
+
+    @metrics.OPTIMISTIC_LOCK_CONFLICTS.labels(
+        "UpdateProductStockUsecase"
+    ).count_exceptions(DBOptimisticLockError)
+    def _update_stock(
+        self, product_id: str, change: int, reservation_ids: Iterable[str] = ()
+    ) -> ProductStockEventEntity:
         if not (
             last_stock_event := self._product_persistence_adapter.get_last_stock_event(
                 product_id
@@ -87,9 +124,12 @@ class UpdateProductStockUsecase:
             total_after_change=last_stock_event.total_after_change + change,
             version=last_stock_event.version + 1,
         )
-        return self._product_persistence_adapter.create_product_stock_event(stock)
+        return self._product_persistence_adapter.create_product_stock_event(
+            stock, reservation_ids
+        )
 
 
+@instrument_usecase
 class UpsertProductDiscountUsecase:
     class Cmd(BaseModel):
         product_id: str
@@ -104,17 +144,97 @@ class UpsertProductDiscountUsecase:
         self._product_persistence_adapter = product_persistence_adapter
 
     def execute(self, cmd: Cmd) -> ProductDiscountEntity:
+        # 시작 전인 할인은 예약만 하고 기존 할인을 유지 (시작 시각에 스케줄러가 교체)
+        scheduled = cmd.start_date > timezone.now()
         discount = ProductDiscountEntity.create(
             product_id=cmd.product_id,
             percentage=cmd.percentage,
             start_date=cmd.start_date,
             end_date=cmd.end_date,
+            scheduled=scheduled,
         )
         return self._product_persistence_adapter.create_product_discount(
-            discount, deactivate_others=True
+            discount, deactivate_others=not scheduled
         )
 
 
+@instrument_usecase
+class BulkUpsertProductDiscountUsecase:
+    """
+    여러 상품(id 목록 또는 상품명 필터)에 같은 할인을 적용
+    - chunk 단위 트랜잭션 (기존 할인 비활성화 UPDATE 1번 + bulk INSERT 1번) 으로 나눠서 테이블을 오래 잠그지 않음
+    - 중간에 실패하면 이전 chunk 까지만 반영됨. 같은 요청을 다시 실행해도 결과는 같음
+    """
+
+    class Cmd(BaseModel):
+        product_ids: list[str] | None = None
+        product_name: str | None = None
+        percentage: float
+        start_date: datetime
+        end_date: datetime
+
+    class Progress(BaseModel):
+        total: int
+        processed: int = 0
+        # 존재하지 않는 상품은 processed 에만 포함
+        applied: int = 0
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+        chunk_size: int = 1000,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+        self._chunk_size = chunk_size
+
+    def execute(
+        self, cmd: Cmd, on_progress: Callable[[Progress], None] | None = None
+    ) -> Progress:
+        if not 0 < cmd.percentage <= 100:
+            raise InvalidParameter("percentage must be between 0 and 100.")
+        if cmd.start_date >= cmd.end_date:
+            raise InvalidParameter("discount period is invalid.")
+
+        chunks: Iterable[list[str]]
+        if cmd.product_ids:
+            product_ids = list(dict.fromkeys(cmd.product_ids))
+            total = len(product_ids)
+            chunks = (
+                product_ids[i : i + self._chunk_size]
+                for i in range(0, total, self._chunk_size)
+            )
+        elif cmd.product_name:
+            total = self._product_persistence_adapter.count_products(cmd.product_name)
+            chunks = self._product_persistence_adapter.get_product_ids(
+                cmd.product_name, self._chunk_size
+            )
+        else:
+            raise ParameterRequired("product_ids or product_name")
+
+        progress = self.Progress(total=total)
+        scheduled = cmd.start_date > timezone.now()
+        for chunk in chunks:
+            discounts = [
+                ProductDiscountEntity.create(
+                    product_id=product_id,
+                    percentage=cmd.percentage,
+                    start_date=cmd.start_date,
+                    end_date=cmd.end_date,
+                    scheduled=scheduled,
+                )
+                for product_id in chunk
+            ]
+            created = self._product_persistence_adapter.create_product_discounts(
+                discounts, deactivate_others=not scheduled
+            )
+            progress.processed += len(chunk)
+            progress.applied += len(created)
+            if on_progress is not None:
+                on_progress(progress)
+        return progress
+
+
+@instrument_usecase
 class CreateCuponUsecase:
     class Cmd(BaseModel):
         user_id: str
@@ -141,10 +261,65 @@ class CreateCuponUsecase:
             discount_percentage=cmd.discount_percentage,
             valid_from=cmd.valid_from,
             valid_to=cmd.valid_to,
+            scheduled=cmd.valid_from > timezone.now(),
         )
         return self._product_persistence_adapter.create_cupon(cupon)
 
 
+@instrument_usecase
+class SyncPromotionWindowsUsecase:
+    """
+    시작/종료 시각이 지난 할인/쿠폰의 active 플래그 갱신 (sync_promotion_windows 명령에서 주기적으로 실행)
+    - batch_size 행씩 트랜잭션을 나눠서, 처리할 행이 없을 때까지 반복
+    """
+
+    class Result(BaseModel):
+        discounts_expired: int = 0
+        discounts_activated: int = 0
+        cupons_expired: int = 0
+        cupons_activated: int = 0
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+        batch_size: int = 500,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+        self._batch_size = batch_size
+
+    def execute(self, now: datetime | None = None) -> Result:
+        now = now or timezone.now()
+        adapter = self._product_persistence_adapter
+        return self.Result(
+            discounts_expired=self._drain(
+                adapter.expire_discounts, now, "discount", "expire"
+            ),
+            discounts_activated=self._drain(
+                adapter.activate_scheduled_discounts, now, "discount", "activate"
+            ),
+            cupons_expired=self._drain(adapter.expire_cupons, now, "cupon", "expire"),
+            cupons_activated=self._drain(
+                adapter.activate_scheduled_cupons, now, "cupon", "activate"
+            ),
+        )
+
+    def _drain(
+        self,
+        step: Callable[[datetime, int], list[str]],
+        now: datetime,
+        target: str,
+        transition: str,
+    ) -> int:
+        processed = 0
+        while True:
+            owners = step(now, self._batch_size)
+            processed += len(owners)
+            metrics.WINDOW_TRANSITIONS.labels(target, transition).inc(len(owners))
+            if len(owners) < self._batch_size:
+                return processed
+
+
+@instrument_usecase
 class GetProductsUsecase:
     class DTO(BaseModel):
         product: ProductEntity
@@ -160,28 +335,95 @@ class GetProductsUsecase:
         self._product_persistence_adapter = product_persistence_adapter
         self._calc_product_discount_service = calc_product_discount_service
 
+    class Page(BaseModel):
+        items: list["GetProductsUsecase.DTO"]
+        has_next: bool
+        # with_total 이 아니거나 아직 집계되지 않았으면 None
+        total: int | None = None
+
     def execute(
         self, product_name: str | None, page_size: int = 30, page_index: int = 1
     ) -> Iterable[DTO]:
-        for (
-            product,
-            product_discounts,
-            stock_count,
-        ) in self._product_persistence_adapter.get_products(
-            product_name, page_size, page_index
-        ):
+        return self.execute_page(product_name, page_size, page_index).items
+
+    def execute_page(
+        self,
+        product_name: str | None,
+        page_size: int = 30,
+        page_index: int = 1,
+        with_total: bool = False,
+    ) -> Page:
+        # 1개 더 조회해서 다음 페이지 여부 확인 (빈 페이지를 받을 때까지 요청하지 않도록)
+        rows = list(
+            self._product_persistence_adapter.get_products(
+                product_name, page_size, page_index, peek_next=True
+            )
+        )
+        items = []
+        for product, product_discounts, stock_count in rows[:page_size]:
             discount_amount = self._calc_product_discount_service.execute(
                 product, product_discounts
             )
-            total_amount = product.price - discount_amount
-            yield self.DTO(
-                product=product,
-                product_discount_amount=discount_amount,
-                total_amount=total_amount,
-                stock_count=stock_count,
+            items.append(
+                self.DTO(
+                    product=product,
+                    product_discount_amount=discount_amount,
+                    total_amount=product.price - discount_amount,
+                    stock_count=stock_count,
+                )
             )
+        total = (
+            self._product_persistence_adapter.estimate_product_count(product_name)
+            if with_total
+            else None
+        )
+        return self.Page(items=items, has_next=len(rows) > page_size, total=total)
+
+
+def _best_cupon(
+    product_persistence_adapter: IProductPersistenceAdapter, user_id: str
+) -> CuponEntity | None:
+    """사용 가능한 쿠폰 중 할인율이 가장 큰 쿠폰 (인증된 사용자만)"""
+    if user_id == "anonymous" or not user_id.isdigit():
+        return None
+    now = timezone.now()
+    return max(
+        (
+            cupon
+            for cupon in product_persistence_adapter.get_cupons(user_id)
+            if cupon.active and cupon.valid_from <= now <= cupon.valid_to
+        ),
+        key=lambda c: c.discount_percentage,
+        default=None,
+    )
 
 
+def _price_with_cupon(
+    calc_product_discount_service: CalcProductDiscountService,
+    product: ProductEntity,
+    product_discounts: Iterable[ProductDiscountEntity],
+    cupon: CuponEntity | None,
+) -> ProductWithDiscountInfo:
+    # 제품 기본 할인 계산
+    product_discount_amount = calc_product_discount_service.execute(
+        product, product_discounts
+    )
+    # 쿠폰 할인은 기본 할인이 적용된 금액 기준
+    cupon_discount_amount = (product.price - product_discount_amount) * (
+        cupon.discount_percentage / 100 if cupon else 0
+    )
+
+    # 최종 결제 금액 계산
+    final_price = product.price - product_discount_amount - cupon_discount_amount
+    return ProductWithDiscountInfo(
+        product=product,
+        product_discount_amount=product_discount_amount,
+        cupon_discount_amount=cupon_discount_amount,
+        final_price=final_price,
+    )
+
+
+@instrument_usecase
 class GetProductWithCuponDiscountUsecase:
     def __init__(
         self,
@@ -199,36 +441,633 @@ class GetProductWithCuponDiscountUsecase:
         product, product_discounts = self._product_persistence_adapter.get_product(
             product_id
         )
-        # 제품 기본 할인 계산
-        product_discount_amount = self._calc_product_discount_service.execute(
-            product, product_discounts
+        return _price_with_cupon(
+            self._calc_product_discount_service,
+            product,
+            product_discounts,
+            _best_cupon(self._product_persistence_adapter, user_id),
+        )
+
+
+@instrument_usecase
+class GetProductsWithCuponDiscountUsecase:
+    """
+    여러 상품의 상세 가격 (장바구니/위시리스트)
+    상품/할인/쿠폰을 상품 수와 무관한 쿼리 수로 조회하고 쿠폰은 한 번만 선택
+    """
+
+    max_products = 100
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+        calc_product_discount_service: CalcProductDiscountService,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+        self._calc_product_discount_service = calc_product_discount_service
+
+    def execute(
+        self, user_id: str, product_ids: Iterable[str]
+    ) -> tuple[list[ProductWithDiscountInfo], list[str]]:  # 요청 순서대로, 없는 상품 id
+        product_ids = list(dict.fromkeys(product_ids))
+        if len(product_ids) > self.max_products:
+            raise InvalidParameter(f"up to {self.max_products} products.")
+
+        products = self._product_persistence_adapter.get_products_by_ids(product_ids)
+        cupon = (
+            _best_cupon(self._product_persistence_adapter, user_id)
+            if products
+            else None
+        )
+        results, not_found = [], []
+        for product_id in product_ids:
+            if product_id not in products:
+                not_found.append(product_id)
+                continue
+            product, discounts = products[product_id]
+            results.append(
+                _price_with_cupon(
+                    self._calc_product_discount_service, product, discounts, cupon
+                )
+            )
+        return results, not_found
+
+
+class CartLine(BaseModel):
+    product_id: str
+    quantity: int
+
+
+def _merge_lines(lines: Iterable[CartLine], max_lines: int) -> dict[str, int]:
+    """같은 상품이 여러 줄이면 수량 합산"""
+    quantities: dict[str, int] = {}
+    for line in lines:
+        if line.quantity <= 0:
+            raise InvalidParameter("quantity must be greater than 0.")
+        quantities[line.product_id] = quantities.get(line.product_id, 0) + line.quantity
+    if not quantities:
+        raise ParameterRequired("lines")
+    if len(quantities) > max_lines:
+        raise InvalidParameter(f"up to {max_lines} products.")
+    return quantities
+
+
+@instrument_usecase
+class QuoteCheckoutUsecase:
+    """
+    장바구니 주문 견적 (재고 확인 + 상품 할인 + 최대 할인 쿠폰)
+    상품/할인/재고/쿠폰을 한 번에 조회한 뒤 한 번 순회해서 계산 (장바구니 크기와 무관한 쿼리 수)
+    """
+
+    max_lines = 100
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+        calc_product_discount_service: CalcProductDiscountService,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+        self._calc_product_discount_service = calc_product_discount_service
+
+    def execute(self, user_id: str, lines: Iterable[CartLine]) -> CheckoutQuote:
+        quantities = _merge_lines(lines, self.max_lines)
+        adapter = self._product_persistence_adapter
+        products = adapter.get_products_by_ids(quantities)
+        if missing := [pid for pid in quantities if pid not in products]:
+            raise NotFound(f"products {', '.join(missing)}")
+        stock_events = adapter.get_last_stock_events(quantities)
+        cupon = _best_cupon(adapter, user_id)
+
+        quote_lines = []
+        insufficient = []
+        for product_id, quantity in quantities.items():
+            stock_event = stock_events.get(product_id)
+            if stock_event is None or stock_event.total_after_change < quantity:
+                insufficient.append(product_id)
+                continue
+            product, discounts = products[product_id]
+            price = _price_with_cupon(
+                self._calc_product_discount_service, product, discounts, cupon
+            )
+            quote_lines.append(
+                QuoteLine(
+                    product=product,
+                    quantity=quantity,
+                    product_discount_amount=price.product_discount_amount * quantity,
+                    cupon_discount_amount=price.cupon_discount_amount * quantity,
+                    line_total=price.final_price * quantity,
+                )
+            )
+        if insufficient:
+            raise InsufficientStock(f"products {', '.join(insufficient)}")
+
+        return CheckoutQuote(
+            lines=quote_lines,
+            cupon=cupon,
+            subtotal=sum(line.product.price * line.quantity for line in quote_lines),
+            product_discount_total=sum(
+                line.product_discount_amount for line in quote_lines
+            ),
+            cupon_discount_total=sum(
+                line.cupon_discount_amount for line in quote_lines
+            ),
+            total=sum(line.line_total for line in quote_lines),
+        )
+
+
+@instrument_usecase
+class ReserveStockUsecase:
+    """
+    주문 진행 중 재고 홀드 (재고 이벤트를 쓰지 않고 TTL 동안만 유지)
+    예약 가능 수량 = 마지막 재고 이벤트의 total - 유효한 홀드 합계
+    """
+
+    max_lines = 100
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+        reservation_store: IStockReservationStore,
+        ttl: float,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+        self._reservation_store = reservation_store
+        self._ttl = ttl
+
+    def execute(self, lines: Iterable[CartLine]) -> StockReservationEntity:
+        quantities = _merge_lines(lines, self.max_lines)
+        stock_events = self._product_persistence_adapter.get_last_stock_events(
+            quantities
+        )
+        if missing := [pid for pid in quantities if pid not in stock_events]:
+            raise NotFound(f"products {', '.join(missing)}")
+
+        reservation = StockReservationEntity.create(quantities, self._ttl)
+        if short := self._reservation_store.reserve(
+            reservation.id,
+            quantities,
+            {pid: event.total_after_change for pid, event in stock_events.items()},
+            self._ttl,
+        ):
+            raise InsufficientStock(f"products {', '.join(short)}")
+        return reservation
+
+
+@instrument_usecase
+class ReleaseStockReservationUsecase:
+    def __init__(self, reservation_store: IStockReservationStore):
+        self._reservation_store = reservation_store
+
+    def execute(self, reservation_id: str) -> None:
+        if not self._reservation_store.release(reservation_id):
+            raise NotFound(f"reservation {reservation_id}")
+
+
+@instrument_usecase
+class ConfirmStockReservationUsecase:
+    """확정된 예약은 만료되지 않고 ReconcileStockReservationsUsecase 에서 재고 이벤트로 기록됨"""
+
+    def __init__(self, reservation_store: IStockReservationStore):
+        self._reservation_store = reservation_store
+
+    def execute(self, reservation_id: str) -> None:
+        if not self._reservation_store.confirm(reservation_id):
+            raise NotFound(f"reservation {reservation_id}")
+
+
+@instrument_usecase
+class ReconcileStockReservationsUsecase:
+    """
+    확정된 예약을 모아서 상품별로 재고 이벤트 1개씩 기록 (예약마다 버전을 올리지 않음)
+    - 이벤트 기록 후 ack 하므로, 그 사이에 죽으면 lease 이후 다시 처리됨 (at-least-once)
+    - 반영한 예약 id 를 재고 이벤트와 같은 트랜잭션에 기록해서, 다시 처리될 때는 이미 반영된 예약을 건너뜀
+    - 재고가 부족해서 기록하지 못한 상품은 ack 하지 않고 다음 실행에서 재시도
+    """
+
+    class Result(BaseModel):
+        products: int = 0
+        reservations: int = 0
+        failed_products: list[str] = []
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+        reservation_store: IStockReservationStore,
+        batch_size: int = 500,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+        self._reservation_store = reservation_store
+        self._update_stock = UpdateProductStockUsecase(
+            product_persistence_adapter=product_persistence_adapter
         )
+        self._batch_size = batch_size
+
+    def execute(self) -> Result:
+        result = self.Result()
+        while claimed := self._reservation_store.claim_confirmed(self._batch_size):
+            reservation_ids = set()
+            for product_id, holds in claimed.items():
+                try:
+                    self._apply(product_id, holds)
+                except MillyException:
+                    logger.warning(
+                        "stock reservation reconcile failed",
+                        extra={"product_id": product_id},
+                        exc_info=True,
+                    )
+                    result.failed_products.append(product_id)
+                    continue
+                self._reservation_store.ack(product_id, holds)
+                result.products += 1
+                reservation_ids.update(holds)
+            result.reservations += len(reservation_ids)
+            if result.failed_products:
+                # 실패한 예약은 lease 가 지나야 다시 가져오므로 이번 실행은 종료
+                break
+        return result
 
-        # 사용 가능한 쿠폰 조회 및 최대 할인 쿠폰 선택 (인증된 사용자만)
-        max_discount_cupon = None
-        if user_id != "anonymous" and user_id.isdigit():
-            valid_coupons = (
-                cupon
-                for cupon in self._product_persistence_adapter.get_cupons(user_id)
-                if cupon.active and cupon.valid_from <= timezone.now() <= cupon.valid_to
+    def _apply(self, product_id: str, holds: dict[str, int]) -> None:
+        while True:
+            applied = self._product_persistence_adapter.get_applied_reservation_ids(
+                product_id, holds
             )
-            max_discount_cupon = (
-                max(
-                    valid_coupons,
-                    key=lambda c: c.discount_percentage,
+            if not (
+                pending := {
+                    reservation_id: quantity
+                    for reservation_id, quantity in holds.items()
+                    if reservation_id not in applied
+                }
+            ):
+                return
+            try:
+                self._update_stock.execute(
+                    product_id, -sum(pending.values()), reservation_ids=pending
                 )
-                if valid_coupons
-                else None
+                return
+            except Duplicated:
+                # lease 가 지나 같은 예약을 가져간 다른 실행이 먼저 반영함. 남은 예약만 다시 계산
+                continue
+
+
+@instrument_usecase
+class GetStockHistoryUsecase:
+    """
+    상품 재고 이벤트 이력 (version 오름차순, keyset 페이지네이션)
+    시간 범위는 해당 시각의 version 으로 바꾼 뒤 version 범위로 조회 (이력의 순서는 version 기준)
+    """
+
+    class Query(BaseModel):
+        product_id: str
+        version_from: int | None = None
+        version_to: int | None = None
+        created_from: datetime | None = None
+        # 미포함
+        created_to: datetime | None = None
+
+    class Page(BaseModel):
+        items: list[ProductStockEventEntity]
+        # 다음 페이지 조회에 넘길 cursor (마지막 version), 없으면 마지막 페이지
+        next_cursor: int | None = None
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+
+    def execute(self, query: Query, page_size: int, cursor: int | None = None) -> Page:
+        if page_size <= 0:
+            raise InvalidParameter("page_size must be greater than 0.")
+        if (bounds := self._version_bounds(query)) is None:
+            return self.Page(items=[])
+        return self._page(query.product_id, bounds, page_size, cursor)
+
+    def iter_chunks(
+        self, query: Query, chunk_size: int, cursor: int | None = None
+    ) -> Iterable[list[ProductStockEventEntity]]:
+        """범위 전체를 chunk 단위로 조회 (스트리밍 응답용, 한 번에 메모리에 올리지 않음)"""
+        if chunk_size <= 0:
+            raise InvalidParameter("chunk_size must be greater than 0.")
+        if (bounds := self._version_bounds(query)) is None:
+            return
+        while True:
+            page = self._page(query.product_id, bounds, chunk_size, cursor)
+            if page.items:
+                yield page.items
+            if (cursor := page.next_cursor) is None:
+                return
+
+    def _page(
+        self,
+        product_id: str,
+        bounds: tuple[int, int | None],
+        page_size: int,
+        cursor: int | None,
+    ) -> Page:
+        after_version, until_version = bounds
+        # 1개 더 조회해서 다음 페이지 여부 확인
+        events = self._product_persistence_adapter.get_stock_events(
+            product_id, max(after_version, cursor or 0), until_version, page_size + 1
+        )
+        items = events[:page_size]
+        return self.Page(
+            items=items,
+            next_cursor=items[-1].version if len(events) > page_size else None,
+        )
+
+    def _version_bounds(self, query: Query) -> tuple[int, int | None] | None:
+        """(after_version, until_version). 범위에 이벤트가 없으면 None"""
+        after_version = max((query.version_from or 1) - 1, 0)
+        until_version = query.version_to
+        if query.created_from is not None:
+            first = self._product_persistence_adapter.find_stock_event_version(
+                query.product_id, query.created_from
+            )
+            if first is None:
+                return None
+            after_version = max(after_version, first - 1)
+        if query.created_to is not None:
+            last = self._product_persistence_adapter.find_stock_event_version(
+                query.product_id, query.created_to, before=True
             )
-        cupon_discount_amount = (product.price - product_discount_amount) * (
-            max_discount_cupon.discount_percentage / 100 if max_discount_cupon else 0
+            if last is None:
+                return None
+            until_version = last if until_version is None else min(until_version, last)
+        if until_version is not None and until_version <= after_version:
+            return None
+        return after_version, until_version
+
+
+@instrument_usecase
+class GetStockAsOfUsecase:
+    """과거 시점의 재고 (고객 지원, 정산용). 그 시각까지 생성된 재고 이벤트가 없으면 0"""
+
+    class Result(BaseModel):
+        product_id: str
+        at: datetime
+        stock: int
+        # 기준이 된 재고 이벤트 (없으면 None)
+        version: int | None = None
+        event_created_at: datetime | None = None
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+
+    def execute(self, product_id: str, at: datetime) -> Result:
+        event = self._product_persistence_adapter.get_stock_event_as_of(product_id, at)
+        if event is None:
+            return self.Result(product_id=product_id, at=at, stock=0)
+        return self.Result(
+            product_id=product_id,
+            at=at,
+            stock=event.total_after_change,
+            version=event.version,
+            event_created_at=event.created_at,
         )
 
-        # 최종 결제 금액 계산
-        final_price = product.price - product_discount_amount - cupon_discount_amount
-        return ProductWithDiscountInfo(
-            product=product,
-            product_discount_amount=product_discount_amount,
-            cupon_discount_amount=cupon_discount_amount,
-            final_price=final_price,
+
+@instrument_usecase
+class RollupStockEventsUsecase:
+    """
+    재고 이벤트를 상품별 일별 집계에 증분으로 더함 (rollup_stock_events 명령에서 주기적으로 실행)
+    - checkpoint(마지막으로 더한 이벤트 id) 이후의 이벤트만 읽음. 이벤트 id 는 생성 시각(ms)으로 시작해서 시간순
+    - 아직 커밋되지 않았을 수 있는 최근 lag_seconds 동안의 이벤트는 다음 실행에서 처리
+    - batch_size 개씩 집계와 checkpoint 를 한 트랜잭션에 기록 (중간에 죽어도 두 번 더하지 않음)
+    """
+
+    CHECKPOINT = "stock_daily_rollup"
+
+    class Result(BaseModel):
+        events: int = 0
+        rollups: int = 0
+        checkpoint: str = ""
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+        batch_size: int = 1000,
+        lag_seconds: float = 60.0,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+        self._batch_size = batch_size
+        self._lag_seconds = lag_seconds
+
+    def execute(self, now: datetime | None = None) -> Result:
+        now = now or timezone.now()
+        adapter = self._product_persistence_adapter
+        # 이 시각 이전에 생성된 이벤트의 id 는 모두 이 값보다 작음 (common.utils.new_id)
+        before_id = f"{int((now.timestamp() - self._lag_seconds) * 1000):013d}"
+        result = self.Result(checkpoint=adapter.get_checkpoint(self.CHECKPOINT))
+        while events := adapter.get_stock_events_after(
+            result.checkpoint, before_id, self._batch_size
+        ):
+            rollups = self._aggregate(events)
+            adapter.add_stock_daily_rollups(
+                rollups, self.CHECKPOINT, result.checkpoint, events[-1].id
+            )
+            result.checkpoint = events[-1].id
+            result.events += len(events)
+            result.rollups += len(rollups)
+        return result
+
+    @staticmethod
+    def _aggregate(
+        events: Iterable[ProductStockEventEntity],
+    ) -> list[StockDailyRollupEntity]:
+        rollups: dict[tuple[str, date], StockDailyRollupEntity] = {}
+        for event in events:
+            # 날짜는 settings.TIME_ZONE 기준
+            created_at = (
+                timezone.localtime(event.created_at)
+                if timezone.is_aware(event.created_at)
+                else event.created_at
+            )
+            key = (event.product_id, created_at.date())
+            if (rollup := rollups.get(key)) is None:
+                rollup = rollups[key] = StockDailyRollupEntity(
+                    product_id=event.product_id, day=key[1]
+                )
+            rollup.add_event(event)
+        return list(rollups.values())
+
+
+@instrument_usecase
+class GetStockDailyRollupsUsecase:
+    """상품의 일별 재고 집계 (입고/출고/마감 재고). 원본 이벤트는 읽지 않음"""
+
+    max_days = 366
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+
+    def execute(
+        self, product_id: str, day_from: date, day_to: date
+    ) -> list[StockDailyRollupEntity]:
+        if day_to < day_from:
+            raise InvalidParameter("day_to must not be earlier than day_from.")
+        if (day_to - day_from).days >= self.max_days:
+            raise InvalidParameter(f"date range must be within {self.max_days} days.")
+        return self._product_persistence_adapter.get_stock_daily_rollups(
+            product_id, day_from, day_to
+        )
+
+
+@instrument_usecase
+class GetTopOutboundProductsUsecase:
+    """하루 출고량(재고 감소량) 상위 상품"""
+
+    max_limit = 100
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+
+    def execute(self, day: date, limit: int = 20) -> list[StockDailyRollupEntity]:
+        if not 0 < limit <= self.max_limit:
+            raise InvalidParameter(f"limit must be between 1 and {self.max_limit}.")
+        return self._product_persistence_adapter.get_top_outbound_rollups(day, limit)
+
+
+@instrument_usecase
+class VerifyStockEventsUsecase:
+    """
+    재고 이벤트 체인 검증 (verify_stock_events 명령에서 실행)
+    - 상품별로 version 이 1부터 빠짐없이 이어지는지(gap), 재고가 이전 재고 + change 인지(mismatch),
+      재고가 음수가 아닌지(negative) 확인
+    - 기본은 checkpoint 이후 이벤트가 생긴 상품만, 이미 검증한 직전 version 부터 읽음 (full 이면 전체 상품)
+    - 문제가 있으면 checkpoint 를 옮기지 않으므로 고칠 때까지 다음 실행도 같은 문제로 실패
+    - 상품을 shard_size 개씩 나눈 shard 단위로 검증하므로 shard 를 여러 프로세스에 나눠서 실행할 수 있음
+    """
+
+    CHECKPOINT = "stock_event_verify"
+    # shard 하나에서 내용을 남길 최대 문제 수 (개수는 모두 셈)
+    max_issues = 100
+
+    class ShardResult(BaseModel):
+        products: int = 0
+        events: int = 0
+        issue_count: int = 0
+        issues: list[StockEventIssue] = []
+
+    class Result(BaseModel):
+        shards: int = 0
+        products: int = 0
+        events: int = 0
+        issue_count: int = 0
+        issues: list[StockEventIssue] = []
+        checkpoint: str = ""
+
+    def __init__(
+        self,
+        product_persistence_adapter: IProductPersistenceAdapter,
+        shard_size: int = 1000,
+        chunk_size: int = 1000,
+        lag_seconds: float = 60.0,
+    ):
+        self._product_persistence_adapter = product_persistence_adapter
+        self._shard_size = shard_size
+        self._chunk_size = chunk_size
+        self._lag_seconds = lag_seconds
+
+    def execute(
+        self,
+        full: bool = False,
+        now: datetime | None = None,
+        map_shards: Callable[[list[dict[str, int]]], Iterable[ShardResult]]
+        | None = None,
+    ) -> Result:
+        """map_shards: shard 목록을 받아 verify_shard 결과를 반환 (없으면 이 프로세스에서 차례로 검증)"""
+        now = now or timezone.now()
+        adapter = self._product_persistence_adapter
+        # 이 시각 이전에 생성된 이벤트의 id 는 모두 이 값보다 작음 (common.utils.new_id)
+        before_id = f"{int((now.timestamp() - self._lag_seconds) * 1000):013d}"
+        checkpoint = adapter.get_checkpoint(self.CHECKPOINT)
+        shards = self._shards("" if full else checkpoint, before_id)
+
+        result = self.Result(shards=len(shards), checkpoint=before_id)
+        for shard_result in (map_shards or self._verify_shards)(shards):
+            result.products += shard_result.products
+            result.events += shard_result.events
+            result.issue_count += shard_result.issue_count
+            result.issues += shard_result.issues
+        if result.issue_count:
+            result.checkpoint = checkpoint
+        else:
+            adapter.move_checkpoint(self.CHECKPOINT, checkpoint, before_id)
+        return result
+
+    def verify_shard(self, from_versions: dict[str, int]) -> ShardResult:
+        """from_versions: 상품 -> 읽기 시작할 version (1 보다 크면 이미 검증한 이벤트로 기준으로만 사용)"""
+        result = self.ShardResult()
+
+        def _report(event: ProductStockEventEntity, kind: str, expected: int) -> None:
+            result.issue_count += 1
+            if len(result.issues) < self.max_issues:
+                result.issues.append(
+                    StockEventIssue(
+                        product_id=event.product_id,
+                        version=event.version,
+                        kind=kind,
+                        expected=expected,
+                        actual=event.version
+                        if kind == "gap"
+                        else event.total_after_change,
+                    )
+                )
+
+        previous: ProductStockEventEntity | None = None
+        for event in self._product_persistence_adapter.iter_stock_events(
+            from_versions, self._chunk_size
+        ):
+            if previous is None or previous.product_id != event.product_id:
+                result.products += 1
+                start = from_versions[event.product_id]
+                if event.version != start:
+                    _report(event, "gap", start)
+                elif start > 1:
+                    previous = event
+                    continue
+                elif event.total_after_change != event.change:
+                    _report(event, "mismatch", event.change)
+            elif event.version != previous.version + 1:
+                _report(event, "gap", previous.version + 1)
+            elif event.total_after_change != previous.total_after_change + event.change:
+                _report(event, "mismatch", previous.total_after_change + event.change)
+            if event.total_after_change < 0:
+                _report(event, "negative", 0)
+            result.events += 1
+            previous = event
+        return result
+
+    def _verify_shards(self, shards: list[dict[str, int]]) -> Iterable[ShardResult]:
+        return map(self.verify_shard, shards)
+
+    def _shards(self, after_id: str, before_id: str) -> list[dict[str, int]]:
+        if not after_id:
+            # 처음 실행이거나 full: 전체 상품을 version 1 부터
+            return [
+                dict.fromkeys(product_ids, 1)
+                for product_ids in self._product_persistence_adapter.get_product_ids(
+                    None, self._shard_size
+                )
+            ]
+        # 새 이벤트가 생긴 상품만, 이미 검증한 직전 version 부터 (이어지는지 확인하는 기준)
+        min_versions = self._product_persistence_adapter.get_stock_event_min_versions(
+            after_id, before_id
+        )
+        from_versions = sorted(
+            (product_id, max(version - 1, 1))
+            for product_id, version in min_versions.items()
         )
+        return [
+            dict(from_versions[i : i + self._shard_size])
+            for i in range(0, len(from_versions), self._shard_size)
+        ]
@@ -0,0 +1,371 @@
+"""
+commerce 엔드포인트 부하 테스트 하네스
+
+- in-process 모드: django.test.Client 로 WSGI 핸들러를 직접 호출 (네트워크 없이 미들웨어~DB 까지 측정)
+- http 모드: 떠 있는 서버(base_url)에 urllib 로 요청. 서버와 같은 DB 를 바라보도록 실행해야 세션 쿠키가 유효함
+- 결과는 JSON 으로 출력해서 커밋간 비교 (compare_reports)
+"""
+
+import json
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import connection, connections
+from django.test import Client
+from django.utils import timezone
+
+from commerce.bench.seed import CREATED_PRODUCT_NAME_PREFIX, SeededDataset
+
+# 요청 1건 = (method, path, json body, 로그인 user_id)
+Request = tuple[str, str, dict[str, Any] | None, int | None]
+
+
+@dataclass
+class LoadContext:
+    dataset: SeededDataset
+    hot_products: int
+    rng: random.Random
+
+    def any_product(self) -> str:
+        return self.rng.choice(self.dataset.product_ids)
+
+    def hot_product(self) -> str:
+        return self.rng.choice(self.dataset.product_ids[: self.hot_products])
+
+    def any_user(self) -> int:
+        return self.rng.choice(self.dataset.user_ids)
+
+
+def _browse_list(ctx: LoadContext) -> Request:
+    page_size = 30
+    last_page = max(1, len(ctx.dataset.product_ids) // page_size)
+    path = f"/commerce/products/?page_size={page_size}&page_index={ctx.rng.randint(1, last_page)}"
+    return "GET", path, None, None
+
+
+def _search_list(ctx: LoadContext) -> Request:
+    return (
+        "GET",
+        f"/commerce/products/?product_name={ctx.rng.randint(0, 99)}",
+        None,
+        None,
+    )
+
+
+def _product_detail(ctx: LoadContext) -> Request:
+    return "GET", f"/commerce/products/{ctx.any_product()}/", None, None
+
+
+def _cupon_detail(ctx: LoadContext) -> Request:
+    return "GET", f"/commerce/products/{ctx.any_product()}/", None, ctx.any_user()
+
+
+def _stock_write(ctx: LoadContext) -> Request:
+    # 플래시 세일: 소수의 인기 상품에 쓰기가 몰림, 재고가 고갈되지 않도록 +-1 을 섞음
+    change = ctx.rng.choice([-1, -1, -1, 1])
+    path = f"/commerce/products/{ctx.hot_product()}/stock/"
+    return "POST", path, {"change": change}, None
+
+
+def _discount_write(ctx: LoadContext) -> Request:
+    path = f"/commerce/products/{ctx.any_product()}/discounts/"
+    return "POST", path, {"percentage": round(ctx.rng.uniform(5, 50), 2)}, None
+
+
+def _product_create(ctx: LoadContext) -> Request:
+    body = {
+        "name": f"{CREATED_PRODUCT_NAME_PREFIX}{ctx.rng.getrandbits(32)}",
+        "description": "created by load test",
+        "price": round(ctx.rng.uniform(1000.0, 100000.0), 2),
+        "stock": 100,
+    }
+    return "POST", "/commerce/products/", body, None
+
+
+def _cupon_create(ctx: LoadContext) -> Request:
+    now = timezone.now()
+    body = {
+        "code": f"LOAD-{ctx.rng.getrandbits(40):x}",
+        "discount_percentage": round(ctx.rng.uniform(5, 30), 2),
+        "valid_from": now.isoformat(),
+        "valid_to": (now + timedelta(days=7)).isoformat(),
+    }
+    return "POST", "/commerce/coupons/", body, ctx.any_user()
+
+
+OPERATIONS: dict[str, Callable[[LoadContext], Request]] = {
+    "browse_list": _browse_list,
+    "search_list": _search_list,
+    "product_detail": _product_detail,
+    "cupon_detail": _cupon_detail,
+    "stock_write": _stock_write,
+    "discount_write": _discount_write,
+    "product_create": _product_create,
+    "cupon_create": _cupon_create,
+}
+
+# 트래픽 믹스별 operation 가중치
+MIXES: dict[str, dict[str, int]] = {
+    "browse": {
+        "browse_list": 50,
+        "search_list": 10,
+        "product_detail": 35,
+        "cupon_detail": 5,
+    },
+    "flash_sale": {
+        "stock_write": 70,
+        "product_detail": 25,
+        "browse_list": 5,
+    },
+    "cupon_detail": {
+        "cupon_detail": 70,
+        "product_detail": 15,
+        "browse_list": 10,
+        "cupon_create": 5,
+    },
+    # commerce/urls.py 의 모든 라우트를 고르게 호출
+    "all": dict.fromkeys(OPERATIONS, 1),
+}
+
+
+class InProcessTransport:
+    def __init__(self, session_keys: dict[int, str]):
+        self._session_keys = session_keys
+        self._local = threading.local()
+
+    def _client(self) -> Client:
+        if not hasattr(self._local, "client"):
+            self._local.client = Client(raise_request_exception=False)
+        return self._local.client
+
+    def request(self, method: str, path: str, body: Any, user_id: int | None) -> int:
+        client = self._client()
+        if user_id is None:
+            client.cookies.pop(settings.SESSION_COOKIE_NAME, None)
+        else:
+            client.cookies[settings.SESSION_COOKIE_NAME] = self._session_keys[user_id]
+        if method == "GET":
+            return client.get(path).status_code
+        return client.post(
+            path, data=json.dumps(body), content_type="application/json"
+        ).status_code
+
+
+class HttpTransport:
+    def __init__(self, base_url: str, session_keys: dict[int, str], timeout: float):
+        self._base_url = base_url.rstrip("/")
+        self._session_keys = session_keys
+        self._timeout = timeout
+
+    def request(self, method: str, path: str, body: Any, user_id: int | None) -> int:
+        headers = {"Content-Type": "application/json"}
+        if user_id is not None:
+            headers["Cookie"] = (
+                f"{settings.SESSION_COOKIE_NAME}={self._session_keys[user_id]}"
+            )
+        req = urllib.request.Request(
+            self._base_url + path,
+            data=json.dumps(body).encode() if body is not None else None,
+            headers=headers,
+            method=method,
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self._timeout) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except (urllib.error.URLError, TimeoutError):
+            return 0  # 연결 실패/타임아웃
+
+
+@dataclass
+class OperationStats:
+    latencies: list[float] = field(default_factory=list)  # seconds, 최종 시도 기준
+    ok: int = 0
+    errors: int = 0
+    retries: int = 0
+    status_counts: dict[str, int] = field(default_factory=dict)
+
+    def merge(self, other: "OperationStats") -> None:
+        self.latencies.extend(other.latencies)
+        self.ok += other.ok
+        self.errors += other.errors
+        self.retries += other.retries
+        for status, count in other.status_counts.items():
+            self.status_counts[status] = self.status_counts.get(status, 0) + count
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """nearest-rank 방식 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _summarize(stats: OperationStats, elapsed: float) -> dict[str, Any]:
+    values = sorted(stats.latencies)
+    requests = stats.ok + stats.errors
+    return {
+        "requests": requests,
+        "ok": stats.ok,
+        "errors": stats.errors,
+        "retries": stats.retries,
+        "error_rate": stats.errors / requests if requests else 0.0,
+        "retry_rate": stats.retries / requests if requests else 0.0,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": sum(values) / len(values) * 1000 if values else 0.0,
+            "p50": percentile(values, 50) * 1000,
+            "p95": percentile(values, 95) * 1000,
+            "p99": percentile(values, 99) * 1000,
+            "max": values[-1] * 1000 if values else 0.0,
+        },
+        "status_counts": stats.status_counts,
+    }
+
+
+def _is_retryable(status: int) -> bool:
+    # 게이트웨이처럼 5xx, 연결 실패만 재시도 (4xx 는 클라이언트 오류라 재시도하지 않음)
+    return status == 0 or status >= 500
+
+
+def run_load(
+    dataset: SeededDataset,
+    mix: str = "browse",
+    concurrency: int = 8,
+    duration: float | None = 10.0,
+    total_requests: int | None = None,
+    max_retries: int = 1,
+    hot_products: int = 10,
+    base_url: str | None = None,
+    timeout: float = 10.0,
+    seed: int = 42,
+) -> dict[str, Any]:
+    weights = MIXES[mix]
+    names = list(weights)
+    transport: InProcessTransport | HttpTransport = (
+        HttpTransport(base_url, dataset.session_keys, timeout)
+        if base_url
+        else InProcessTransport(dataset.session_keys)
+    )
+
+    lock = threading.Lock()
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    def _take_ticket() -> bool:
+        nonlocal issued
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        with lock:
+            if total_requests is not None and issued >= total_requests:
+                return False
+            issued += 1
+            return True
+
+    def _worker(worker_id: int) -> dict[str, OperationStats]:
+        ctx = LoadContext(dataset, hot_products, random.Random(seed + worker_id))
+        local_stats: dict[str, OperationStats] = {}
+        try:
+            while _take_ticket():
+                name = ctx.rng.choices(names, weights=[weights[n] for n in names])[0]
+                method, path, body, user_id = OPERATIONS[name](ctx)
+                stats = local_stats.setdefault(name, OperationStats())
+                for attempt in range(max_retries + 1):
+                    started = time.perf_counter()
+                    status = transport.request(method, path, body, user_id)
+                    latency = time.perf_counter() - started
+                    if attempt < max_retries and _is_retryable(status):
+                        stats.retries += 1
+                        continue
+                    break
+                stats.latencies.append(latency)
+                stats.status_counts[str(status)] = (
+                    stats.status_counts.get(str(status), 0) + 1
+                )
+                if 200 <= status < 300:
+                    stats.ok += 1
+                else:
+                    stats.errors += 1
+        finally:
+            # 워커 스레드가 연 DB 커넥션 정리 (in-process 모드)
+            if concurrency > 1:
+                connections.close_all()
+        return local_stats
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        # 단일 워커는 호출한 스레드에서 실행 (테스트 트랜잭션 안에서도 동작하도록)
+        results = [_worker(0)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(_worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    merged: dict[str, OperationStats] = {}
+    total = OperationStats()
+    for worker_stats in results:
+        for name, stats in worker_stats.items():
+            merged.setdefault(name, OperationStats()).merge(stats)
+            total.merge(stats)
+
+    return {
+        "meta": {
+            "mix": mix,
+            "concurrency": concurrency,
+            "duration_s": elapsed,
+            "max_retries": max_retries,
+            "hot_products": hot_products,
+            "products": len(dataset.product_ids),
+            "users": len(dataset.user_ids),
+            "mode": "http" if base_url else "in_process",
+            "db_vendor": connection.vendor,
+            "settings_module": settings.SETTINGS_MODULE,
+        },
+        "total": _summarize(total, elapsed),
+        "operations": {
+            name: _summarize(stats, elapsed) for name, stats in sorted(merged.items())
+        },
+    }
+
+
+def compare_reports(
+    baseline: dict[str, Any], current: dict[str, Any]
+) -> dict[str, dict[str, float]]:
+    """operation 별 throughput, p95, p99, error_rate 변화율(%) 계산"""
+
+    def _delta(before: float, after: float) -> float:
+        return (after - before) / before * 100 if before else 0.0
+
+    diff: dict[str, dict[str, float]] = {}
+    sections = {"total": (baseline["total"], current["total"])}
+    for name, stats in current["operations"].items():
+        if name in baseline["operations"]:
+            sections[name] = (baseline["operations"][name], stats)
+
+    for name, (before, after) in sections.items():
+        diff[name] = {
+            "throughput_rps_pct": _delta(
+                before["throughput_rps"], after["throughput_rps"]
+            ),
+            "p95_ms_pct": _delta(
+                before["latency_ms"]["p95"], after["latency_ms"]["p95"]
+            ),
+            "p99_ms_pct": _delta(
+                before["latency_ms"]["p99"], after["latency_ms"]["p99"]
+            ),
+            "error_rate_diff": after["error_rate"] - before["error_rate"],
+        }
+    return diff
@@ -0,0 +1,215 @@
+"""
+유스케이스 마이크로 벤치마크 (InMemoryPersistenceAdapter 사용, DB 비용 제외)
+
+각 벤치마크는 "<이름>[<크기>]" 키로 1회 호출당 최소 소요 시간(초)을 측정하고,
+baselines.json 과 비교해서 threshold 이상 느려지면 실패로 판단함
+"""
+
+import json
+import random
+import timeit
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from django.utils import timezone
+
+from commerce.adapter.persistence.django_orm.models import Product, ProductDiscount
+from commerce.adapter.persistence.in_memory.in_memory_persistence_adapter import (
+    InMemoryPersistenceAdapter,
+)
+from commerce.adapter.web.dtos import ProductDetailDTO, ProductDTO
+from commerce.app.services import CalcProductDiscountService
+from commerce.app.usecases import (
+    GetProductsUsecase,
+    GetProductWithCuponDiscountUsecase,
+    UpdateProductStockUsecase,
+)
+from commerce.domain.entities import (
+    CuponEntity,
+    ProductDiscountEntity,
+    ProductEntity,
+    ProductStockEventEntity,
+)
+
+DEFAULT_BASELINE_PATH = Path(__file__).with_name("baselines.json")
+DEFAULT_SIZES = (10, 100, 1000)
+USER_ID = "1"
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    seconds_per_call: float
+
+
+@dataclass
+class Regression:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def build_adapter(
+    products: int, cupons: int, seed: int = 42
+) -> InMemoryPersistenceAdapter:
+    """운영 데이터와 비슷한 모양의 데이터셋 (상품당 1~3개 할인 중 1개만 활성, 사용자 쿠폰 n개)"""
+    rng = random.Random(seed)
+    now = timezone.now()
+    adapter = InMemoryPersistenceAdapter()
+    adapter.add_user(USER_ID)
+    for i in range(products):
+        product = ProductEntity.create(
+            name=f"테스트 상품 {i}",
+            description="상품 설명 " * rng.randint(5, 40),
+            price=round(rng.uniform(1000.0, 100000.0), 2),
+        )
+        adapter.create_product(
+            product,
+            ProductStockEventEntity.create(
+                product_id=product.id,
+                change=1000,
+                total_after_change=1000,
+                version=1,
+            ),
+        )
+        for _ in range(rng.randint(1, 3)):
+            adapter.create_product_discount(
+                ProductDiscountEntity.create(
+                    product_id=product.id,
+                    percentage=round(rng.uniform(5.0, 50.0), 2),
+                    start_date=now - timedelta(days=1),
+                    end_date=now + timedelta(days=30),
+                ),
+                deactivate_others=True,
+            )
+    for i in range(cupons):
+        adapter.create_cupon(
+            CuponEntity.create(
+                user_id=USER_ID,
+                code=f"BENCH-{i}",
+                discount_percentage=round(rng.uniform(5.0, 30.0), 2),
+                valid_from=now - timedelta(days=1),
+                valid_to=now + timedelta(days=30),
+            )
+        )
+    return adapter
+
+
+def _benchmarks(size: int) -> dict[str, Callable[[], object]]:
+    adapter = build_adapter(products=size, cupons=size)
+    service = CalcProductDiscountService()
+    products = [p for p, _, _ in adapter.get_products(None, page_size=size)]
+    product_ids = [p.id for p in products]
+    product = products[0]
+    now = timezone.now()
+    discounts = [
+        ProductDiscountEntity.create(
+            product_id=product.id,
+            percentage=float(i % 50 + 1),
+            start_date=now,
+            end_date=now + timedelta(days=1),
+        )
+        for i in range(size)
+    ]
+
+    get_products = GetProductsUsecase(adapter, service)
+    get_detail = GetProductWithCuponDiscountUsecase(adapter, service)
+    update_stock = UpdateProductStockUsecase(adapter)
+    listing = list(get_products.execute(None, page_size=size))
+    detail = get_detail.execute(USER_ID, product.id)
+    orm_products = [Product.from_domain(p) for p in products]
+    for orm_product, p in zip(orm_products, products, strict=True):
+        # DB 저장시 자동 설정되는 값을 채워서 조회 결과와 같은 모양으로 만듦
+        orm_product.created_at, orm_product.updated_at = p.created_at, p.updated_at
+    orm_discounts = [ProductDiscount.from_domain(d) for d in discounts]
+
+    def _to_product_dtos() -> list[dict]:
+        return [
+            ProductDTO(
+                id=r.product.id,
+                name=r.product.name,
+                description=r.product.description,
+                price=r.product.price,
+                stock_count=r.stock_count,
+                discount_amount=r.product_discount_amount,
+                final_price=r.total_amount,
+            ).to_dict()
+            for r in listing
+        ]
+
+    return {
+        # page_size = size
+        "get_products_usecase": lambda: list(
+            get_products.execute(None, page_size=size)
+        ),
+        # 쿠폰 size 개 보유 사용자
+        "get_product_with_cupon_discount_usecase": lambda: get_detail.execute(
+            USER_ID, product.id
+        ),
+        # size 개 상품 중 무작위 상품의 재고 변경
+        "update_product_stock_usecase": lambda: update_stock.execute(
+            product_ids[random.randrange(size)], 1
+        ),
+        # 할인 size 개 중 최대 할인 계산
+        "calc_product_discount_service": lambda: service.execute(product, discounts),
+        "product_dto_conversion": _to_product_dtos,
+        "product_detail_dto_conversion": lambda: ProductDetailDTO(
+            product=detail.product,
+            product_discount_amount=detail.product_discount_amount,
+            cupon_discount_amount=detail.cupon_discount_amount,
+            final_price=detail.final_price,
+        ).to_dict(),
+        "orm_to_domain_conversion": lambda: (
+            [Product.to_domain(p) for p in orm_products],
+            [ProductDiscount.to_domain(d) for d in orm_discounts],
+        ),
+    }
+
+
+def run_benchmarks(
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    repeat: int = 5,
+    min_time: float = 0.05,
+    only: str | None = None,
+) -> list[BenchmarkResult]:
+    results = []
+    for size in sizes:
+        for name, func in _benchmarks(size).items():
+            if only and only not in name:
+                continue
+            timer = timeit.Timer(func)
+            number, _ = timer.autorange()
+            # autorange 는 0.2초 기준이라 min_time 에 맞게 호출 횟수 조정
+            number = max(1, int(number * min_time / 0.2))
+            best = min(timer.repeat(repeat=repeat, number=number)) / number
+            results.append(BenchmarkResult(f"{name}[{size}]", best))
+    return results
+
+
+def load_baselines(path: Path) -> dict[str, float]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_baselines(path: Path, results: list[BenchmarkResult]) -> None:
+    baselines = load_baselines(path)
+    baselines.update({r.name: r.seconds_per_call for r in results})
+    path.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n")
+
+
+def find_regressions(
+    results: list[BenchmarkResult], baselines: dict[str, float], threshold: float
+) -> list[Regression]:
+    return [
+        Regression(r.name, baselines[r.name], r.seconds_per_call)
+        for r in results
+        if r.name in baselines
+        and r.seconds_per_call > baselines[r.name] * (1 + threshold)
+    ]
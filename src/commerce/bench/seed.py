@@ -0,0 +1,156 @@
+"""
+벤치마크용 데이터셋 시딩
+
+- id 는 new_id() 대신 고정 prefix + 일련번호를 사용 (같은 ms 안에서 대량 생성시 충돌 방지)
+- 같은 크기로 다시 실행하면 이미 있는 row 는 건너뛰므로 여러번 실행해도 안전함
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from commerce.adapter.persistence.django_orm.models import (
+    Cupons,
+    Product,
+    ProductDiscount,
+    ProductStockEvents,
+)
+
+PRODUCT_ID_PREFIX = "BP"
+STOCK_EVENT_ID_PREFIX = "BE"
+DISCOUNT_ID_PREFIX = "BD"
+CUPON_ID_PREFIX = "BC"
+USERNAME_PREFIX = "bench_user_"
+# 부하 테스트 중 상품 생성 API 로 만들어진 상품 이름 prefix
+CREATED_PRODUCT_NAME_PREFIX = "loadtest-product-"
+
+INITIAL_STOCK = 1_000_000
+BATCH_SIZE = 1000
+
+
+@dataclass
+class SeededDataset:
+    product_ids: list[str] = field(default_factory=list)
+    user_ids: list[int] = field(default_factory=list)
+    # user_id -> 로그인 세션 키 (쿠폰 적용 상세 조회, 쿠폰 생성에 사용)
+    session_keys: dict[int, str] = field(default_factory=dict)
+
+
+def _bench_id(prefix: str, n: int) -> str:
+    return f"{prefix}{n:016d}"
+
+
+def _create_session(user) -> str:  # type: ignore[no-untyped-def]
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return session.session_key  # type: ignore[return-value]
+
+
+def seed_dataset(
+    products: int = 1000,
+    users: int = 50,
+    cupons_per_user: int = 3,
+    discount_ratio: float = 0.3,
+    seed: int = 42,
+) -> SeededDataset:
+    rng = random.Random(seed)
+    now = timezone.now()
+    product_ids = [_bench_id(PRODUCT_ID_PREFIX, i) for i in range(products)]
+
+    existing = set(
+        Product.objects.filter(id__in=product_ids).values_list("id", flat=True)
+    )
+    missing = [i for i in range(products) if product_ids[i] not in existing]
+
+    with transaction.atomic():
+        for start in range(0, len(missing), BATCH_SIZE):
+            chunk = missing[start : start + BATCH_SIZE]
+            Product.objects.bulk_create(
+                [
+                    Product(
+                        id=product_ids[i],
+                        name=f"벤치 상품 {i}",
+                        description="benchmark product " * rng.randint(1, 8),
+                        price=round(rng.uniform(1000.0, 100000.0), 2),
+                    )
+                    for i in chunk
+                ]
+            )
+            ProductStockEvents.objects.bulk_create(
+                [
+                    ProductStockEvents(
+                        id=_bench_id(STOCK_EVENT_ID_PREFIX, i),
+                        product_id=product_ids[i],
+                        change=INITIAL_STOCK,
+                        total_after_change=INITIAL_STOCK,
+                        version=1,
+                    )
+                    for i in chunk
+                ]
+            )
+            ProductDiscount.objects.bulk_create(
+                [
+                    ProductDiscount(
+                        id=_bench_id(DISCOUNT_ID_PREFIX, i),
+                        product_id=product_ids[i],
+                        percentage=round(rng.uniform(5.0, 50.0), 2),
+                        start_date=now - timedelta(days=1),
+                        end_date=now + timedelta(days=30),
+                        active=True,
+                    )
+                    for i in chunk
+                    if rng.random() < discount_ratio
+                ]
+            )
+
+        User = get_user_model()
+        dataset = SeededDataset(product_ids=product_ids)
+        for n in range(users):
+            user, created = User.objects.get_or_create(username=f"{USERNAME_PREFIX}{n}")
+            if created:
+                user.set_unusable_password()
+                user.save(update_fields=["password"])
+                Cupons.objects.bulk_create(
+                    [
+                        Cupons(
+                            id=_bench_id(CUPON_ID_PREFIX, n * cupons_per_user + k),
+                            user=user,
+                            code=f"BENCH-{n}-{k}",
+                            discount_percentage=round(rng.uniform(5.0, 30.0), 2),
+                            valid_from=now - timedelta(days=1),
+                            valid_to=now + timedelta(days=30),
+                            active=True,
+                        )
+                        for k in range(cupons_per_user)
+                    ]
+                )
+            dataset.user_ids.append(user.pk)
+            dataset.session_keys[user.pk] = _create_session(user)
+    return dataset
+
+
+def delete_dataset() -> None:
+    """시딩한 벤치마크 데이터 삭제 (FK 가 DO_NOTHING 이라 자식부터 지움)"""
+    products = Product.objects.filter(
+        Q(id__startswith=PRODUCT_ID_PREFIX)
+        | Q(name__startswith=CREATED_PRODUCT_NAME_PREFIX)
+    )
+    with transaction.atomic():
+        ProductStockEvents.objects.filter(product__in=products).delete()
+        ProductDiscount.objects.filter(product__in=products).delete()
+        products.delete()
+        get_user_model().objects.filter(username__startswith=USERNAME_PREFIX).delete()
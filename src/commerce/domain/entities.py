@@ -1,4 +1,5 @@
-from datetime import datetime
+import secrets
+from datetime import UTC, date, datetime, timedelta
 
 from pydantic import BaseModel, field_validator
 
@@ -57,6 +58,50 @@ class ProductStockEventEntity(BaseModel):
         )
 
 
+class StockEventIssue(BaseModel):
+    """재고 이벤트 체인 검증에서 발견한 문제 하나"""
+
+    product_id: str
+    version: int
+    kind: str  # gap: version 누락, mismatch: 이전 재고 + change 와 다름, negative: 음수 재고
+    expected: int | None = None
+    actual: int
+
+
+class StockDailyRollupEntity(BaseModel):
+    """상품별 하루 재고 집계 (재고 이벤트를 더해서 만들고, 같은 상품/날짜끼리 합칠 수 있음)"""
+
+    product_id: str
+    day: date
+    inbound: int = 0  # 증가량 합계
+    outbound: int = 0  # 감소량 합계 (양수)
+    closing_total: int = 0  # 그날 마지막 version 의 재고
+    event_count: int = 0
+    last_version: int = 0
+
+    def add_event(self, event: ProductStockEventEntity) -> None:
+        self.merge(
+            StockDailyRollupEntity(
+                product_id=event.product_id,
+                day=self.day,
+                inbound=max(event.change, 0),
+                outbound=max(-event.change, 0),
+                closing_total=event.total_after_change,
+                event_count=1,
+                last_version=event.version,
+            )
+        )
+
+    def merge(self, other: "StockDailyRollupEntity") -> None:
+        # 이벤트가 version 순서로 오지 않아도 마지막 version 의 재고가 남도록
+        self.inbound += other.inbound
+        self.outbound += other.outbound
+        self.event_count += other.event_count
+        if other.last_version > self.last_version:
+            self.closing_total = other.closing_total
+            self.last_version = other.last_version
+
+
 class ProductDiscountEntity(BaseModel):
     id: str
     product_id: str
@@ -64,6 +109,8 @@ class ProductDiscountEntity(BaseModel):
     start_date: datetime
     end_date: datetime
     active: bool
+    # 시작 시각이 지나면 스케줄러가 활성화 (그 전까지 active=False)
+    scheduled: bool = False
 
     @staticmethod
     def create(
@@ -72,6 +119,7 @@ class ProductDiscountEntity(BaseModel):
         start_date: datetime,
         end_date: datetime,
         active: bool = True,
+        scheduled: bool = False,
     ) -> "ProductDiscountEntity":
         return ProductDiscountEntity(
             id=new_id(),
@@ -79,7 +127,8 @@ class ProductDiscountEntity(BaseModel):
             percentage=percentage,
             start_date=start_date,
             end_date=end_date,
-            active=active,
+            active=active and not scheduled,
+            scheduled=scheduled,
         )
 
 
@@ -91,6 +140,8 @@ class CuponEntity(BaseModel):
     valid_from: datetime
     valid_to: datetime
     active: bool
+    # 유효 시작 시각이 지나면 스케줄러가 활성화 (그 전까지 active=False)
+    scheduled: bool = False
 
     @staticmethod
     def create(
@@ -100,6 +151,7 @@ class CuponEntity(BaseModel):
         valid_from: datetime,
         valid_to: datetime,
         active: bool = True,
+        scheduled: bool = False,
     ) -> "CuponEntity":
         return CuponEntity(
             id=new_id(),
@@ -108,7 +160,8 @@ class CuponEntity(BaseModel):
             discount_percentage=discount_percentage,
             valid_from=valid_from,
             valid_to=valid_to,
-            active=active,
+            active=active and not scheduled,
+            scheduled=scheduled,
         )
 
 
@@ -119,3 +172,39 @@ class ProductWithDiscountInfo(BaseModel):
     product_discount_amount: float
     cupon_discount_amount: float
     final_price: float
+
+
+class QuoteLine(BaseModel):
+    """주문 견적의 상품별 금액 (할인 금액은 수량 반영)"""
+
+    product: ProductEntity
+    quantity: int
+    product_discount_amount: float
+    cupon_discount_amount: float
+    line_total: float
+
+
+class CheckoutQuote(BaseModel):
+    """주문 견적 - 도메인 객체"""
+
+    lines: list[QuoteLine]
+    cupon: CuponEntity | None
+    subtotal: float
+    product_discount_total: float
+    cupon_discount_total: float
+    total: float
+
+
+class StockReservationEntity(BaseModel):
+    id: str
+    quantities: dict[str, int]  # product_id -> 수량
+    expires_at: datetime
+
+    @staticmethod
+    def create(quantities: dict[str, int], ttl: float) -> "StockReservationEntity":
+        return StockReservationEntity(
+            # 예약 id 만으로 확정/취소할 수 있으므로 추측할 수 없는 랜덤 토큰을 붙임
+            id=f"{new_id()}-{secrets.token_hex(16)}",
+            quantities=quantities,
+            expires_at=datetime.now(UTC) + timedelta(seconds=ttl),
+        )
@@ -2,3 +2,7 @@ from common.exceptions import ClientException
 
 
 class InvalidStockChange(ClientException): ...
+
+
+class InsufficientStock(ClientException):
+    msg = "Insufficient stock"
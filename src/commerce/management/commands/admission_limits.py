@@ -0,0 +1,48 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from common.admission import get_admission_controller, set_route_overrides
+
+
+class Command(BaseCommand):
+    help = (
+        "쓰기 경로 admission control 한도 조회/변경. "
+        "route(url name) 를 지정하면 override 를 저장하고, 각 프로세스는 RELOAD_SECONDS 안에 반영"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "route", nargs="?", help="url name (예: update-product-stock)"
+        )
+        parser.add_argument("--rate", type=float, help="초당 허용 요청 수")
+        parser.add_argument("--burst", type=float, help="순간 허용 요청 수")
+        parser.add_argument(
+            "--concurrency-per-key",
+            type=int,
+            help="key(예: product_id) 별 동시 실행 수",
+        )
+        parser.add_argument("--key", help="동시 실행 수를 나눌 url kwarg 이름")
+        parser.add_argument(
+            "--reset", action="store_true", help="override 삭제 (settings 값 사용)"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if route := options["route"]:
+            override = {
+                name: options[option]
+                for name, option in [
+                    ("RATE", "rate"),
+                    ("BURST", "burst"),
+                    ("CONCURRENCY_PER_KEY", "concurrency_per_key"),
+                    ("KEY", "key"),
+                ]
+                if options[option] is not None
+            }
+            set_route_overrides(route, None if options["reset"] else override)
+
+        for name, limits in get_admission_controller().routes().items():
+            self.stdout.write(
+                f"{name}: rate={limits.rate} burst={limits.burst} "
+                f"concurrency_per_key={limits.concurrency_per_key} key={limits.key}"
+            )
@@ -0,0 +1,80 @@
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from commerce.bench.micro import (
+    DEFAULT_BASELINE_PATH,
+    DEFAULT_SIZES,
+    find_regressions,
+    load_baselines,
+    run_benchmarks,
+    save_baselines,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "유스케이스 마이크로 벤치마크. baseline 대비 --threshold 이상 느려지면 실패. "
+        "baseline 은 측정 머신마다 다르므로 같은 머신에서 --update-baseline 으로 갱신"
+    )
+    # DB 를 사용하지 않으므로 system check (DB 연결 포함) 생략
+    requires_system_checks: list[str] = []
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--sizes",
+            type=lambda v: tuple(int(x) for x in v.split(",")),
+            default=DEFAULT_SIZES,
+            help="데이터 크기 목록 (콤마 구분)",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--min-time",
+            type=float,
+            default=0.05,
+            help="repeat 1회당 최소 측정 시간(초)",
+        )
+        parser.add_argument(
+            "--only", default=None, help="이름에 포함된 벤치마크만 실행"
+        )
+        parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="허용 성능 저하 비율 (0.25 = 25%%)",
+        )
+        parser.add_argument(
+            "--update-baseline", action="store_true", help="측정 결과로 baseline 갱신"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        results = run_benchmarks(
+            sizes=options["sizes"],
+            repeat=options["repeat"],
+            min_time=options["min_time"],
+            only=options["only"],
+        )
+        baselines = load_baselines(options["baseline"])
+        for result in results:
+            baseline = baselines.get(result.name)
+            change = (
+                f"{(result.seconds_per_call / baseline - 1) * 100:+.1f}%"
+                if baseline
+                else "new"
+            )
+            self.stdout.write(
+                f"{result.name:<55} {result.seconds_per_call * 1e6:12.2f} us  {change}"
+            )
+
+        if options["update_baseline"]:
+            save_baselines(options["baseline"], results)
+            self.stdout.write(f"baseline updated: {options['baseline']}")
+            return
+
+        if regressions := find_regressions(results, baselines, options["threshold"]):
+            raise CommandError(
+                "performance regression: "
+                + ", ".join(f"{r.name} x{r.ratio:.2f}" for r in regressions)
+            )
@@ -0,0 +1,92 @@
+import json
+from pathlib import Path
+from typing import Any
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandParser
+
+from commerce.bench.load import MIXES, compare_reports, run_load
+from commerce.bench.seed import delete_dataset, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "commerce 엔드포인트 부하 테스트. 예) "
+        "DJANGO_SETTINGS_MODULE=common.settings_bench python manage.py loadtest "
+        "--migrate --mix flash_sale --concurrency 16 --duration 30 --output result.json"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--mix", choices=sorted(MIXES), default="browse")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--duration", type=float, default=10.0, help="측정 시간(초)"
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=None,
+            help="총 요청 수 (지정하면 --duration 대신 사용)",
+        )
+        parser.add_argument(
+            "--retries", type=int, default=1, help="5xx/연결 실패시 재시도 횟수"
+        )
+        parser.add_argument(
+            "--hot-products",
+            type=int,
+            default=10,
+            help="flash_sale 재고 쓰기가 몰리는 상품 수",
+        )
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--cupons-per-user", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--migrate", action="store_true", help="시딩 전에 migrate 실행"
+        )
+        parser.add_argument(
+            "--reset", action="store_true", help="기존 벤치마크 데이터를 지우고 시딩"
+        )
+        parser.add_argument(
+            "--base-url",
+            default=None,
+            help="지정하면 실행중인 서버로 HTTP 요청 (미지정시 in-process)",
+        )
+        parser.add_argument("--timeout", type=float, default=10.0)
+        parser.add_argument("--output", type=Path, default=None)
+        parser.add_argument(
+            "--compare", type=Path, default=None, help="비교할 이전 결과 JSON 파일"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["migrate"]:
+            call_command("migrate", verbosity=0)
+        if options["reset"]:
+            delete_dataset()
+
+        dataset = seed_dataset(
+            products=options["products"],
+            users=options["users"],
+            cupons_per_user=options["cupons_per_user"],
+            seed=options["seed"],
+        )
+        report = run_load(
+            dataset,
+            mix=options["mix"],
+            concurrency=options["concurrency"],
+            duration=None if options["requests"] else options["duration"],
+            total_requests=options["requests"],
+            max_retries=options["retries"],
+            hot_products=options["hot_products"],
+            base_url=options["base_url"],
+            timeout=options["timeout"],
+            seed=options["seed"],
+        )
+        if options["compare"]:
+            baseline = json.loads(options["compare"].read_text())
+            report["compare"] = compare_reports(baseline, report)
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            options["output"].write_text(output)
+        self.stdout.write(output)
@@ -0,0 +1,52 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import close_old_connections
+
+from commerce.adapter.persistence.cache.cached_persistence_adapter import (
+    CachedProductPersistenceAdapter,
+)
+from commerce.adapter.persistence.django_orm.django_orm_persistence_adpater import (
+    DjangoORMPersistenceAdapter,
+)
+from commerce.adapter.reservation.stock_reservation_store import (
+    get_stock_reservation_store,
+)
+from commerce.app.usecases import ReconcileStockReservationsUsecase
+
+
+class Command(BaseCommand):
+    help = (
+        "확정된 재고 예약을 상품별 재고 이벤트로 기록. "
+        "기본은 한 번 실행 후 종료 (cron 등), --loop 이면 --interval 초마다 반복"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument(
+            "--interval", type=float, default=5.0, help="--loop 실행 간격(초)"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="한 번에 가져올 확정 예약 수"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        usecase = ReconcileStockReservationsUsecase(
+            product_persistence_adapter=CachedProductPersistenceAdapter(
+                DjangoORMPersistenceAdapter()
+            ),
+            reservation_store=get_stock_reservation_store(),
+            batch_size=options["batch_size"],
+        )
+        while True:
+            result = usecase.execute()
+            self.stdout.write(
+                f"reservations={result.reservations} products={result.products} "
+                f"failed={','.join(result.failed_products) or '-'}"
+            )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+            # 오래 실행되는 프로세스에서 끊어진 DB 커넥션 정리
+            close_old_connections()
@@ -0,0 +1,53 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import close_old_connections
+
+from commerce.adapter.persistence.django_orm.django_orm_persistence_adpater import (
+    DjangoORMPersistenceAdapter,
+)
+from commerce.app.usecases import RollupStockEventsUsecase
+
+
+class Command(BaseCommand):
+    help = (
+        "마지막 checkpoint 이후의 재고 이벤트를 상품별 일별 집계(StockDailyRollup)에 더함. "
+        "기본은 한 번 실행 후 종료 (cron 등), --loop 이면 --interval 초마다 반복"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument(
+            "--interval", type=float, default=60.0, help="--loop 실행 간격(초)"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="트랜잭션 하나에서 집계할 이벤트 수",
+        )
+        parser.add_argument(
+            "--lag-seconds",
+            type=float,
+            default=60.0,
+            help="아직 커밋되지 않았을 수 있으므로 이번 실행에서 제외할 최근 이벤트 구간(초)",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        usecase = RollupStockEventsUsecase(
+            product_persistence_adapter=DjangoORMPersistenceAdapter(),
+            batch_size=options["batch_size"],
+            lag_seconds=options["lag_seconds"],
+        )
+        while True:
+            result = usecase.execute()
+            self.stdout.write(
+                f"events={result.events} rollups={result.rollups} "
+                f"checkpoint={result.checkpoint or '-'}"
+            )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+            # 오래 실행되는 프로세스에서 끊어진 DB 커넥션 정리
+            close_old_connections()
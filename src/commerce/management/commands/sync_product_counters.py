@@ -0,0 +1,21 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from commerce.adapter.persistence.cache.cached_persistence_adapter import (
+    CachedProductPersistenceAdapter,
+)
+from commerce.adapter.persistence.django_orm.django_orm_persistence_adpater import (
+    DjangoORMPersistenceAdapter,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "상품 수 카운터(목록 total)를 실제 상품 수로 다시 맞춤. "
+        "어댑터를 거치지 않고 상품을 추가/삭제한 뒤(데이터 이관 등) 실행"
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        adapter = CachedProductPersistenceAdapter(DjangoORMPersistenceAdapter())
+        self.stdout.write(f"products={adapter.sync_product_count()}")
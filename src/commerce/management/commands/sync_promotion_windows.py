@@ -0,0 +1,50 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import close_old_connections
+
+from commerce.adapter.persistence.cache.cached_persistence_adapter import (
+    CachedProductPersistenceAdapter,
+)
+from commerce.adapter.persistence.django_orm.django_orm_persistence_adpater import (
+    DjangoORMPersistenceAdapter,
+)
+from commerce.app.usecases import SyncPromotionWindowsUsecase
+
+
+class Command(BaseCommand):
+    help = (
+        "시작/종료 시각이 지난 할인, 쿠폰의 active 플래그 갱신 및 상품 캐시 무효화. "
+        "기본은 한 번 실행 후 종료 (cron 등), --loop 이면 --interval 초마다 반복"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument(
+            "--interval", type=float, default=30.0, help="--loop 실행 간격(초)"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="트랜잭션 하나에서 갱신할 행 수"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        usecase = SyncPromotionWindowsUsecase(
+            product_persistence_adapter=CachedProductPersistenceAdapter(
+                DjangoORMPersistenceAdapter()
+            ),
+            batch_size=options["batch_size"],
+        )
+        while True:
+            result = usecase.execute()
+            self.stdout.write(
+                f"discounts expired={result.discounts_expired} "
+                f"activated={result.discounts_activated}, "
+                f"cupons expired={result.cupons_expired} "
+                f"activated={result.cupons_activated}"
+            )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+            # 오래 실행되는 프로세스에서 끊어진 DB 커넥션 정리
+            close_old_connections()
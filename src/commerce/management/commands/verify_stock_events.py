@@ -0,0 +1,92 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any
+
+import django
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections
+
+from commerce.adapter.persistence.django_orm.django_orm_persistence_adpater import (
+    DjangoORMPersistenceAdapter,
+)
+from commerce.app.usecases import VerifyStockEventsUsecase
+
+
+def _verify_shard(
+    from_versions: dict[str, int], chunk_size: int
+) -> VerifyStockEventsUsecase.ShardResult:
+    # 워커 프로세스에서 실행 (프로세스마다 자기 DB 커넥션 사용)
+    return VerifyStockEventsUsecase(
+        product_persistence_adapter=DjangoORMPersistenceAdapter(),
+        chunk_size=chunk_size,
+    ).verify_shard(from_versions)
+
+
+class Command(BaseCommand):
+    help = (
+        "재고 이벤트의 version 누락, 재고 합계 불일치, 음수 재고를 검증. "
+        "기본은 checkpoint 이후 이벤트가 생긴 상품만 검증하고, --full 이면 전체 상품. "
+        "상품 shard 를 --workers 개 프로세스에 나눠서 검증하고, 문제가 있으면 실패로 종료"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--full", action="store_true")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="검증 프로세스 수 (1 이면 이 프로세스에서 검증)",
+        )
+        parser.add_argument(
+            "--shard-size", type=int, default=1000, help="shard 하나의 상품 수"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="한 번에 읽는 재고 이벤트 수",
+        )
+        parser.add_argument(
+            "--lag-seconds",
+            type=float,
+            default=60.0,
+            help="아직 커밋되지 않았을 수 있으므로 이번 실행에서 제외할 최근 이벤트 구간(초)",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        usecase = VerifyStockEventsUsecase(
+            product_persistence_adapter=DjangoORMPersistenceAdapter(),
+            shard_size=options["shard_size"],
+            chunk_size=options["chunk_size"],
+            lag_seconds=options["lag_seconds"],
+        )
+        if options["workers"] > 1:
+            with ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=django.setup
+            ) as pool:
+
+                def _map_shards(
+                    shards: list[dict[str, int]],
+                ) -> list[VerifyStockEventsUsecase.ShardResult]:
+                    # fork 된 워커가 부모 프로세스의 DB 커넥션을 함께 쓰지 않도록 먼저 닫음
+                    connections.close_all()
+                    verify = partial(_verify_shard, chunk_size=options["chunk_size"])
+                    return list(pool.map(verify, shards))
+
+                result = usecase.execute(full=options["full"], map_shards=_map_shards)
+        else:
+            result = usecase.execute(full=options["full"])
+
+        for issue in result.issues:
+            self.stdout.write(
+                f"{issue.kind} product={issue.product_id} version={issue.version} "
+                f"expected={issue.expected} actual={issue.actual}"
+            )
+        self.stdout.write(
+            f"shards={result.shards} products={result.products} "
+            f"events={result.events} issues={result.issue_count} "
+            f"checkpoint={result.checkpoint}"
+        )
+        if result.issue_count:
+            raise CommandError(f"{result.issue_count} stock event issues found")
@@ -0,0 +1,86 @@
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from commerce.adapter.persistence.cache.access_stats import access_stats
+from commerce.adapter.persistence.cache.warmup import Target, WarmupReport, warm_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "최근 조회수 상위 상품/목록 페이지(또는 지정한 상품) 캐시 warm-up. "
+        "완료될 때까지 대기하므로 배포 스크립트에서 트래픽 전환 전에 실행. "
+        "실패가 --max-failures 를 넘으면 0 이 아닌 코드로 종료"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--products", type=int, default=500, help="조회수 상위 상품 수"
+        )
+        parser.add_argument(
+            "--listings", type=int, default=50, help="조회수 상위 목록 페이지 수"
+        )
+        parser.add_argument(
+            "--hours", type=int, default=24, help="조회수 집계 기간(시간)"
+        )
+        parser.add_argument(
+            "--product-ids",
+            default=None,
+            help="조회수 대신 사용할 상품 id 목록 (콤마 구분)",
+        )
+        parser.add_argument(
+            "--ids-file",
+            type=Path,
+            default=None,
+            help="조회수 대신 사용할 상품 id 파일 (한 줄에 하나)",
+        )
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=50.0,
+            help="초당 최대 조회 수, DB 부하 제한용 (0 이면 제한 없음)",
+        )
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument("--max-failures", type=int, default=0)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        targets = self._targets(options)
+        if not targets:
+            self.stdout.write("warm-up 대상이 없습니다.")
+            return
+
+        report = warm_cache(
+            targets,
+            workers=options["workers"],
+            rate=options["rate"],
+            batch_size=options["batch_size"],
+            on_progress=self._print_progress,
+        )
+        self.stdout.write(
+            f"완료: {report.warmed}/{report.total} warmed, "
+            f"{len(report.failed)} failed ({report.elapsed:.1f}s)"
+        )
+        if len(report.failed) > options["max_failures"]:
+            raise CommandError(
+                f"warm-up 실패 {len(report.failed)}건: {', '.join(report.failed[:10])}"
+            )
+
+    def _targets(self, options: dict[str, Any]) -> list[Target]:
+        if options["product_ids"]:
+            return [pid for pid in options["product_ids"].split(",") if pid]
+        if options["ids_file"]:
+            lines = options["ids_file"].read_text().splitlines()
+            return [line.strip() for line in lines if line.strip()]
+        return [
+            *access_stats.top_products(options["products"], hours=options["hours"]),
+            *access_stats.top_listings(options["listings"], hours=options["hours"]),
+        ]
+
+    def _print_progress(self, report: WarmupReport) -> None:
+        rate = report.done / report.elapsed if report.elapsed else 0.0
+        self.stdout.write(
+            f"[{report.done}/{report.total}] warmed={report.warmed} "
+            f"failed={len(report.failed)} ({rate:.1f}/s)"
+        )
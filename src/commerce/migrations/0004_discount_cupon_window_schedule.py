@@ -0,0 +1,41 @@
+# Generated by Django 6.1.2 on 2026-10-19 00:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commerce', '0003_alter_cupons_id_alter_cupons_user_alter_product_id_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cupons',
+            name='scheduled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='productdiscount',
+            name='scheduled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='cupons',
+            index=models.Index(fields=['active', 'valid_to'], name='commerce_cu_active_be7f76_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cupons',
+            index=models.Index(fields=['scheduled', 'valid_from'], name='commerce_cu_schedul_cc0c87_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productdiscount',
+            index=models.Index(fields=['active', 'end_date'], name='commerce_pr_active_43ce8c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productdiscount',
+            index=models.Index(fields=['scheduled', 'start_date'], name='commerce_pr_schedul_0deec4_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.1.2 on 2026-10-19 01:06
+
+from django.db import migrations, models
+
+
+def seed_product_counter(apps, schema_editor):
+    Product = apps.get_model('commerce', 'Product')
+    ProductCounter = apps.get_model('commerce', 'ProductCounter')
+    ProductCounter.objects.update_or_create(
+        name='products', defaults={'value': Product.objects.count()}
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commerce', '0004_discount_cupon_window_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductCounter',
+            fields=[
+                ('name', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_product_counter, migrations.RunPython.noop),
+    ]
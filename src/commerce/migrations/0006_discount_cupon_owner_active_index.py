@@ -0,0 +1,23 @@
+# Generated by Django 6.1.2 on 2026-10-19 01:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commerce', '0005_product_counter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cupons',
+            index=models.Index(fields=['user', 'active'], name='commerce_cu_user_id_0899aa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productdiscount',
+            index=models.Index(fields=['product', 'active'], name='commerce_pr_product_190541_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-19 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commerce', '0006_discount_cupon_owner_active_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productstockevents',
+            index=models.Index(fields=['product', 'created_at', 'version'], name='commerce_pr_product_2477cd_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.1.2 on 2026-10-19 01:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commerce', '0007_stock_event_history_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCheckpoint',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('position', models.CharField(default='', max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StockDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('inbound', models.BigIntegerField(default=0)),
+                ('outbound', models.BigIntegerField(default=0)),
+                ('closing_total', models.IntegerField(default=0)),
+                ('event_count', models.IntegerField(default=0)),
+                ('last_version', models.IntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='stock_daily_rollups', to='commerce.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'outbound'], name='commerce_st_day_d4c678_idx')],
+                'unique_together': {('product', 'day')},
+            },
+        ),
+    ]
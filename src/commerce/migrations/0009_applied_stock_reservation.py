@@ -0,0 +1,27 @@
+# Generated by Django 6.1.2 on 2026-10-19 02:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('commerce', '0008_stock_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppliedStockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reservation_id', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='applied_stock_reservations', to='commerce.product')),
+                ('stock_event', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='applied_stock_reservations', to='commerce.productstockevents')),
+            ],
+            options={
+                'unique_together': {('product', 'reservation_id')},
+            },
+        ),
+    ]
@@ -1,7 +1,29 @@
+import asyncio
+import io
 import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from logging.handlers import QueueListener
 
 import pytest
-
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncClient, Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from prometheus_client import REGISTRY
+
+from commerce.adapter.persistence.cache.cached_persistence_adapter import (
+    CachedProductPersistenceAdapter,
+)
 from commerce.adapter.persistence.django_orm.django_orm_persistence_adpater import (
     DjangoORMPersistenceAdapter,
 )
@@ -10,6 +32,35 @@ from commerce.adapter.persistence.django_orm.models import (
     Product,
     ProductDiscount,
     ProductStockEvents,
+    StockDailyRollup,
+)
+from commerce.adapter.persistence.in_memory.in_memory_persistence_adapter import (
+    InMemoryPersistenceAdapter,
+)
+from commerce.adapter.reservation.stock_reservation_store import (
+    InMemoryStockReservationStore,
+)
+from commerce.adapter.stream.stock_broker import (
+    HEARTBEAT,
+    StockBroker,
+    StockUpdate,
+    stock_broker,
+)
+from commerce.app.usecases import (
+    BulkUpsertProductDiscountUsecase,
+    CreateProductUsecase,
+    GetProductsUsecase,
+    ReconcileStockReservationsUsecase,
+    SyncPromotionWindowsUsecase,
+    UpdateProductStockUsecase,
+)
+from commerce.bench.load import MIXES
+from commerce.domain.entities import (
+    CuponEntity,
+    ProductDiscountEntity,
+    ProductEntity,
+    ProductStockEventEntity,
+    StockDailyRollupEntity,
 )
 from commerce.factories import (
     CuponFactory,
@@ -17,6 +68,19 @@ from commerce.factories import (
     ProductFactory,
     ProductStockEventsFactory,
 )
+from common import idempotency, tracing
+from common.admission import (
+    AdmissionController,
+    InMemoryAdmissionBackend,
+    Rejection,
+    Slot,
+)
+from common.deadline import deadline_scope, with_max_execution_time
+from common.exceptions import DBOptimisticLockError, DeadlineExceeded
+from common.log import AsyncQueueHandler, ExceptionSamplingFilter, JsonFormatter
+from common.query_budget import QueryBudgetExceeded, record_queries
+from common.query_plan import explain, explainable
+from common.retry import RetryPolicy
 
 
 def _create_sample_product() -> ProductFactory:
@@ -285,6 +349,88 @@ def test_제품_목록_조회시_페지네이션이_동작하는지_확인한다
         left -= page_size
 
 
+@pytest.mark.django_db
+def test_상품_목록은_다음_페이지_여부와_COUNT_없이_구한_전체_수를_반환한다(
+    authed_client,
+):
+    # arrange
+    for i in range(3):
+        authed_client.post(
+            path="/commerce/products/",
+            data=json.dumps(
+                {"name": f"pn_{i}", "description": "설명", "price": 1000, "stock": 1}
+            ),
+            content_type="application/json",
+        )
+
+    # act
+    with CaptureQueriesContext(connection) as queries:
+        first = authed_client.get(
+            path="/commerce/products/",
+            data={"page_size": 2, "include_total": "true"},
+        )
+    last = authed_client.get(
+        path="/commerce/products/", data={"page_size": 2, "page_index": 2}
+    )
+
+    # assert
+    assert len(first.json()["products"]) == 2
+    assert first.json()["has_next"] is True
+    assert first.json()["total"] == 3
+    assert not any("COUNT(" in q["sql"].upper() for q in queries.captured_queries)
+    assert len(last.json()["products"]) == 1
+    assert last.json()["has_next"] is False
+    assert "total" not in last.json()
+
+
+@pytest.mark.django_db
+def test_상품_목록의_잘못된_페이지_값은_400_이고_큰_page_size_는_최대값으로_제한한다(
+    api_client, mocker
+):
+    # arrange
+    execute_page = mocker.spy(GetProductsUsecase, "execute_page")
+    invalid = [
+        {"page_size": 0},
+        {"page_size": -1},
+        {"page_size": "abc"},
+        {"page_index": 0},
+        {"page_index": "1.5"},
+        {"page_index": 1_001},
+    ]
+
+    # act
+    responses = [
+        api_client.get(path="/commerce/products/", data=params) for params in invalid
+    ]
+    clamped = api_client.get(path="/commerce/products/", data={"page_size": 10_000})
+
+    # assert
+    assert [r.status_code for r in responses] == [400] * len(invalid)
+    assert execute_page.call_count == 1
+    assert clamped.status_code == 200
+    assert execute_page.call_args.kwargs["page_size"] == 100
+
+
+def test_검색어별_상품_수는_백그라운드에서_집계한_뒤_캐시된_값을_반환한다():
+    # arrange
+    inner = InMemoryPersistenceAdapter()
+    for _ in range(3):
+        _in_memory_product(inner)
+    adapter = CachedProductPersistenceAdapter(inner)
+
+    # act
+    before = adapter.estimate_product_count("상품")
+    counted = None
+    for _ in range(100):
+        if (counted := adapter.estimate_product_count("상품")) is not None:
+            break
+        time.sleep(0.02)
+
+    # assert
+    assert before is None
+    assert counted == 3
+
+
 # === 상품 할인 테스트 ===
 
 
@@ -341,6 +487,102 @@ def test_상품_할인을_다시_생성하면_기존_할인이_비활성화된
     assert new_discount.active is True
 
 
+@pytest.mark.django_db
+def test_상품명_필터로_여러_상품에_할인을_일괄_적용한다(authed_client):
+    # arrange
+    sale_products = [ProductFactory(name=f"여름 세일 {i}") for i in range(3)]
+    other = ProductFactory(name="겨울 코트")
+    existing_discount = ProductDiscountFactory(product=sale_products[0])
+
+    # act
+    response = authed_client.post(
+        path="/commerce/discounts/bulk/",
+        data=json.dumps(
+            {"product_name": "여름 세일", "percentage": 15, "job_id": "summer"}
+        ),
+        content_type="application/json",
+    )
+    job = authed_client.get(path="/commerce/discounts/bulk/summer/")
+
+    # assert
+    assert response.status_code == 200
+    assert job.json() == {
+        "job_id": "summer",
+        "status": "done",
+        "total": 3,
+        "processed": 3,
+        "applied": 3,
+    }
+    existing_discount.refresh_from_db()
+    assert existing_discount.active is False
+    active = ProductDiscount.objects.filter(active=True)
+    assert sorted(d.product_id for d in active) == sorted(p.id for p in sale_products)
+    assert {float(d.percentage) for d in active} == {15.0}
+    assert not ProductDiscount.objects.filter(product=other).exists()
+
+
+@pytest.mark.django_db
+def test_일괄_할인은_잘못된_날짜와_이미_있는_job_id_를_거절한다(authed_client):
+    # arrange
+    product = ProductFactory()
+
+    def _bulk_upsert(**body):
+        return authed_client.post(
+            path="/commerce/discounts/bulk/",
+            data=json.dumps({"product_ids": [product.id], "percentage": 10, **body}),
+            content_type="application/json",
+        )
+
+    # act
+    invalid_dates = [
+        _bulk_upsert(start_date="garbage").status_code,
+        _bulk_upsert(end_date="2025-02-30T00:00:00").status_code,
+    ]
+    first = _bulk_upsert(job_id="winter")
+    reused = _bulk_upsert(job_id="winter", percentage=50)
+
+    # assert
+    assert invalid_dates == [400, 400]
+    assert first.status_code == 200
+    assert reused.status_code == 400
+    job = authed_client.get(path="/commerce/discounts/bulk/winter/").json()
+    assert (job["status"], job["applied"]) == ("done", 1)
+    assert {
+        float(d.percentage) for d in ProductDiscount.objects.filter(active=True)
+    } == {10.0}
+
+
+@pytest.mark.django_db
+def test_일괄_할인은_chunk_단위로_적용하고_진행_상황을_알린다(
+    django_assert_num_queries,
+):
+    # arrange
+    products = [ProductFactory() for _ in range(3)]
+    usecase = BulkUpsertProductDiscountUsecase(
+        product_persistence_adapter=DjangoORMPersistenceAdapter(), chunk_size=2
+    )
+    progress = []
+    now = timezone.now()
+
+    # act
+    # chunk 당 상품 확인 SELECT + 비활성화 UPDATE + bulk INSERT + savepoint 2개 (테스트 트랜잭션 안)
+    with django_assert_num_queries(10):
+        result = usecase.execute(
+            BulkUpsertProductDiscountUsecase.Cmd(
+                product_ids=[*(p.id for p in products), "not-exist-product"],
+                percentage=10,
+                start_date=now,
+                end_date=now + timedelta(days=1),
+            ),
+            on_progress=lambda p: progress.append((p.processed, p.applied)),
+        )
+
+    # assert
+    assert progress == [(2, 2), (4, 3)]
+    assert (result.total, result.applied) == (4, 3)
+    assert ProductDiscount.objects.filter(active=True).count() == 3
+
+
 @pytest.mark.django_db
 def test_상품_목록_조회시_기본_할인이_반영된다(authed_client):
     # arrange
@@ -420,3 +662,1885 @@ def test_쿠폰을_생성한다(authed_client):
     assert cupons.count() == 1
     assert cupons[0].user.id == response.wsgi_request.user.id
     assert cupons[0].code == "DISCOUNT20"
+
+
+# === 부하 테스트 하네스 ===
+@pytest.mark.django_db
+def test_부하_테스트는_모든_라우트를_호출하고_지표를_출력한다(tmp_path):
+    # arrange
+    output = tmp_path / "report.json"
+
+    # act
+    call_command(
+        "loadtest",
+        "--mix=all",
+        "--concurrency=1",
+        "--requests=80",
+        "--products=20",
+        "--users=2",
+        f"--output={output}",
+        stdout=io.StringIO(),
+    )
+
+    # assert
+    report = json.loads(output.read_text())
+    assert set(report["operations"]) == set(MIXES["all"])
+    assert report["total"]["requests"] == 80
+    assert report["total"]["error_rate"] == 0.0
+    for stats in report["operations"].values():
+        assert {"p50", "p95", "p99"} <= set(stats["latency_ms"])
+
+
+# === 유스케이스 마이크로 벤치마크 ===
+def test_인메모리_어댑터에서_버전이_충돌하면_재시도_후_재고를_수정한다(mocker):
+    # arrange
+    adapter = InMemoryPersistenceAdapter()
+    product = ProductEntity.create(name="상품", description="설명", price=1000.0)
+    _, v1 = adapter.create_product(
+        product,
+        ProductStockEventEntity.create(
+            product_id=product.id, change=10, total_after_change=10, version=1
+        ),
+    )
+    # 다른 요청이 먼저 version 2 를 저장한 상황
+    v2 = adapter.create_product_stock_event(
+        ProductStockEventEntity.create(
+            product_id=product.id, change=5, total_after_change=15, version=2
+        )
+    )
+    mocker.patch.object(adapter, "get_last_stock_event", side_effect=[v1, v2])
+    mocker.patch("time.sleep")
+
+    # act
+    event = UpdateProductStockUsecase(adapter).execute(product.id, 1)
+
+    # assert
+    assert (event.version, event.total_after_change) == (3, 16)
+
+
+def test_벤치마크가_baseline_보다_느려지면_실패한다(tmp_path):
+    # arrange
+    baseline = tmp_path / "baselines.json"
+    args = ["--sizes=10", "--repeat=1", "--min-time=0.001", "--only=calc_product"]
+    call_command(
+        "bench_usecases",
+        *args,
+        f"--baseline={baseline}",
+        "--update-baseline",
+        stdout=io.StringIO(),
+    )
+    saved = json.loads(baseline.read_text())
+    assert list(saved) == ["calc_product_discount_service[10]"]
+
+    # act, assert
+    baseline.write_text(json.dumps(dict.fromkeys(saved, 1e-12)))
+    with pytest.raises(CommandError, match="calc_product_discount_service"):
+        call_command(
+            "bench_usecases", *args, f"--baseline={baseline}", stdout=io.StringIO()
+        )
+
+
+# === 쿼리 예산 ===
+@pytest.mark.django_db
+def test_상품_목록_조회는_상품_수와_무관한_쿼리_수로_동작한다(
+    authed_client, query_budget
+):
+    # arrange
+    for _ in range(10):
+        ProductDiscountFactory(product=_create_sample_product())
+
+    # act, assert (상품 + 할인 prefetch)
+    with query_budget(
+        2, scope="DjangoORMPersistenceAdapter.get_products", allow_duplicates=False
+    ):
+        response = authed_client.get(path="/commerce/products/")
+    assert response.status_code == 200
+    assert len(response.json()["products"]) == 10
+
+
+@pytest.mark.django_db
+def test_상품_상세_조회_쿼리_예산(authed_client, test_user, query_budget):
+    # arrange
+    product = _create_sample_product()
+    ProductDiscountFactory(product=product)
+    CuponFactory.create_batch(3, user=test_user)
+
+    # act, assert (상품, 할인, 쿠폰)
+    with query_budget(3, scope="DjangoORMPersistenceAdapter", allow_duplicates=False):
+        response = authed_client.get(path=f"/commerce/products/{product.id}/")
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_여러_상품_상세_조회는_상품_수와_무관한_쿼리_수로_가격을_계산한다(
+    authed_client, test_user, query_budget
+):
+    # arrange
+    products = [ProductFactory(price=10000.0) for _ in range(5)]
+    for product in products:
+        ProductDiscountFactory(product=product, percentage=10.0)
+    CuponFactory(user=test_user, discount_percentage=5.0)
+    CuponFactory(user=test_user, discount_percentage=10.0)
+    product_ids = [p.id for p in reversed(products)]
+
+    # act (상품, 할인, 쿠폰)
+    with query_budget(3, scope="DjangoORMPersistenceAdapter", allow_duplicates=False):
+        response = authed_client.get(
+            path="/commerce/products/details/",
+            data={"product_ids": ",".join([*product_ids, "not-exist-product"])},
+        )
+
+    # assert
+    assert response.status_code == 200
+    body = response.json()
+    assert [p["product"]["id"] for p in body["products"]] == product_ids
+    assert {p["final_price"] for p in body["products"]} == {8100.0}
+    assert body["not_found"] == ["not-exist-product"]
+
+
+@pytest.mark.django_db
+def test_쿠폰이_없는_사용자도_상품_상세를_조회한다(authed_client):
+    # arrange
+    product = _create_sample_product()
+
+    # act
+    response = authed_client.get(path=f"/commerce/products/{product.id}/")
+
+    # assert
+    assert response.status_code == 200
+    assert response.json()["cupon_discount_amount"] == 0
+
+
+@pytest.mark.django_db
+def test_반복_쿼리가_있으면_쿼리_예산_검사에_실패한다(query_budget):
+    # arrange
+    products = [_create_sample_product() for _ in range(3)]
+
+    # act, assert
+    with pytest.raises(QueryBudgetExceeded, match="N\\+1"):
+        with query_budget(10, allow_duplicates=False):
+            for product in products:
+                ProductDiscount.objects.filter(product=product).count()
+
+
+@pytest.mark.django_db
+def test_DEBUG_모드에서는_쿼리_지표를_응답_헤더로_노출한다(authed_client, settings):
+    # arrange
+    settings.DEBUG = True
+    _create_sample_product()
+
+    # act
+    response = authed_client.get(path="/commerce/products/")
+
+    # assert
+    assert int(response["X-DB-Query-Count"]) >= 2
+    assert float(response["X-DB-Time-Ms"]) >= 0
+    scopes = json.loads(response["X-DB-Scopes"])
+    assert scopes["DjangoORMPersistenceAdapter.get_products"] == 2
+
+
+# === 쿼리 실행 계획 ===
+# 의도적으로 전체 스캔을 허용하는 (어댑터 메서드, 테이블) 과 이유
+_ALLOWED_FULL_SCANS = {
+    (
+        "get_products",
+        Product._meta.db_table,
+    ): "목록은 LIMIT 만큼만 읽고, 검색은 icontains(LIKE '%..%') 라 인덱스를 쓸 수 없음",
+    (
+        "count_products",
+        Product._meta.db_table,
+    ): "COUNT(*) 집계 (목록 API 는 카운터/백그라운드 집계 사용)",
+    (
+        "sync_product_count",
+        Product._meta.db_table,
+    ): "카운터 보정용 COUNT(*) (관리 명령에서만 실행)",
+    (
+        "get_product_ids",
+        Product._meta.db_table,
+    ): "첫 chunk 는 PK 순서로 처음부터 읽고, 검색은 icontains",
+}
+# 복합 인덱스를 타야 하는 (어댑터 메서드, 모델) 과 인덱스 컬럼
+_EXPECTED_INDEXES = {
+    ("get_product", ProductDiscount): ["product", "active"],
+    ("get_products", ProductDiscount): ["product", "active"],
+    ("get_products_by_ids", ProductDiscount): ["product", "active"],
+    ("create_product_discount", ProductDiscount): ["product", "active"],
+    ("get_cupons", Cupons): ["user", "active"],
+    ("get_top_outbound_rollups", StockDailyRollup): ["day", "outbound"],
+    ("find_stock_event_version", ProductStockEvents): [
+        "product",
+        "created_at",
+        "version",
+    ],
+}
+
+
+def _index_name(model, fields: list[str]) -> str:
+    return next(i.name for i in model._meta.indexes if i.fields == fields)
+
+
+def _seed_query_plan_data(user) -> list[Product]:
+    now = timezone.now()
+    products = [_create_sample_product() for _ in range(20)]
+    for product in products:
+        ProductStockEventsFactory(product=product, version=2)
+        ProductDiscountFactory(product=product)
+        ProductDiscountFactory(product=product, active=False)
+        ProductDiscountFactory(
+            product=product,
+            active=False,
+            scheduled=True,
+            start_date=now + timedelta(days=1),
+        )
+    CuponFactory.create_batch(5, user=user)
+    CuponFactory.create_batch(5, user=user, active=False)
+    CuponFactory.create_batch(
+        5, user=user, active=False, scheduled=True, valid_from=now + timedelta(days=1)
+    )
+    return products
+
+
+def _query_plan_scenarios(products: list[Product], user_id: int) -> list[tuple]:
+    """어댑터 메서드별 호출 (메서드 이름, 호출). 같은 메서드를 다른 인자로 여러번 호출할 수 있음"""
+    now = timezone.now()
+    product_id = products[0].id
+    product_ids = [p.id for p in products[:5]]
+    new_product = ProductEntity.create(name="새 상품", description="설명", price=1000)
+
+    def _discount(product_id: str) -> ProductDiscountEntity:
+        return ProductDiscountEntity.create(
+            product_id=product_id,
+            percentage=10,
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1),
+        )
+
+    return [
+        (
+            "create_product",
+            lambda a: a.create_product(
+                new_product,
+                ProductStockEventEntity.create(
+                    product_id=new_product.id, change=1, total_after_change=1, version=1
+                ),
+            ),
+        ),
+        (
+            "create_product_stock_event",
+            lambda a: a.create_product_stock_event(
+                ProductStockEventEntity.create(
+                    product_id=product_id, change=1, total_after_change=1, version=3
+                ),
+                reservation_ids=["r1"],
+            ),
+        ),
+        (
+            "get_applied_reservation_ids",
+            lambda a: a.get_applied_reservation_ids(product_id, ["r1", "r2"]),
+        ),
+        ("get_last_stock_event", lambda a: a.get_last_stock_event(product_id)),
+        ("get_stock_events", lambda a: a.get_stock_events(product_id, 1, 2, 100)),
+        (
+            "get_stock_events_after",
+            lambda a: a.get_stock_events_after(
+                products[0].stock_events.first().id, "9", 5
+            ),
+        ),
+        (
+            "get_stock_event_as_of",
+            lambda a: a.get_stock_event_as_of(product_id, now - timedelta(days=1)),
+        ),
+        ("get_checkpoint", lambda a: a.get_checkpoint("query-plan")),
+        (
+            "move_checkpoint",
+            lambda a: a.move_checkpoint("query-plan-verify", "", "1"),
+        ),
+        (
+            "get_stock_event_min_versions",
+            lambda a: a.get_stock_event_min_versions(
+                products[0].stock_events.first().id, "9"
+            ),
+        ),
+        (
+            "iter_stock_events",
+            # chunk 를 작게 해서 keyset 으로 다음 chunk 를 읽는 쿼리까지 확인
+            lambda a: list(
+                a.iter_stock_events({product_ids[0]: 1, product_ids[1]: 2}, 2)
+            ),
+        ),
+        (
+            "add_stock_daily_rollups",
+            lambda a: a.add_stock_daily_rollups(
+                [
+                    StockDailyRollupEntity(
+                        product_id=p, day=now.date(), outbound=1, last_version=1
+                    )
+                    for p in product_ids
+                ],
+                "query-plan",
+                "",
+                "1",
+            ),
+        ),
+        (
+            "get_stock_daily_rollups",
+            lambda a: a.get_stock_daily_rollups(
+                product_id, now.date() - timedelta(days=7), now.date()
+            ),
+        ),
+        (
+            "get_top_outbound_rollups",
+            lambda a: a.get_top_outbound_rollups(now.date(), 5),
+        ),
+        (
+            "find_stock_event_version",
+            lambda a: a.find_stock_event_version(product_id, now),
+        ),
+        (
+            "find_stock_event_version",
+            lambda a: a.find_stock_event_version(product_id, now, before=True),
+        ),
+        ("get_last_stock_events", lambda a: a.get_last_stock_events(product_ids)),
+        (
+            "create_product_discount",
+            lambda a: a.create_product_discount(
+                _discount(product_id), deactivate_others=True
+            ),
+        ),
+        (
+            "create_product_discounts",
+            lambda a: a.create_product_discounts(
+                [_discount(p) for p in product_ids], deactivate_others=True
+            ),
+        ),
+        (
+            "create_cupon",
+            lambda a: a.create_cupon(
+                CuponEntity.create(
+                    user_id=str(user_id),
+                    code="PLAN-CUPON",
+                    discount_percentage=10,
+                    valid_from=now - timedelta(days=1),
+                    valid_to=now + timedelta(days=1),
+                )
+            ),
+        ),
+        (
+            "activate_scheduled_discounts",
+            lambda a: a.activate_scheduled_discounts(now + timedelta(days=2), 100),
+        ),
+        (
+            "expire_discounts",
+            lambda a: a.expire_discounts(now + timedelta(days=60), 100),
+        ),
+        (
+            "activate_scheduled_cupons",
+            lambda a: a.activate_scheduled_cupons(now + timedelta(days=2), 100),
+        ),
+        ("expire_cupons", lambda a: a.expire_cupons(now + timedelta(days=60), 100)),
+        ("get_products", lambda a: list(a.get_products(None, 10, 2, peek_next=True))),
+        ("get_products", lambda a: list(a.get_products("상품", 10, 1))),
+        ("count_products", lambda a: a.count_products(None)),
+        ("estimate_product_count", lambda a: a.estimate_product_count(None)),
+        ("sync_product_count", lambda a: a.sync_product_count()),
+        ("get_product_ids", lambda a: list(a.get_product_ids(None, chunk_size=5))),
+        ("get_product_ids", lambda a: list(a.get_product_ids("상품", chunk_size=5))),
+        ("get_product", lambda a: a.get_product(product_id)),
+        ("get_products_by_ids", lambda a: a.get_products_by_ids(product_ids)),
+        ("get_cupons", lambda a: list(a.get_cupons(str(user_id)))),
+        ("is_user_exist", lambda a: a.is_user_exist(str(user_id))),
+    ]
+
+
+@pytest.mark.django_db
+def test_어댑터_쿼리는_허용된_경우가_아니면_전체_스캔하지_않고_복합_인덱스를_사용한다(
+    test_user,
+):
+    # arrange
+    adapter = DjangoORMPersistenceAdapter()
+    scenarios = _query_plan_scenarios(_seed_query_plan_data(test_user), test_user.pk)
+    failures = []
+
+    for method, call in scenarios:
+        # act
+        with record_queries() as recorder:
+            call(adapter)
+        queries = recorder.filter(f"DjangoORMPersistenceAdapter.{method}").queries
+        plans = [
+            (q.sql, explain(q.sql, q.params)) for q in queries if explainable(q.sql)
+        ]
+
+        # assert
+        assert queries, f"{method}: 기록된 쿼리가 없음"
+        for sql, steps in plans:
+            failures += [
+                f"{method}: full scan on {step.table} ({step.detail})\n  {sql}"
+                for step in steps
+                if step.full_scan and (method, step.table) not in _ALLOWED_FULL_SCANS
+            ]
+        for (expected_method, model), fields in _EXPECTED_INDEXES.items():
+            if expected_method != method:
+                continue
+            index = _index_name(model, fields)
+            used = {
+                step.index
+                for _, steps in plans
+                for step in steps
+                if step.table == model._meta.db_table
+            }
+            if index not in used:
+                failures.append(
+                    f"{method}: {index} not used on {model._meta.db_table}, used {used}"
+                )
+    assert not failures, "\n".join(failures)
+
+
+def test_쿼리_실행_계획_검사는_ORM_어댑터의_모든_메서드를_호출한다():
+    # arrange
+    public_methods = {
+        name for name in vars(DjangoORMPersistenceAdapter) if not name.startswith("_")
+    }
+
+    # act
+    covered = {method for method, _ in _query_plan_scenarios([Product(id="p")], 1)}
+
+    # assert
+    assert public_methods == covered
+
+
+# === 메트릭 ===
+def _sample_value(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.django_db
+def test_메트릭_엔드포인트는_뷰_유스케이스_어댑터_지표를_노출한다(api_client):
+    # arrange
+    product = _create_sample_product()
+    before = _sample_value(
+        "milly_usecase_duration_seconds_count",
+        usecase="GetProductWithCuponDiscountUsecase",
+    )
+
+    # act
+    api_client.get(path=f"/commerce/products/{product.id}/")
+    response = api_client.get(path="/metrics")
+
+    # assert
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    body = response.content.decode()
+    assert (
+        'milly_view_duration_seconds_count{method="GET",view="get-product-detail"}'
+        in body
+    )
+    assert (
+        'milly_adapter_duration_seconds_count{method="DjangoORMPersistenceAdapter.get_product"}'
+        in body
+    )
+    after = _sample_value(
+        "milly_usecase_duration_seconds_count",
+        usecase="GetProductWithCuponDiscountUsecase",
+    )
+    assert after == before + 1
+
+
+@pytest.mark.django_db
+def test_낙관적_잠금_충돌_횟수를_기록한다(authed_client, mocker):
+    # arrange
+    product = _create_sample_product()
+    mocker.patch("time.sleep")
+    original = DjangoORMPersistenceAdapter.create_product_stock_event
+    calls = []
+
+    def _conflict_once(adapter, stock_event, reservation_ids=()):
+        calls.append(stock_event)
+        if len(calls) == 1:
+            raise DBOptimisticLockError
+        return original(adapter, stock_event, reservation_ids)
+
+    mocker.patch.object(
+        DjangoORMPersistenceAdapter,
+        "create_product_stock_event",
+        autospec=True,
+        side_effect=_conflict_once,
+    )
+    before = _sample_value(
+        "milly_optimistic_lock_conflicts_total", usecase="UpdateProductStockUsecase"
+    )
+
+    # act
+    response = authed_client.post(
+        path=f"/commerce/products/{product.id}/stock/",
+        data=json.dumps({"change": 1}),
+        content_type="application/json",
+    )
+
+    # assert
+    assert response.status_code == 200
+    after = _sample_value(
+        "milly_optimistic_lock_conflicts_total", usecase="UpdateProductStockUsecase"
+    )
+    assert after == before + 1
+
+
+# === 재시도 정책 ===
+def test_충돌이_잦은_상품은_재시도_횟수를_줄이고_포기하면_예외를_던진다(mocker):
+    # arrange
+    sleep = mocker.patch("time.sleep")
+    policy = RetryPolicy(
+        name="test-retry", exceptions=(DBOptimisticLockError,), max_attempts=5
+    )
+    for _ in range(30):
+        policy.tracker.observe("hot-product", conflicted=True)
+    calls = []
+
+    def _always_conflict():
+        calls.append(1)
+        raise DBOptimisticLockError
+
+    before = _sample_value("milly_retry_give_ups_total", operation="test-retry")
+
+    # act
+    with pytest.raises(DBOptimisticLockError):
+        policy.run("hot-product", _always_conflict)
+
+    # assert
+    assert policy.attempts_for("cold-product") == 5
+    assert len(calls) == policy.min_attempts
+    assert all(
+        policy.base_delay <= c.args[0] <= policy.max_delay for c in sleep.call_args_list
+    )
+    after = _sample_value("milly_retry_give_ups_total", operation="test-retry")
+    assert after == before + 1
+
+
+def test_비동기_재시도는_이벤트_루프를_막지_않고_대기한다(mocker):
+    # arrange
+    blocking_sleep = mocker.patch("time.sleep")
+    async_sleep = mocker.patch("asyncio.sleep", new_callable=mocker.AsyncMock)
+    policy = RetryPolicy(name="test-async-retry", exceptions=(DBOptimisticLockError,))
+    results = iter([DBOptimisticLockError(), DBOptimisticLockError(), "ok"])
+
+    async def _conflict_twice():
+        if isinstance(result := next(results), Exception):
+            raise result
+        return result
+
+    # act
+    result = asyncio.run(policy.arun("product", _conflict_twice))
+
+    # assert
+    assert result == "ok"
+    assert async_sleep.await_count == 2
+    blocking_sleep.assert_not_called()
+
+
+# === 요청 deadline ===
+@pytest.mark.django_db
+def test_deadline_이_부족하면_재시도하지_않고_실패한다(authed_client, mocker):
+    # arrange
+    product = _create_sample_product()
+    conflict = mocker.patch.object(
+        DjangoORMPersistenceAdapter,
+        "create_product_stock_event",
+        side_effect=DBOptimisticLockError,
+    )
+
+    # act
+    response = authed_client.post(
+        path=f"/commerce/products/{product.id}/stock/",
+        data=json.dumps({"change": 1}),
+        content_type="application/json",
+        HTTP_X_REQUEST_TIMEOUT_MS="40",
+    )
+
+    # assert
+    assert response.status_code == DBOptimisticLockError.status
+    assert conflict.call_count == 1
+
+
+@pytest.mark.django_db
+def test_잘못된_deadline_헤더는_무시하고_route_기본값을_사용한다(authed_client, mocker):
+    # arrange
+    product = _create_sample_product()
+    scope = mocker.patch(
+        "common.middlewares.deadline_middleware.deadline_scope",
+        wraps=deadline_scope,
+    )
+
+    # act
+    responses = [
+        authed_client.get(
+            path=f"/commerce/products/{product.id}/",
+            HTTP_X_REQUEST_TIMEOUT_MS=timeout_ms,
+        )
+        for timeout_ms in ["nan", "inf", "-5", "0", "1"]
+    ]
+
+    # assert
+    assert [r.status_code for r in responses[:4]] == [200] * 4
+    # get-product-detail 기본값 2초, 너무 작은 값은 MIN_MS 로 올림
+    assert [c.args[0] for c in scope.call_args_list] == [2.0] * 4 + [0.02]
+
+
+@pytest.mark.django_db
+def test_deadline_이_지나면_실행중인_쿼리를_중단한다():
+    # arrange
+    slow_query = (
+        "WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq) "
+        "SELECT count(*) FROM (SELECT x FROM seq LIMIT 1000000000)"
+    )
+
+    # act
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded), deadline_scope(0.05):
+        with connection.cursor() as cursor:
+            cursor.execute(slow_query)
+
+    # assert
+    assert time.monotonic() - started < 1
+
+
+def test_MySQL_SELECT_에는_남은_시간만큼_실행_제한_힌트를_붙인다():
+    # act & assert
+    assert (
+        with_max_execution_time("SELECT id FROM product", 150)
+        == "SELECT /*+ MAX_EXECUTION_TIME(150) */ id FROM product"
+    )
+    assert with_max_execution_time("UPDATE product SET name = 'a'", 150) == (
+        "UPDATE product SET name = 'a'"
+    )
+
+
+# === 로깅 ===
+@pytest.mark.django_db
+def test_클라이언트_에러는_스택_트레이스_없이_구조화_로그로_남긴다(
+    authed_client, caplog, mocker
+):
+    # arrange
+    mocker.patch("random.random", return_value=0.0)
+    caplog.set_level(logging.WARNING, logger="common.middlewares.exception_middleware")
+
+    # act
+    response = authed_client.post(
+        path="/commerce/products/",
+        data=json.dumps({"name": "이름만 있는 상품"}),
+        content_type="application/json",
+    )
+
+    # assert
+    assert response.status_code == 400
+    (record,) = [
+        r for r in caplog.records if r.name == "common.middlewares.exception_middleware"
+    ]
+    assert record.exc_info is None
+    assert record.exception_class == "ParameterRequired"
+    assert record.status == 400
+    assert record.route == "products"
+
+
+def test_예외_클래스별로_샘플링과_초당_허용량을_적용한다(mocker):
+    # arrange
+    def _record(exception_class):
+        record = logging.LogRecord("test", logging.WARNING, "", 0, "msg", None, None)
+        record.exception_class = exception_class
+        record.status = 400
+        return record
+
+    mocker.patch("random.random", side_effect=[0.9, 0.9, 0.1])
+    sampling = ExceptionSamplingFilter(
+        rules={"ParameterRequired": {"sample_rate": 0.5}}
+    )
+    rate_limit = ExceptionSamplingFilter(rules={"4xx": {"rate": 0, "burst": 2}})
+
+    # act
+    sampled = [sampling.filter(_record("ParameterRequired")) for _ in range(3)]
+    mocker.patch("random.random", return_value=0.0)
+    limited = [rate_limit.filter(_record("NotFound")) for _ in range(4)]
+
+    # assert
+    assert sampled == [False, False, True]
+    assert limited == [True, True, False, False]
+
+
+def test_로그는_리스너_스레드에서_JSON_으로_기록하고_request_id_를_포함한다():
+    # arrange
+    stream = io.StringIO()
+    log_queue: queue.Queue = queue.Queue()
+    handler = AsyncQueueHandler(log_queue)
+    target = logging.StreamHandler(stream)
+    target.setFormatter(JsonFormatter())
+    handler.listener = QueueListener(log_queue, target)
+    logger = logging.getLogger("test.async_log")
+    logger.addHandler(handler)
+    logger.propagate = False
+    trace_id, _ = tracing.start_trace("GET /", f"00-{TRACE_ID}-{PARENT_SPAN_ID}-00")
+
+    # act
+    try:
+        raise DBOptimisticLockError("conflict")
+    except DBOptimisticLockError as e:
+        logger.error("server error", exc_info=e, extra={"route": "products"})
+    logger.removeHandler(handler)
+    handler.close()
+
+    # assert
+    data = json.loads(stream.getvalue())
+    assert data["request_id"] == trace_id == TRACE_ID
+    assert data["route"] == "products"
+    assert "Traceback" in data["exc_info"]
+
+
+# === 상품 캐시 ===
+@pytest.mark.django_db
+def test_할인을_변경하면_상품_상세_캐시가_무효화된다(api_client):
+    # arrange
+    product = _create_sample_product()
+    api_client.get(path=f"/commerce/products/{product.id}/")
+
+    # act
+    api_client.post(
+        path=f"/commerce/products/{product.id}/discounts/",
+        data=json.dumps({"percentage": 50}),
+        content_type="application/json",
+    )
+    response = api_client.get(path=f"/commerce/products/{product.id}/")
+
+    # assert
+    assert response.json()["product_discount_amount"] == product.price * 0.5
+
+
+def _in_memory_product(adapter: InMemoryPersistenceAdapter) -> ProductEntity:
+    product = ProductEntity.create(name="상품", description="설명", price=1000)
+    adapter.create_product(
+        product,
+        ProductStockEventEntity.create(
+            product_id=product.id, change=1, total_after_change=1, version=1
+        ),
+    )
+    return product
+
+
+def test_상품_캐시가_만료되면_동시_요청중_하나만_조회하고_나머지는_결과를_기다린다(
+    mocker,
+):
+    # arrange
+    inner = InMemoryPersistenceAdapter()
+    product = _in_memory_product(inner)
+    original = inner.get_product
+
+    def _slow_get_product(product_id: str):
+        time.sleep(0.1)
+        return original(product_id)
+
+    get_product = mocker.patch.object(
+        inner, "get_product", side_effect=_slow_get_product
+    )
+
+    def _get(_):
+        return CachedProductPersistenceAdapter(inner).get_product(product.id)
+
+    # act
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(_get, range(8)))
+
+    # assert
+    assert get_product.call_count == 1
+    assert all(result[0].id == product.id for result in results)
+
+
+def test_다른_프로세스가_상품_캐시를_채우는_중이면_조회하지_않고_채워진_값을_사용한다(
+    mocker,
+):
+    # arrange
+    inner = InMemoryPersistenceAdapter()
+    product = _in_memory_product(inner)
+    get_product = mocker.spy(inner, "get_product")
+    key = f"products:detail:{product.id}"
+    cache.add(f"{key}:fill-lock", 1, 2)  # 다른 프로세스가 lock 을 잡은 상황
+    coalesced_before = (
+        REGISTRY.get_sample_value(
+            "milly_cache_coalesced_total",
+            {"cache": "product_detail", "scope": "cluster"},
+        )
+        or 0
+    )
+    filled = (product, [])
+    timer = threading.Timer(0.05, lambda: cache.set(key, filled, 60))
+
+    # act
+    timer.start()
+    result = CachedProductPersistenceAdapter(inner).get_product(product.id)
+    timer.join()
+
+    # assert
+    assert get_product.call_count == 0
+    assert result[0].id == product.id
+    assert (
+        REGISTRY.get_sample_value(
+            "milly_cache_coalesced_total",
+            {"cache": "product_detail", "scope": "cluster"},
+        )
+        == coalesced_before + 1
+    )
+
+
+def test_soft_TTL_이_지난_목록은_저장된_값을_바로_반환하고_백그라운드에서_갱신한다(
+    settings, mocker
+):
+    # arrange
+    settings.PRODUCT_CACHE = {"LISTING_TTL": 0.3, "LISTING_STALE_TTL": 60}
+    inner = InMemoryPersistenceAdapter()
+    _in_memory_product(inner)
+    adapter = CachedProductPersistenceAdapter(inner)
+    adapter.get_products(None)
+    _in_memory_product(inner)  # 캐시 무효화 없이 추가된 상품
+    original = inner.get_products
+
+    def _slow_get_products(*args):
+        time.sleep(0.2)
+        return original(*args)
+
+    get_products = mocker.patch.object(
+        inner, "get_products", side_effect=_slow_get_products
+    )
+    time.sleep(0.35)  # soft TTL 만료
+
+    # act
+    started = time.monotonic()
+    stale = list(adapter.get_products(None))
+    stale_elapsed = time.monotonic() - started
+    refreshed = stale
+    for _ in range(100):
+        if len(refreshed := list(adapter.get_products(None))) == 2:
+            break
+        time.sleep(0.02)
+
+    # assert
+    assert len(stale) == 1
+    assert stale_elapsed < 0.1
+    assert len(refreshed) == 2
+    assert get_products.call_count == 1
+
+
+@pytest.mark.django_db
+def test_조회수_상위_상품과_목록을_warm_up_한다(api_client, mocker):
+    # arrange
+    hot, cold = _create_sample_product(), _create_sample_product()
+    for path in [hot.id, hot.id, cold.id]:
+        api_client.get(path=f"/commerce/products/{path}/")
+    api_client.get(path="/commerce/products/", data={"page_size": 10})
+    cache.clear()
+    spy = mocker.spy(DjangoORMPersistenceAdapter, "get_product")
+    listing_spy = mocker.spy(DjangoORMPersistenceAdapter, "get_products")
+    out = io.StringIO()
+
+    # act
+    call_command(
+        "warm_cache",
+        "--products=1",
+        "--listings=1",
+        "--workers=1",
+        "--rate=0",
+        stdout=out,
+    )
+    spy.reset_mock()
+    listing_spy.reset_mock()
+    api_client.get(path=f"/commerce/products/{hot.id}/")
+    api_client.get(path="/commerce/products/", data={"page_size": 10})
+    api_client.get(path=f"/commerce/products/{cold.id}/")
+
+    # assert
+    assert "[2/2] warmed=2 failed=0" in out.getvalue()
+    assert [c.args[1] for c in spy.call_args_list] == [cold.id]
+    assert listing_spy.call_count == 0
+
+
+@pytest.mark.django_db
+def test_warm_up_실패가_허용치를_넘으면_명령이_실패한다():
+    # act, assert
+    with pytest.raises(CommandError, match="not-exist-product"):
+        call_command(
+            "warm_cache",
+            "--product-ids=not-exist-product",
+            "--workers=1",
+            stdout=io.StringIO(),
+        )
+
+
+# === 재고 스트림 ===
+@pytest.mark.django_db
+def test_재고_변경은_커밋된_후에_구독자에게_발행된다(
+    authed_client, mocker, django_capture_on_commit_callbacks
+):
+    # arrange
+    product = _create_sample_product()
+    publish = mocker.patch.object(stock_broker, "publish")
+
+    # act
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = authed_client.post(
+            path=f"/commerce/products/{product.id}/stock/",
+            data=json.dumps({"change": 5}),
+            content_type="application/json",
+        )
+    published_before_commit = publish.call_count
+    for callback in callbacks:
+        callback()
+
+    # assert
+    assert published_before_commit == 0
+    publish.assert_called_once_with(
+        StockUpdate(
+            product_id=product.id,
+            total=response.json()["new_stock_count"],
+            version=2,
+        )
+    )
+
+
+def test_재고_스트림은_상품별_최신_값만_보내고_유휴_연결에는_heartbeat_를_보낸다(
+    settings,
+):
+    # arrange
+    settings.STOCK_STREAM = {"HEARTBEAT_SECONDS": 0.01}
+    broker = StockBroker()
+
+    async def _scenario():
+        subscription = broker.subscribe(["p1"])
+        messages = subscription.messages()
+        first = await anext(messages)
+        for version in (2, 3, 4):
+            broker.publish_local(StockUpdate("p1", total=10 - version, version=version))
+        broker.publish_local(StockUpdate("p1", total=100, version=1))
+        broker.publish_local(StockUpdate("p2", total=1, version=2))
+        second = await anext(messages)
+        await messages.aclose()
+        subscription.close()
+        return first, second
+
+    # act
+    first, second = asyncio.run(_scenario())
+
+    # assert
+    assert first == HEARTBEAT
+    assert second == StockUpdate("p1", total=6, version=4).to_sse()
+    assert broker.subscriber_count == 0
+
+
+def test_재고_스트림_listener_는_잘못된_메시지나_전달_실패가_있어도_계속_받는다(mocker):
+    # arrange
+    class _Stop(BaseException):
+        pass
+
+    def _listen():
+        yield {"data": "not json"}
+        yield {"data": json.dumps({"unknown": 1})}
+        yield {"data": json.dumps({"product_id": "p1", "total": 1, "version": 2})}
+        yield {"data": json.dumps({"product_id": "p1", "total": 2, "version": 3})}
+        raise _Stop
+
+    redis_client = mocker.Mock()
+    redis_client.pubsub.return_value.listen = _listen
+    mocker.patch(
+        "commerce.adapter.stream.stock_broker.get_redis", return_value=redis_client
+    )
+    broker = StockBroker()
+    publish_local = mocker.patch.object(
+        broker, "publish_local", side_effect=[RuntimeError("loop closed"), None]
+    )
+
+    # act
+    with pytest.raises(_Stop):
+        broker._listen()
+
+    # assert
+    assert publish_local.call_args_list == [
+        mocker.call(StockUpdate("p1", total=1, version=2)),
+        mocker.call(StockUpdate("p1", total=2, version=3)),
+    ]
+
+
+@pytest.mark.django_db
+def test_재고_스트림은_연결_직후_현재_재고를_보낸다():
+    # arrange
+    product = _create_sample_product()
+    last_event = ProductStockEvents.objects.get(product=product)
+
+    async def _read_first_event():
+        response = await AsyncClient().get(
+            "/commerce/products/stock/stream/", {"product_ids": product.id}
+        )
+        return response, await anext(response.streaming_content)
+
+    # act
+    response, first = async_to_sync(_read_first_event)()
+
+    # assert
+    assert response["Content-Type"] == "text/event-stream"
+    assert first.decode() == (
+        StockUpdate(
+            product_id=product.id,
+            total=last_event.total_after_change,
+            version=last_event.version,
+        ).to_sse()
+    )
+
+
+@pytest.mark.django_db
+def test_재고_스트림은_ASGI_가_아니면_501_을_응답한다(client):
+    # act
+    response = client.get("/commerce/products/stock/stream/", {"product_ids": "p1"})
+
+    # assert
+    assert response.status_code == 501
+
+
+# === 재고 이력 ===
+def _create_stock_history(product: Product, versions: int) -> None:
+    """version 1..versions 재고 이벤트를 1분 간격 created_at 으로 생성 (2025-01-01 00:00 부터)"""
+    started = timezone.make_aware(datetime(2025, 1, 1))
+    for version in range(1, versions + 1):
+        ProductStockEventsFactory(
+            product=product, version=version, change=1, total_after_change=version
+        )
+        # created_at 은 auto_now_add 라 저장 후 변경
+        ProductStockEvents.objects.filter(product=product, version=version).update(
+            created_at=started + timedelta(minutes=version - 1)
+        )
+
+
+@pytest.mark.django_db
+def test_재고_이력을_version_범위와_cursor_로_나눠서_조회한다(authed_client):
+    # arrange
+    product = ProductFactory()
+    _create_stock_history(product, versions=7)
+    path = f"/commerce/products/{product.id}/stock/history/"
+
+    # act
+    pages = []
+    cursor = ""
+    while cursor is not None:
+        body = authed_client.get(
+            path,
+            data={"version_from": 2, "version_to": 6, "page_size": 2, "cursor": cursor},
+        ).json()
+        pages.append([event["version"] for event in body["events"]])
+        cursor = body["next_cursor"]
+
+    # assert
+    assert pages == [[2, 3], [4, 5], [6]]
+    assert authed_client.get(path, data={"cursor": "x"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_재고_이력의_시간_범위를_chunk_단위로_조회하며_스트리밍한다(
+    authed_client, settings
+):
+    # arrange
+    settings.STOCK_HISTORY = {"STREAM_CHUNK_SIZE": 2}
+    product = ProductFactory()
+    _create_stock_history(product, versions=10)
+
+    # act (00:03 ~ 00:08 미포함 -> version 4..8)
+    with CaptureQueriesContext(connection) as ctx:
+        response = authed_client.get(
+            f"/commerce/products/{product.id}/stock/history/",
+            data={
+                "created_from": "2025-01-01T00:03:00",
+                "created_to": "2025-01-01T00:08:00",
+                "format": "ndjson",
+            },
+        )
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+    # assert
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert [json.loads(line)["version"] for line in lines] == [4, 5, 6, 7, 8]
+    # 시간 범위 -> version seek 2번 + chunk 3번 (OFFSET 없이 keyset 으로 조회)
+    history_queries = [
+        q["sql"] for q in ctx.captured_queries if "productstockevents" in q["sql"]
+    ]
+    assert len(history_queries) == 5
+    assert not any("OFFSET" in sql for sql in history_queries)
+
+
+@pytest.mark.django_db
+def test_ASGI_에서_재고_이력_스트리밍은_chunk_를_조회할_때마다_바로_보낸다(
+    settings, mocker
+):
+    # arrange
+    settings.STOCK_HISTORY = {"STREAM_CHUNK_SIZE": 2}
+    product = ProductFactory()
+    _create_stock_history(product, versions=5)
+    get_stock_events = mocker.spy(DjangoORMPersistenceAdapter, "get_stock_events")
+
+    async def _read_first_chunk():
+        response = await AsyncClient().get(
+            f"/commerce/products/{product.id}/stock/history/",
+            {"format": "ndjson"},
+        )
+        first = await anext(response.streaming_content)
+        fetched_before_rest = get_stock_events.call_count
+        rest = [chunk async for chunk in response.streaming_content]
+        return first, fetched_before_rest, rest
+
+    # act
+    first, fetched_before_rest, rest = async_to_sync(_read_first_chunk)()
+
+    # assert
+    assert [json.loads(line)["version"] for line in first.decode().splitlines()] == [
+        1,
+        2,
+    ]
+    # 첫 chunk 를 보낼 때는 첫 chunk 만 조회한 상태
+    assert fetched_before_rest == 1
+    assert [len(chunk.decode().splitlines()) for chunk in rest] == [2, 1]
+    assert get_stock_events.call_count == 3
+
+
+# === 재고 일별 집계 ===
+def _create_stock_event_at(product: Product, version: int, change: int, total: int, at):
+    """id(생성 시각 ms 로 시작) 와 created_at 을 at 으로 맞춘 재고 이벤트"""
+    ProductStockEventsFactory(
+        id=f"{int(at.timestamp() * 1000):013d}-{version:04d}",
+        product=product,
+        version=version,
+        change=change,
+        total_after_change=total,
+    )
+    ProductStockEvents.objects.filter(product=product, version=version).update(
+        created_at=at
+    )
+
+
+@pytest.mark.django_db
+def test_재고_일별_집계는_checkpoint_이후_이벤트만_더하고_집계로_조회한다(
+    authed_client,
+):
+    # arrange
+    day1 = timezone.make_aware(datetime(2025, 1, 1, 9))
+    day2 = day1 + timedelta(days=1)
+    hot, cold = ProductFactory(), ProductFactory()
+    _create_stock_event_at(hot, 1, 100, 100, day1)
+    _create_stock_event_at(hot, 2, -30, 70, day1 + timedelta(hours=1))
+    _create_stock_event_at(hot, 3, -20, 50, day2)
+    _create_stock_event_at(cold, 1, 10, 10, day1 + timedelta(minutes=1))
+    _create_stock_event_at(cold, 2, -1, 9, day1 + timedelta(hours=2))
+    out = io.StringIO()
+    call_command("rollup_stock_events", "--batch-size=2", stdout=out)
+
+    # 다음 실행은 새 이벤트만 읽음
+    _create_stock_event_at(hot, 4, 5, 55, day2 + timedelta(hours=1))
+    call_command("rollup_stock_events", stdout=out)
+
+    # act
+    daily = authed_client.get(
+        f"/commerce/products/{hot.id}/stock/daily/",
+        data={"day_from": "2025-01-01", "day_to": "2025-01-31"},
+    ).json()
+    top = authed_client.get(
+        "/commerce/products/stock/daily/", data={"day": "2025-01-01", "limit": 1}
+    ).json()
+
+    # assert
+    runs = out.getvalue().splitlines()
+    assert runs[0].startswith("events=5 ")
+    assert runs[1].startswith("events=1 rollups=1 ")
+    assert [
+        (d["day"], d["inbound"], d["outbound"], d["closing_total"], d["event_count"])
+        for d in daily["days"]
+    ] == [("2025-01-01", 100, 30, 70, 2), ("2025-01-02", 5, 20, 55, 2)]
+    assert [p["product_id"] for p in top["products"]] == [hot.id]
+    assert (
+        authed_client.get(
+            f"/commerce/products/{hot.id}/stock/daily/", data={"day_from": "2025-01-01"}
+        ).status_code
+        == 400
+    )
+
+
+@pytest.mark.django_db
+def test_과거_시점_재고는_시각으로_seek_하고_version_으로_확인해서_조회한다(
+    authed_client,
+):
+    # arrange
+    day1 = timezone.make_aware(datetime(2025, 1, 1, 10))
+    product = ProductFactory()
+    _create_stock_event_at(product, 1, 100, 100, day1)
+    # 서버 시계 차이로 version 2 의 생성 시각이 version 1 보다 앞섬
+    _create_stock_event_at(product, 2, -10, 90, day1 - timedelta(minutes=1))
+    _create_stock_event_at(product, 3, -20, 70, day1 + timedelta(hours=1))
+    _create_stock_event_at(product, 4, 5, 75, day1 + timedelta(days=1))
+    # 일별 집계(전날 마감 version)를 checkpoint 로 사용
+    call_command("rollup_stock_events", stdout=io.StringIO())
+    path = f"/commerce/products/{product.id}/stock/as-of/"
+
+    # act
+    def _stock_at(at):
+        return authed_client.get(path, data={"at": at.isoformat()}).json()
+
+    at_10_30 = _stock_at(day1 + timedelta(minutes=30))
+    with record_queries() as recorder:
+        DjangoORMPersistenceAdapter().get_stock_event_as_of(
+            product.id, day1 + timedelta(days=2)
+        )
+
+    # assert
+    assert (at_10_30["stock"], at_10_30["version"]) == (90, 2)
+    assert _stock_at(day1 + timedelta(hours=2))["stock"] == 70
+    assert _stock_at(day1 + timedelta(days=2))["stock"] == 75
+    assert _stock_at(day1 - timedelta(days=1)) | {"at": None} == {
+        "product_id": product.id,
+        "at": None,
+        "stock": 0,
+        "version": None,
+        "event_created_at": None,
+    }
+    # 시각 seek, checkpoint, 다음 version 확인 (이력 크기와 무관한 쿼리 수)
+    assert (
+        recorder.filter("DjangoORMPersistenceAdapter.get_stock_event_as_of").count == 3
+    )
+
+
+# === 재고 이벤트 검증 ===
+@pytest.mark.django_db
+def test_재고_이벤트_검증은_version_누락_합계_불일치_음수_재고를_찾고_다음_실행은_새_이벤트만_검증한다():
+    # arrange
+    day1 = timezone.make_aware(datetime(2025, 1, 1, 9))
+    good, broken = ProductFactory(), ProductFactory()
+    _create_stock_event_at(good, 1, 100, 100, day1)
+    _create_stock_event_at(good, 2, -30, 70, day1 + timedelta(hours=1))
+    # 이벤트 id 가 겹치지 않도록 1분 뒤
+    day1_later = day1 + timedelta(minutes=1)
+    _create_stock_event_at(broken, 1, 10, 10, day1_later)
+    _create_stock_event_at(broken, 2, -5, 6, day1_later + timedelta(hours=1))
+    _create_stock_event_at(broken, 4, -10, -4, day1_later + timedelta(hours=2))
+    out = io.StringIO()
+
+    # act
+    with pytest.raises(CommandError):
+        call_command(
+            "verify_stock_events",
+            "--workers=1",
+            "--shard-size=1",
+            "--lag-seconds=0",
+            stdout=out,
+        )
+    full_run = out.getvalue().splitlines()
+
+    # 문제가 남아 있으면 checkpoint 를 옮기지 않으므로 다음 실행도 실패
+    out = io.StringIO()
+    with pytest.raises(CommandError):
+        call_command(
+            "verify_stock_events", "--workers=1", "--lag-seconds=0", stdout=out
+        )
+    rerun = out.getvalue().splitlines()
+
+    # 고친 뒤 실행이 통과하면 checkpoint 를 옮기고,
+    # 그 다음 실행은 checkpoint 이후 이벤트가 생긴 상품만 직전 version 부터 검증
+    ProductStockEvents.objects.filter(product=broken, version=4).delete()
+    ProductStockEvents.objects.filter(product=broken, version=2).update(
+        total_after_change=5
+    )
+    call_command(
+        "verify_stock_events", "--workers=1", "--lag-seconds=0", stdout=io.StringIO()
+    )
+    _create_stock_event_at(good, 3, 5, 75, timezone.now())
+    # 이벤트 id(생성 시각 ms)가 다음 실행의 기준 시각보다 작도록
+    time.sleep(0.01)
+    out = io.StringIO()
+    call_command("verify_stock_events", "--workers=1", "--lag-seconds=0", stdout=out)
+
+    # assert
+    assert sorted(full_run[:-1]) == [
+        f"gap product={broken.id} version=4 expected=3 actual=4",
+        f"mismatch product={broken.id} version=2 expected=5 actual=6",
+        f"negative product={broken.id} version=4 expected=0 actual=-4",
+    ]
+    assert full_run[-1].startswith("shards=2 products=2 events=5 issues=3 ")
+    assert sorted(rerun[:-1]) == sorted(full_run[:-1])
+    assert out.getvalue().startswith("shards=1 products=1 events=1 issues=0 ")
+
+
+# 다른 테스트가 띄운 스레드가 남아 있는 테스트 프로세스에서 fork 하므로 경고는 무시
+@pytest.mark.filterwarnings(
+    "ignore:This process .* is multi-threaded:DeprecationWarning"
+)
+@pytest.mark.django_db(transaction=True)
+def test_재고_이벤트_검증은_여러_프로세스에_shard_를_나눠서_검증한다():
+    # arrange
+    day1 = timezone.make_aware(datetime(2025, 1, 1, 9))
+    products = ProductFactory.create_batch(3)
+    for i, product in enumerate(products):
+        # 이벤트 id 가 겹치지 않도록 상품마다 1분씩
+        created_at = day1 + timedelta(minutes=i)
+        _create_stock_event_at(product, 1, 10, 10, created_at)
+        _create_stock_event_at(product, 2, -3, 7, created_at + timedelta(hours=1))
+    _create_stock_event_at(products[2], 3, -1, 5, day1 + timedelta(hours=2))
+    out = io.StringIO()
+
+    # act
+    with pytest.raises(CommandError):
+        call_command(
+            "verify_stock_events",
+            "--workers=2",
+            "--shard-size=1",
+            "--lag-seconds=0",
+            stdout=out,
+        )
+
+    # assert
+    lines = out.getvalue().splitlines()
+    assert lines[:-1] == [
+        f"mismatch product={products[2].id} version=3 expected=6 actual=5"
+    ]
+    assert lines[-1].startswith("shards=3 products=3 events=7 issues=1 ")
+
+
+# === 주문 견적 ===
+@pytest.mark.django_db
+def test_주문_견적은_재고_할인_쿠폰을_반영한_합계를_고정된_쿼리_수로_계산한다(
+    authed_client, test_user, query_budget
+):
+    # arrange
+    discounted, plain = ProductFactory(price=10000.0), ProductFactory(price=5000.0)
+    for product in [discounted, plain]:
+        ProductStockEventsFactory(product=product, version=1, change=10)
+    ProductDiscountFactory(product=discounted, percentage=10.0)
+    CuponFactory(user=test_user, discount_percentage=10.0, code="TEN")
+    lines = [
+        {"product_id": discounted.id, "quantity": 2},
+        {"product_id": plain.id, "quantity": 1},
+        {"product_id": plain.id, "quantity": 1},
+    ]
+
+    # act (상품, 할인, 재고, 쿠폰)
+    with query_budget(4, scope="DjangoORMPersistenceAdapter", allow_duplicates=False):
+        response = authed_client.post(
+            path="/commerce/checkout/quote/",
+            data=json.dumps({"lines": lines}),
+            content_type="application/json",
+        )
+
+    # assert
+    assert response.status_code == 200
+    quote = response.json()
+    assert [(line["product_id"], line["line_total"]) for line in quote["lines"]] == [
+        (discounted.id, 16200.0),
+        (plain.id, 9000.0),
+    ]
+    assert quote["cupon_code"] == "TEN"
+    assert (
+        quote["subtotal"],
+        quote["product_discount_total"],
+        quote["cupon_discount_total"],
+        quote["total"],
+    ) == (30000.0, 2000.0, 2800.0, 25200.0)
+
+
+@pytest.mark.django_db
+def test_재고가_부족한_상품이_있으면_주문_견적에_실패한다(api_client):
+    # arrange
+    product = ProductFactory()
+    ProductStockEventsFactory(product=product, version=1, change=1)
+
+    # act
+    response = api_client.post(
+        path="/commerce/checkout/quote/",
+        data=json.dumps({"lines": [{"product_id": product.id, "quantity": 2}]}),
+        content_type="application/json",
+    )
+
+    # assert
+    assert response.status_code == 400
+    assert response.json()["msg"] == "Insufficient stock"
+    assert product.id in response.json()["detail"]
+
+
+# === 재고 예약 ===
+def _reserve(client, product_id: str, quantity: int):
+    return client.post(
+        path="/commerce/checkout/reservations/",
+        data=json.dumps({"lines": [{"product_id": product_id, "quantity": quantity}]}),
+        content_type="application/json",
+    )
+
+
+@pytest.mark.django_db
+def test_확정된_재고_예약은_상품별로_모아서_재고_이벤트로_기록한다(api_client):
+    # arrange
+    product = ProductFactory()
+    ProductStockEventsFactory(product=product, version=1, change=5)
+    first = _reserve(api_client, product.id, 2).json()["reservation_id"]
+    second = _reserve(api_client, product.id, 2).json()["reservation_id"]
+    released = _reserve(api_client, product.id, 1).json()["reservation_id"]
+
+    # act
+    short = _reserve(api_client, product.id, 1)
+    api_client.post(path=f"/commerce/checkout/reservations/{released}/release/")
+    for reservation_id in [first, second]:
+        api_client.post(
+            path=f"/commerce/checkout/reservations/{reservation_id}/confirm/"
+        )
+    events_before_reconcile = ProductStockEvents.objects.filter(product=product).count()
+    call_command("reconcile_stock_reservations", stdout=io.StringIO())
+
+    # assert
+    assert short.status_code == 400
+    assert short.json()["msg"] == "Insufficient stock"
+    assert events_before_reconcile == 1
+    last = ProductStockEvents.objects.filter(product=product).order_by("-version")[0]
+    assert (last.version, last.change, last.total_after_change) == (2, -4, 1)
+    assert _reserve(api_client, product.id, 1).status_code == 200
+    assert _reserve(api_client, product.id, 1).status_code == 400
+
+
+@pytest.mark.django_db
+def test_ack_전에_중단된_예약_정산을_다시_실행해도_재고를_두_번_차감하지_않는다(
+    api_client, mocker
+):
+    # arrange
+    product = ProductFactory()
+    ProductStockEventsFactory(product=product, version=1, change=5)
+    store = InMemoryStockReservationStore(lease=0)
+    store.reserve("r1", {product.id: 2}, {product.id: 5}, ttl=60)
+    store.confirm("r1")
+    original_ack = store.ack
+    acks = []
+
+    def _crash_once(product_id, reservation_ids):
+        acks.append(product_id)
+        if len(acks) == 1:
+            raise RuntimeError("crashed before ack")
+        return original_ack(product_id, reservation_ids)
+
+    mocker.patch.object(store, "ack", side_effect=_crash_once)
+    usecase = ReconcileStockReservationsUsecase(
+        product_persistence_adapter=DjangoORMPersistenceAdapter(),
+        reservation_store=store,
+    )
+
+    # act
+    with pytest.raises(RuntimeError):
+        usecase.execute()
+    result = usecase.execute()
+    reservation_id = _reserve(api_client, product.id, 1).json()["reservation_id"]
+
+    # assert
+    assert result.products == 1
+    events = ProductStockEvents.objects.filter(product=product).order_by("version")
+    assert [(e.version, e.total_after_change) for e in events] == [(1, 5), (2, 3)]
+    assert store.claim_confirmed(10) == {}
+    # 확정/취소 경로에 쓰이는 예약 id 는 시간순 id 뒤에 추측할 수 없는 랜덤 토큰이 붙음
+    assert len(reservation_id.rsplit("-", 1)[1]) == 32
+
+
+@pytest.mark.django_db
+def test_lease_가_지나_두_실행이_같은_예약을_ack_해도_정산이_실패하지_않는다():
+    # arrange
+    product = ProductFactory()
+    ProductStockEventsFactory(product=product, version=1, change=5)
+    store = InMemoryStockReservationStore(lease=0)
+    store.reserve("r1", {product.id: 2}, {product.id: 5}, ttl=60)
+    store.confirm("r1")
+    usecase = ReconcileStockReservationsUsecase(
+        product_persistence_adapter=DjangoORMPersistenceAdapter(),
+        reservation_store=store,
+    )
+    # lease 보다 오래 걸린 실행이 가져간 예약
+    stale = store.claim_confirmed(10)
+
+    # act (다른 실행이 다시 가져가서 반영하고 ack 한 뒤, 늦게 끝난 실행이 같은 예약을 ack)
+    result = usecase.execute()
+    store.ack(product.id, stale[product.id])
+    rerun = usecase.execute()
+
+    # assert
+    assert (result.products, rerun.products) == (1, 0)
+    assert store.claim_confirmed(10) == {}
+    last = ProductStockEvents.objects.filter(product=product).order_by("-version")[0]
+    assert (last.version, last.total_after_change) == (2, 3)
+
+
+def test_재고_홀드는_TTL_이_지나면_풀리고_만료된_예약은_확정할_수_없다():
+    # arrange
+    now = [1000.0]
+    store = InMemoryStockReservationStore(clock=lambda: now[0])
+    store.reserve("r1", {"p1": 3}, {"p1": 3}, ttl=10)
+
+    # act
+    short_while_held = store.reserve("r2", {"p1": 1}, {"p1": 3}, ttl=10)
+    now[0] += 11
+    short_after_expiry = store.reserve("r3", {"p1": 3}, {"p1": 3}, ttl=10)
+
+    # assert
+    assert short_while_held == ["p1"]
+    assert short_after_expiry == []
+    assert store.confirm("r1") is False
+    assert store.claim_confirmed(10) == {}
+
+
+# === 할인/쿠폰 기간 스케줄러 ===
+@pytest.mark.django_db
+def test_스케줄러는_기간이_지난_할인과_쿠폰을_만료하고_예약된_것을_활성화한다(
+    api_client, test_user
+):
+    # arrange
+    now = timezone.now()
+    expired_product, scheduled_product = (
+        _create_sample_product(),
+        _create_sample_product(),
+    )
+    expired = ProductDiscountFactory(
+        product=expired_product, end_date=now - timedelta(minutes=1)
+    )
+    current = ProductDiscountFactory(product=scheduled_product)
+    upcoming = ProductDiscountFactory(
+        product=scheduled_product,
+        start_date=now - timedelta(minutes=1),
+        active=False,
+        scheduled=True,
+    )
+    expired_cupon = CuponFactory(user=test_user, valid_to=now - timedelta(minutes=1))
+    upcoming_cupon = CuponFactory(
+        user=test_user,
+        valid_from=now - timedelta(minutes=1),
+        active=False,
+        scheduled=True,
+    )
+    api_client.get(path=f"/commerce/products/{expired_product.id}/")
+    out = io.StringIO()
+
+    # act
+    call_command("sync_promotion_windows", stdout=out)
+    response = api_client.get(path=f"/commerce/products/{expired_product.id}/")
+
+    # assert
+    assert "discounts expired=1 activated=1, cupons expired=1 activated=1" in (
+        out.getvalue()
+    )
+    assert response.json()["product_discount_amount"] == 0
+    for row in [expired, current, upcoming, expired_cupon, upcoming_cupon]:
+        row.refresh_from_db()
+    assert (expired.active, current.active) == (False, False)
+    assert (upcoming.active, upcoming.scheduled) == (True, False)
+    assert (expired_cupon.active, upcoming_cupon.active) == (False, True)
+
+
+@pytest.mark.django_db
+def test_시작_전인_할인은_예약만_하고_기존_할인을_유지한다(authed_client):
+    # arrange
+    product = ProductFactory()
+    current = ProductDiscountFactory(product=product)
+
+    # act
+    authed_client.post(
+        path="/commerce/discounts/bulk/",
+        data=json.dumps(
+            {
+                "product_ids": [product.id],
+                "percentage": 30,
+                "start_date": (timezone.now() + timedelta(days=1)).isoformat(),
+            }
+        ),
+        content_type="application/json",
+    )
+
+    # assert
+    current.refresh_from_db()
+    assert current.active is True
+    upcoming = ProductDiscount.objects.get(product=product, scheduled=True)
+    assert (upcoming.active, upcoming.scheduled) == (False, True)
+
+
+def test_스케줄러는_처리할_행이_없을_때까지_batch_단위로_반복한다():
+    # arrange
+    now = timezone.now()
+    adapter = InMemoryPersistenceAdapter()
+    product = ProductEntity.create(name="상품", description="", price=1000)
+    adapter.create_product(
+        product,
+        ProductStockEventEntity.create(
+            product_id=product.id, change=1, total_after_change=1, version=1
+        ),
+    )
+    for _ in range(3):
+        adapter.create_product_discount(
+            ProductDiscountEntity.create(
+                product_id=product.id,
+                percentage=10,
+                start_date=now - timedelta(days=2),
+                end_date=now - timedelta(days=1),
+            )
+        )
+    usecase = SyncPromotionWindowsUsecase(
+        product_persistence_adapter=adapter, batch_size=2
+    )
+
+    # act
+    result = usecase.execute(now=now)
+
+    # assert
+    assert result.discounts_expired == 3
+    assert adapter.get_product(product.id)[1] == []
+
+
+# === 멱등성 키 ===
+@pytest.mark.django_db
+def test_같은_멱등성_키로_재시도한_재고_수정은_한_번만_반영된다(authed_client):
+    # arrange
+    product = ProductFactory()
+    ProductStockEventsFactory(product=product, version=1, change=10)
+
+    def _post(change: int):
+        return authed_client.post(
+            path=f"/commerce/products/{product.id}/stock/",
+            data=json.dumps({"change": change}),
+            content_type="application/json",
+            headers={"Idempotency-Key": "stock-1"},
+        )
+
+    # act
+    first = _post(5)
+    retried = _post(5)
+    reused = _post(7)
+
+    # assert
+    assert first.status_code == 200
+    assert retried.status_code == 200
+    assert retried.json() == first.json()
+    assert retried.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert reused.status_code == 422
+    assert ProductStockEvents.objects.filter(product=product).count() == 2
+
+
+def test_같은_멱등성_키의_동시_요청은_먼저_온_요청의_결과를_기다린다(mocker):
+    # arrange
+    product = ProductEntity.create(name="p", description="d", price=1000)
+    stock_event = ProductStockEventEntity.create(
+        product_id=product.id, version=1, change=3, total_after_change=3
+    )
+
+    def _slow_execute(cmd):
+        time.sleep(0.2)
+        return product, stock_event
+
+    execute = mocker.patch.object(
+        CreateProductUsecase, "execute", side_effect=_slow_execute
+    )
+    payload = {"name": "p", "description": "d", "price": 1000, "stock": 3}
+
+    def _post():
+        return Client().post(
+            path="/commerce/products/",
+            data=json.dumps(payload),
+            content_type="application/json",
+            headers={"Idempotency-Key": "create-1"},
+        )
+
+    # act
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        responses = list(pool.map(lambda _: _post(), range(2)))
+
+    # assert
+    assert execute.call_count == 1
+    assert [r.status_code for r in responses] == [200, 200]
+    assert responses[0].json() == responses[1].json()
+    assert sum("Idempotent-Replayed" in r.headers for r in responses) == 1
+
+
+def test_async_view_의_멱등성_키_저장소_호출은_이벤트_루프_밖에서_실행한다(mocker):
+    # arrange
+    store_threads = []
+    original_cache_call = idempotency._cache_call
+
+    def _record_thread(alias, method, *args):
+        store_threads.append(threading.get_ident())
+        return original_cache_call(alias, method, *args)
+
+    mocker.patch.object(idempotency, "_cache_call", side_effect=_record_thread)
+
+    @idempotency.idempotent
+    async def _view(request, fail=False):
+        if fail:
+            raise RuntimeError("failed")
+        return HttpResponse("ok")
+
+    def _request(key: str):
+        request = RequestFactory().post(
+            "/idempotent-async/", headers={"Idempotency-Key": key}
+        )
+        request.auser = mocker.AsyncMock(return_value=AnonymousUser())
+        return request
+
+    async def _scenario():
+        first = await _view(_request("async-1"))
+        replayed = await _view(_request("async-1"))
+        with pytest.raises(RuntimeError):
+            await _view(_request("async-2"), fail=True)
+        return first, replayed, threading.get_ident()
+
+    # act
+    first, replayed, loop_thread = asyncio.run(_scenario())
+
+    # assert
+    assert replayed.content == first.content
+    assert replayed[idempotency.REPLAYED_HEADER] == "true"
+    # claim(add), finish(set), claim(add, get), claim(add), abort(delete)
+    assert len(store_threads) == 6
+    assert loop_thread not in store_threads
+
+
+# === admission control ===
+@pytest.mark.django_db
+def test_재고_수정이_한도를_넘으면_실행하지_않고_429_와_Retry_After_로_거절한다(
+    authed_client,
+):
+    # arrange
+    products = ProductFactory.create_batch(2)
+    for product in products:
+        ProductStockEventsFactory(product=product, version=1, change=10)
+    rejected_before = (
+        REGISTRY.get_sample_value(
+            "milly_admission_decisions_total",
+            {"route": "update-product-stock", "result": "rejected_rate"},
+        )
+        or 0
+    )
+
+    def _post(product_id: str):
+        return authed_client.post(
+            path=f"/commerce/products/{product_id}/stock/",
+            data=json.dumps({"change": 1}),
+            content_type="application/json",
+        )
+
+    # act (재배포 없이 한도 변경)
+    out = io.StringIO()
+    call_command(
+        "admission_limits",
+        "update-product-stock",
+        "--rate",
+        "0.01",
+        "--burst",
+        "1",
+        stdout=out,
+    )
+    admitted = _post(products[0].id)
+    rejected = _post(products[1].id)
+
+    # assert
+    assert "update-product-stock: rate=0.01 burst=1.0" in out.getvalue()
+    assert admitted.status_code == 200
+    assert rejected.status_code == 429
+    assert rejected.json()["msg"] == "Too many requests"
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert ProductStockEvents.objects.filter(product=products[1]).count() == 1
+    assert (
+        REGISTRY.get_sample_value(
+            "milly_admission_decisions_total",
+            {"route": "update-product-stock", "result": "rejected_rate"},
+        )
+        == rejected_before + 1
+    )
+
+
+def test_상품별_동시_실행_수를_넘는_요청은_슬롯이_풀릴_때까지_거절한다(settings):
+    # arrange
+    settings.ADMISSION_CONTROL = {
+        "ROUTES": {
+            "update-product-stock": {"CONCURRENCY_PER_KEY": 1, "KEY": "product_id"}
+        }
+    }
+    controller = AdmissionController(InMemoryAdmissionBackend())
+    first = controller.acquire("update-product-stock", "p1")
+
+    # act
+    same_product = controller.acquire("update-product-stock", "p1")
+    other_product = controller.acquire("update-product-stock", "p2")
+    controller.release(first)  # type: ignore[arg-type]
+    after_release = controller.acquire("update-product-stock", "p1")
+
+    # assert
+    assert isinstance(first, Slot)
+    assert same_product == Rejection("concurrency", 1)
+    assert isinstance(other_product, Slot)
+    assert isinstance(after_release, Slot)
+    assert controller.acquire("get-product-detail", "p1") is None
+
+
+# === 트레이싱 ===
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_SPAN_ID = "00f067aa0ba902b7"
+
+
+@pytest.mark.django_db
+def test_샘플링된_요청은_레이어별_span_을_하나의_trace_로_기록한다(
+    api_client, settings, tmp_path
+):
+    # arrange
+    product = _create_sample_product()
+    export_path = tmp_path / "traces.jsonl"
+    settings.TRACING = {"SAMPLE_RATE": 0.0, "EXPORT_PATH": str(export_path)}
+
+    # act
+    response = api_client.get(
+        path=f"/commerce/products/{product.id}/",
+        HTTP_TRACEPARENT=f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01",
+    )
+
+    # assert
+    assert response.status_code == 200
+    assert response["X-Trace-Id"] == TRACE_ID
+    (line,) = export_path.read_text().splitlines()
+    spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {span["traceId"] for span in spans} == {TRACE_ID}
+    by_id = {span["spanId"]: span for span in spans}
+
+    def _parent_name(span):
+        return by_id[span["parentSpanId"]]["name"]
+
+    (root,) = [s for s in spans if s["parentSpanId"] == PARENT_SPAN_ID]
+    assert root["name"] == "GET get-product-detail"
+    names = {span["name"]: span for span in spans}
+    usecase = names["GetProductWithCuponDiscountUsecase"]
+    assert usecase["parentSpanId"] == root["spanId"]
+    assert (
+        _parent_name(names["DjangoORMPersistenceAdapter.get_product"])
+        == "GetProductWithCuponDiscountUsecase"
+    )
+    assert (
+        _parent_name(names["CalcProductDiscountService"])
+        == "GetProductWithCuponDiscountUsecase"
+    )
+    assert _parent_name(names["serialize"]) == root["name"]
+    db_spans = [span for span in spans if span["name"] == "db.query"]
+    assert db_spans
+    assert all(
+        _parent_name(span).startswith("DjangoORMPersistenceAdapter.")
+        for span in db_spans
+    )
+
+
+@pytest.mark.django_db
+def test_샘플링되지_않은_요청은_trace_id_만_전달하고_span_을_남기지_않는다(
+    api_client, settings, tmp_path
+):
+    # arrange
+    product = _create_sample_product()
+    export_path = tmp_path / "traces.jsonl"
+    settings.TRACING = {"SAMPLE_RATE": 0.0, "EXPORT_PATH": str(export_path)}
+
+    # act
+    response = api_client.get(
+        path=f"/commerce/products/{product.id}/",
+        HTTP_TRACEPARENT=f"00-{TRACE_ID}-{PARENT_SPAN_ID}-00",
+    )
+
+    # assert
+    assert response.status_code == 200
+    assert response["X-Trace-Id"] == TRACE_ID
+    assert not export_path.exists()
@@ -2,15 +2,62 @@ from django.urls import path
 
 from commerce.adapter.web.views import (
     ProductsView,
+    bulk_upsert_product_discount_view,
+    confirm_stock_reservation_view,
     create_cupon_view,
+    get_bulk_discount_job_view,
     get_product_detail_view,
+    get_product_details_view,
+    get_stock_as_of_view,
+    get_stock_daily_rollups_view,
+    get_stock_history_view,
+    get_top_outbound_products_view,
+    quote_checkout_view,
+    release_stock_reservation_view,
+    reserve_stock_view,
+    stream_product_stock_view,
     update_product_stock_view,
     upsert_product_discount_view,
 )
 
 urlpatterns = [
+    path("checkout/quote/", quote_checkout_view, name="quote-checkout"),  # Post
+    path("checkout/reservations/", reserve_stock_view, name="reserve-stock"),  # Post
+    path(
+        "checkout/reservations/<str:reservation_id>/confirm/",
+        confirm_stock_reservation_view,
+        name="confirm-stock-reservation",
+    ),  # Post
+    path(
+        "checkout/reservations/<str:reservation_id>/release/",
+        release_stock_reservation_view,
+        name="release-stock-reservation",
+    ),  # Post
     path("coupons/", create_cupon_view, name="create-cupon"),  # Post
+    path(
+        "discounts/bulk/",
+        bulk_upsert_product_discount_view,
+        name="bulk-upsert-product-discount",
+    ),  # Post
+    path(
+        "discounts/bulk/<str:job_id>/",
+        get_bulk_discount_job_view,
+        name="get-bulk-discount-job",
+    ),  # Get
     path("products/", ProductsView.as_view(), name="products"),  # Get, Post
+    path(
+        "products/details/", get_product_details_view, name="get-product-details"
+    ),  # Get
+    path(
+        "products/stock/daily/",
+        get_top_outbound_products_view,
+        name="get-top-outbound-products",
+    ),  # Get
+    path(
+        "products/stock/stream/",
+        stream_product_stock_view,
+        name="stream-product-stock",
+    ),  # Get (SSE)
     path(
         "products/<str:product_id>/", get_product_detail_view, name="get-product-detail"
     ),  # Get
@@ -19,6 +66,21 @@ urlpatterns = [
         update_product_stock_view,
         name="update-product-stock",
     ),  # Post
+    path(
+        "products/<str:product_id>/stock/history/",
+        get_stock_history_view,
+        name="get-stock-history",
+    ),  # Get
+    path(
+        "products/<str:product_id>/stock/as-of/",
+        get_stock_as_of_view,
+        name="get-stock-as-of",
+    ),  # Get
+    path(
+        "products/<str:product_id>/stock/daily/",
+        get_stock_daily_rollups_view,
+        name="get-stock-daily-rollups",
+    ),  # Get
     path(
         "products/<str:product_id>/discounts/",
         upsert_product_discount_view,
@@ -0,0 +1,346 @@
+"""
+쓰기 경로 admission control (부하 차단)
+
+- route(url name) 별 전역 토큰 버킷: 초당 RATE 개, 최대 BURST 개까지 허용
+- route + key(url kwarg, 예: product_id) 별 동시 실행 수 제한 (CONCURRENCY_PER_KEY)
+  한 상품의 재고 version 체인은 직렬로만 쓸 수 있으므로, 넘치는 요청은 재시도 sleep 으로 워커만 잡고 있게 됨
+- 허용되지 않은 요청은 view 를 실행하지 않고 바로 429 + Retry-After
+  (common.middlewares.admission_middleware)
+- 한도는 settings 값에 캐시(Redis)에 저장된 override 를 덮어써서 사용 (admission_limits 명령)
+  각 프로세스는 RELOAD_SECONDS 마다 다시 읽으므로 재배포 없이 변경됨
+
+Redis: 토큰 버킷은 HASH(tokens, ts), 동시 실행 슬롯은 ZSET(slot_id -> 만료 시각)
+       Lua 스크립트로 원자적으로 확인/차감 (슬롯은 LEASE_SECONDS 가 지나면 죽은 프로세스 것이라도 풀림)
+REDIS_URL 미설정시(단일 노드, 테스트) 같은 동작을 프로세스 메모리로 구현한 backend 사용
+Redis 에러시에는 요청을 허용 (부하 차단 때문에 정상 요청까지 막지 않음)
+"""
+
+import logging
+import math
+import threading
+import time
+import uuid
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from functools import cache
+from typing import Any, Protocol
+
+import redis
+from django.conf import settings
+from django.core.cache import caches
+
+from common import metrics
+from common.rate_limit import TokenBucket
+from common.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADMISSION_CONTROL = {
+    "KEY_PREFIX": "milly:admission",
+    "CACHE_ALIAS": "default",
+    "RELOAD_SECONDS": 5,
+    # 동시 실행 슬롯 최대 유지 시간 (요청 deadline 보다 길게)
+    "LEASE_SECONDS": 30,
+    # 동시 실행 수 초과로 거절할 때의 Retry-After
+    "RETRY_AFTER_SECONDS": 1,
+    # url name -> {"RATE", "BURST", "CONCURRENCY_PER_KEY", "KEY"}
+    "ROUTES": {},
+}
+OVERRIDES_KEY = "admission:overrides"
+
+RATE = "rate"
+CONCURRENCY = "concurrency"
+
+
+def admission_settings() -> dict[str, Any]:
+    return {**DEFAULT_ADMISSION_CONTROL, **getattr(settings, "ADMISSION_CONTROL", {})}
+
+
+@dataclass(frozen=True)
+class RouteLimits:
+    rate: float | None = None
+    burst: float | None = None
+    concurrency_per_key: int | None = None
+    # 동시 실행 수를 나눌 url kwarg 이름
+    key: str | None = None
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "RouteLimits":
+        rate = config.get("RATE")
+        return cls(
+            rate=rate,
+            burst=config.get("BURST") or rate,
+            concurrency_per_key=config.get("CONCURRENCY_PER_KEY"),
+            key=config.get("KEY"),
+        )
+
+
+@dataclass(frozen=True)
+class Slot:
+    """허용된 요청. 실행이 끝나면 release"""
+
+    route: str
+    key: str | None = None
+    # 동시 실행 슬롯을 잡지 않은 경우 None
+    slot_id: str | None = None
+
+
+@dataclass(frozen=True)
+class Rejection:
+    reason: str
+    retry_after: float
+
+
+class AdmissionBackend(Protocol):
+    def acquire(
+        self, route: str, key: str | None, limits: RouteLimits, slot_id: str
+    ) -> Rejection | None:
+        """허용하면 None (key 와 동시 실행 제한이 있으면 slot_id 로 슬롯을 잡음)"""
+        ...
+
+    def release(self, route: str, key: str, slot_id: str) -> None: ...
+
+
+class InMemoryAdmissionBackend:
+    """프로세스 하나 기준의 한도 (단일 노드)"""
+
+    def __init__(self) -> None:
+        self._buckets: dict[str, TokenBucket] = {}
+        self._in_flight: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(
+        self, route: str, key: str | None, limits: RouteLimits, slot_id: str
+    ) -> Rejection | None:
+        slot = (
+            (route, key)
+            if key is not None and limits.concurrency_per_key is not None
+            else None
+        )
+        with self._lock:
+            if (
+                slot is not None
+                and self._in_flight.get(slot, 0) >= limits.concurrency_per_key  # type: ignore[operator]
+            ):
+                return Rejection(CONCURRENCY, 0.0)
+            if limits.rate:
+                burst = limits.burst or limits.rate
+                if (bucket := self._buckets.get(route)) is None:
+                    bucket = self._buckets[route] = TokenBucket(limits.rate, burst)
+                else:
+                    bucket.rate, bucket.burst = limits.rate, burst
+                if not bucket.take():
+                    return Rejection(RATE, bucket.retry_after())
+            if slot is not None:
+                self._in_flight[slot] = self._in_flight.get(slot, 0) + 1
+        return None
+
+    def release(self, route: str, key: str, slot_id: str) -> None:
+        with self._lock:
+            if (count := self._in_flight.get((route, key), 0) - 1) > 0:
+                self._in_flight[(route, key)] = count
+            else:
+                self._in_flight.pop((route, key), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._in_flight.clear()
+
+
+# KEYS: 토큰 버킷 키, 슬롯 키, ARGV: now, rate, burst, concurrency, slot_id, lease
+# 반환: {거절 사유, retry_after} (허용시 사유가 빈 문자열)
+_ACQUIRE = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local concurrency = tonumber(ARGV[4])
+local lease = tonumber(ARGV[6])
+if concurrency > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+    if redis.call('ZCARD', KEYS[2]) >= concurrency then
+        return {'concurrency', '0'}
+    end
+end
+if rate > 0 then
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        return {'rate', tostring((1 - tokens) / rate)}
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+end
+if concurrency > 0 then
+    redis.call('ZADD', KEYS[2], now + lease, ARGV[5])
+    redis.call('PEXPIRE', KEYS[2], math.ceil(lease * 1000))
+end
+return {'', '0'}
+"""
+
+
+class RedisAdmissionBackend:
+    """여러 노드가 공유하는 한도"""
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        key_prefix: str,
+        lease: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._client = client
+        self._prefix = key_prefix
+        self._lease = lease
+        self._clock = clock
+        self._acquire = client.register_script(_ACQUIRE)
+
+    def _keys(self, route: str, key: str | None) -> list[str]:
+        # route 의 키를 같은 hash tag 로 묶어 Redis Cluster 에서도 한 슬롯에 위치
+        base = f"{self._prefix}:{{{route}}}"
+        return [f"{base}:bucket", f"{base}:slots:{key}"]
+
+    def acquire(
+        self, route: str, key: str | None, limits: RouteLimits, slot_id: str
+    ) -> Rejection | None:
+        concurrency = limits.concurrency_per_key if key is not None else None
+        reason, retry_after = self._acquire(
+            keys=self._keys(route, key),
+            args=[
+                self._clock(),
+                limits.rate or 0,
+                limits.burst or limits.rate or 0,
+                concurrency or 0,
+                slot_id,
+                self._lease,
+            ],
+        )
+        if not reason:
+            return None
+        return Rejection(reason.decode(), float(retry_after))
+
+    def release(self, route: str, key: str, slot_id: str) -> None:
+        self._client.zrem(self._keys(route, key)[1], slot_id)
+
+
+class AdmissionController:
+    """settings + override 한도로 route 별 요청을 허용/거절"""
+
+    def __init__(
+        self, backend: AdmissionBackend, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.backend = backend
+        self._clock = clock
+        self._limits: dict[str, RouteLimits] = {}
+        self._loaded_at = -math.inf
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> dict[str, Any]:
+        return admission_settings()
+
+    def _reload_if_stale(self) -> None:
+        if self._clock() - self._loaded_at >= self.config["RELOAD_SECONDS"]:
+            self.reload()
+
+    def enabled(self) -> bool:
+        """한도가 설정된 route 가 있는지"""
+        self._reload_if_stale()
+        return bool(self._limits)
+
+    def limits(self, route: str) -> RouteLimits | None:
+        self._reload_if_stale()
+        return self._limits.get(route)
+
+    def routes(self) -> dict[str, RouteLimits]:
+        self.reload()
+        return dict(self._limits)
+
+    def reload(self) -> None:
+        config = self.config
+        routes = {
+            route: dict(route_config)
+            for route, route_config in config["ROUTES"].items()
+        }
+        try:
+            overrides = caches[config["CACHE_ALIAS"]].get(OVERRIDES_KEY) or {}
+        except redis.RedisError:
+            # 읽지 못하면 settings 값으로 동작, 다음 주기에 다시 시도
+            logger.warning("admission overrides unavailable", exc_info=True)
+            overrides = {}
+        for route, override in overrides.items():
+            routes[route] = {**routes.get(route, {}), **override}
+        limits = {
+            route: RouteLimits.from_config(route_config)
+            for route, route_config in routes.items()
+        }
+        with self._lock:
+            self._limits = limits
+            self._loaded_at = self._clock()
+        for route, route_limits in limits.items():
+            for name in (RATE, "burst", "concurrency_per_key"):
+                value = getattr(route_limits, name)
+                metrics.ADMISSION_LIMITS.labels(route, name).set(
+                    value if value is not None else math.inf
+                )
+
+    def acquire(self, route: str, key: str | None = None) -> Slot | Rejection | None:
+        """한도가 없는 route 면 None"""
+        if (limits := self.limits(route)) is None:
+            return None
+        if limits.key is None:
+            key = None
+        slot_id = uuid.uuid4().hex
+        try:
+            rejection = self.backend.acquire(route, key, limits, slot_id)
+        except redis.RedisError:
+            logger.warning("admission backend unavailable", exc_info=True)
+            metrics.ADMISSION_DECISIONS.labels(route, "error").inc()
+            return Slot(route)
+        if rejection is not None:
+            metrics.ADMISSION_DECISIONS.labels(
+                route, f"rejected_{rejection.reason}"
+            ).inc()
+            if rejection.reason == CONCURRENCY:
+                return Rejection(CONCURRENCY, self.config["RETRY_AFTER_SECONDS"])
+            return rejection
+        metrics.ADMISSION_DECISIONS.labels(route, "admitted").inc()
+        if key is None or limits.concurrency_per_key is None:
+            return Slot(route)
+        return Slot(route, key, slot_id)
+
+    def release(self, slot: Slot) -> None:
+        if slot.key is None or slot.slot_id is None:
+            return
+        try:
+            self.backend.release(slot.route, slot.key, slot.slot_id)
+        except redis.RedisError:
+            # 풀지 못한 슬롯은 LEASE_SECONDS 후에 만료됨
+            logger.warning("admission slot release failed", exc_info=True)
+
+
+def set_route_overrides(route: str, override: Mapping[str, Any] | None) -> None:
+    """route 한도 override 저장 (None 이면 삭제, settings 값으로 돌아감)"""
+    cache_ = caches[admission_settings()["CACHE_ALIAS"]]
+    overrides = cache_.get(OVERRIDES_KEY) or {}
+    if override is None:
+        overrides.pop(route, None)
+    else:
+        overrides[route] = {**overrides.get(route, {}), **override}
+    cache_.set(OVERRIDES_KEY, overrides, None)
+
+
+@cache
+def get_admission_controller() -> AdmissionController:
+    """REDIS_URL 이 설정되어 있으면 Redis, 아니면 프로세스 메모리 backend"""
+    config = admission_settings()
+    backend: AdmissionBackend
+    if (client := get_redis()) is not None:
+        backend = RedisAdmissionBackend(
+            client, config["KEY_PREFIX"], lease=config["LEASE_SECONDS"]
+        )
+    else:
+        backend = InMemoryAdmissionBackend()
+    return AdmissionController(backend)
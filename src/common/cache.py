@@ -0,0 +1,314 @@
+"""
+계측되는 캐시 접근 헬퍼 (django cache framework 위에서 동작)
+
+- 조회 결과를 hit/miss 로 CACHE_REQUESTS 메트릭에 기록 (cache label = 용도별 이름)
+- 샘플링된 요청이면 cache span 을 남김
+- get_or_load 는 같은 키의 동시 miss 를 loader 1번으로 합침 (single-flight)
+  - 프로세스 안: 먼저 온 요청이 loader 를 실행하고 나머지는 그 결과를 기다림
+  - 프로세스 사이: 캐시(Redis)에 짧은 lock 을 add 한 프로세스만 loader 를 실행하고,
+    나머지는 값이 채워질 때까지 잠시 기다림 (기다려도 없으면 직접 조회)
+- stale_timeout 을 주면 stale-while-revalidate
+  - 값은 timeout + stale_timeout(hard TTL) 동안, "{key}:fresh" 표시는 timeout(soft TTL) 동안 저장
+  - 표시가 없으면(soft TTL 지남) 저장된 값을 바로 반환하고 백그라운드 스레드에서 다시 채움
+  - 값까지 없을 때(hard TTL 지남)만 요청이 조회를 기다림
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import Any
+
+from django.core.cache import caches
+from django.db import connections
+
+from common import deadline, metrics, tracing
+
+MISSING: Any = object()
+
+# 캐시 채우기 lock 유지 시간 (loader 가 이보다 오래 걸리면 다른 프로세스도 조회할 수 있음)
+FILL_LOCK_SECONDS = 2.0
+# 다른 요청의 loader 결과를 기다리는 최대 시간 (요청 deadline 이 더 짧으면 그만큼만)
+FILL_WAIT_SECONDS = 1.0
+FILL_POLL_SECONDS = 0.01
+# 백그라운드 갱신 스레드 수, 대기 중인 갱신 최대 개수 (넘치면 갱신하지 않고 다음 요청에 맡김)
+REFRESH_WORKERS = 4
+REFRESH_MAX_PENDING = 100
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """프로세스 안에서 진행 중인 캐시 채우기 하나"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = MISSING
+        self.error: BaseException | None = None
+
+
+# adapter 는 요청마다 생성되므로 진행 중인 채우기는 프로세스 전역으로 관리 ((alias, key) -> _Flight)
+_flights: dict[tuple[str, str], _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def _wait_budget(seconds: float) -> float:
+    if (left := deadline.remaining()) is None:
+        return seconds
+    return max(0.0, min(seconds, left))
+
+
+def _fresh_key(key: str) -> str:
+    return f"{key}:fresh"
+
+
+@cache
+def _refresh_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=REFRESH_WORKERS, thread_name_prefix="cache-refresh"
+    )
+
+
+_refresh_slots = threading.BoundedSemaphore(REFRESH_MAX_PENDING)
+
+
+def _refresh_in_background(job: Callable[[], None]) -> bool:
+    """갱신 작업을 스레드 풀에 넣음. 대기 중인 작업이 너무 많으면 False"""
+    if not _refresh_slots.acquire(blocking=False):
+        return False
+
+    def _run() -> None:
+        try:
+            job()
+        except Exception:
+            logger.warning("cache refresh failed", exc_info=True)
+        finally:
+            _refresh_slots.release()
+            # 요청 스레드가 아니므로 이 스레드의 DB 커넥션을 직접 정리
+            connections.close_all()
+
+    _refresh_pool().submit(_run)
+    return True
+
+
+class InstrumentedCache:
+    def __init__(
+        self,
+        name: str,
+        alias: str = "default",
+        fill_lock_seconds: float = FILL_LOCK_SECONDS,
+        fill_wait_seconds: float = FILL_WAIT_SECONDS,
+    ) -> None:
+        self.name = name
+        self.alias = alias
+        self.fill_lock_seconds = fill_lock_seconds
+        self.fill_wait_seconds = fill_wait_seconds
+        self._hits = metrics.CACHE_REQUESTS.labels(name, "hit")
+        self._misses = metrics.CACHE_REQUESTS.labels(name, "miss")
+        self._stale = metrics.CACHE_REQUESTS.labels(name, "stale")
+
+    @property
+    def backend(self) -> Any:
+        # caches[alias] 는 스레드별 인스턴스라 매번 조회
+        return caches[self.alias]
+
+    def _span(self, operation: str) -> tracing.Span | tracing.NoopSpan:
+        return tracing.start_span(
+            f"cache.{operation}",
+            tracing.CACHE,
+            kind=tracing.SPAN_KIND_CLIENT,
+            **{"cache.name": self.name},
+        )
+
+    def get(self, key: str) -> Any:
+        """없으면 MISSING 반환 (None 도 캐시할 수 있도록)"""
+        with self._span("get") as span:
+            value = self.backend.get(key, MISSING)
+            hit = value is not MISSING
+            span.set_attribute("cache.hit", hit)
+        (self._hits if hit else self._misses).inc()
+        return value
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """있는 키만 반환"""
+        with self._span("get_many") as span:
+            values = self.backend.get_many(keys)
+            span.set_attribute("cache.hits", len(values))
+        self._hits.inc(len(values))
+        self._misses.inc(len(keys) - len(values))
+        return values
+
+    def set(
+        self, key: str, value: Any, timeout: float | None, stale_timeout: float = 0
+    ) -> None:
+        """stale_timeout: soft TTL(timeout) 이 지난 뒤에도 값을 유지할 시간 (get_or_load 참고)"""
+        with self._span("set"):
+            if not stale_timeout or timeout is None:
+                self.backend.set(key, value, timeout)
+                return
+            self.backend.set(key, value, timeout + stale_timeout)
+            self.backend.set(_fresh_key(key), 1, timeout)
+
+    def set_many(
+        self, values: dict[str, Any], timeout: float | None, stale_timeout: float = 0
+    ) -> None:
+        with self._span("set_many"):
+            if not stale_timeout or timeout is None:
+                self.backend.set_many(values, timeout)
+                return
+            self.backend.set_many(values, timeout + stale_timeout)
+            self.backend.set_many({_fresh_key(key): 1 for key in values}, timeout)
+
+    def add(self, key: str, value: Any, timeout: float | None) -> bool:
+        """키가 없을 때만 저장. 저장했으면 True"""
+        with self._span("add"):
+            return self.backend.add(key, value, timeout)
+
+    def delete(self, key: str) -> None:
+        with self._span("delete"):
+            self.backend.delete(key)
+
+    def delete_many(self, keys: list[str]) -> None:
+        with self._span("delete_many"):
+            self.backend.delete_many(keys)
+
+    def get_or_load[T](
+        self,
+        key: str,
+        loader: Callable[[], T],
+        timeout: float,
+        stale_timeout: float = 0,
+    ) -> T:
+        """
+        없으면 loader 결과를 저장 후 반환. 같은 키의 동시 miss 는 loader 를 1번만 실행
+        stale_timeout 을 주면 timeout 이 지난 값도 그 시간 동안은 바로 반환하고 백그라운드에서 갱신
+        """
+        if stale_timeout:
+            value = self._get_or_refresh(key, loader, timeout, stale_timeout)
+        else:
+            value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        flight_key = (self.alias, key)
+        with _flights_lock:
+            flight = _flights.get(flight_key)
+            leader = flight is None
+            if flight is None:
+                flight = _flights[flight_key] = _Flight()
+        if not leader:
+            if flight.done.wait(_wait_budget(self.fill_wait_seconds)):
+                metrics.CACHE_COALESCED.labels(self.name, "process").inc()
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value
+            # 먼저 온 요청의 loader 가 너무 오래 걸리면 직접 조회 (캐시는 leader 가 채움)
+            return loader()
+
+        try:
+            flight.value = self._fill(key, loader, timeout, stale_timeout)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with _flights_lock:
+                _flights.pop(flight_key, None)
+            flight.done.set()
+
+    def get_or_load_later[T](
+        self,
+        key: str,
+        loader: Callable[[], T],
+        timeout: float,
+        stale_timeout: float = 0,
+    ) -> Any:
+        """
+        get_or_load 와 같지만 요청이 조회를 기다리지 않음 (비싼 집계용)
+        없으면 백그라운드에서 채우고 MISSING 반환
+        """
+        if stale_timeout:
+            value = self._get_or_refresh(key, loader, timeout, stale_timeout)
+        else:
+            value = self.get(key)
+        if value is not MISSING:
+            return value
+        lock_key = f"{key}:fill-lock"
+        if self.backend.add(lock_key, 1, self.fill_lock_seconds):
+
+            def _load() -> None:
+                try:
+                    self.set(key, loader(), timeout, stale_timeout)
+                finally:
+                    self.backend.delete(lock_key)
+
+            _refresh_in_background(_load)
+        return MISSING
+
+    def _get_or_refresh[T](
+        self, key: str, loader: Callable[[], T], timeout: float, stale_timeout: float
+    ) -> Any:
+        """값이 있으면 반환 (soft TTL 이 지났으면 백그라운드 갱신 시작), 없으면 MISSING"""
+        fresh_key = _fresh_key(key)
+        with self._span("get_many") as span:
+            values = self.backend.get_many([key, fresh_key])
+            span.set_attribute("cache.hit", key in values)
+        if key not in values:
+            self._misses.inc()
+            return MISSING
+        if fresh_key in values:
+            self._hits.inc()
+            return values[key]
+
+        self._stale.inc()
+        # fresh 표시를 lock 으로 사용: add 에 성공한 요청 하나만 갱신
+        # (갱신이 실패하면 lock 시간이 지난 뒤 다른 요청이 다시 시도)
+        if self.backend.add(fresh_key, 1, self.fill_lock_seconds):
+
+            def _refresh() -> None:
+                self.set(key, loader(), timeout, stale_timeout)
+
+            _refresh_in_background(_refresh)
+        return values[key]
+
+    def _fill[T](
+        self,
+        key: str,
+        loader: Callable[[], T],
+        timeout: float,
+        stale_timeout: float = 0,
+    ) -> T:
+        """다른 프로세스와 동시에 채우지 않도록 lock 을 잡은 프로세스만 loader 실행"""
+        lock_key = f"{key}:fill-lock"
+        with self._span("add"):
+            locked = self.backend.add(lock_key, 1, self.fill_lock_seconds)
+        if not locked:
+            wait_until = time.monotonic() + _wait_budget(self.fill_wait_seconds)
+            while time.monotonic() < wait_until:
+                time.sleep(FILL_POLL_SECONDS)
+                if (value := self.backend.get(key, MISSING)) is not MISSING:
+                    metrics.CACHE_COALESCED.labels(self.name, "cluster").inc()
+                    return value
+        try:
+            value = loader()
+            self.set(key, value, timeout, stale_timeout)
+            return value
+        finally:
+            if locked:
+                self.backend.delete(lock_key)
+
+    def generation(self, key: str) -> int:
+        """무효화용 세대 번호 (없으면 0)"""
+        with self._span("get"):
+            return self.backend.get(key, 0)
+
+    def bump_generation(self, key: str) -> None:
+        """세대 번호를 올려서 이 번호를 key 에 포함한 캐시 전체를 무효화"""
+        with self._span("incr"):
+            try:
+                self.backend.incr(key)
+            except ValueError:
+                # 키가 없거나 만료된 경우
+                self.backend.add(key, 1, None)
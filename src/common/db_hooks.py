@@ -0,0 +1,39 @@
+"""
+모든 DB 커넥션에 execute wrapper 를 등록하기 위한 훅
+
+connection.execute_wrapper() 컨텍스트 매니저는 현재 스레드의 커넥션에만 적용되므로,
+ASGI(sync_to_async 스레드)나 워커 스레드에서 실행되는 쿼리까지 잡기 위해
+커넥션이 만들어질 때(connection_created) 전역 wrapper 를 붙임.
+wrapper 는 contextvar 로 활성화 여부를 판단해서 비활성시 비용을 최소화해야 함.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+ExecuteWrapper = Callable[..., Any]
+
+_wrappers: list[ExecuteWrapper] = []
+
+
+def _install(connection: Any) -> None:
+    for wrapper in _wrappers:
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+
+def _on_connection_created(sender: Any, connection: Any, **kwargs: Any) -> None:
+    _install(connection)
+
+
+def register_execute_wrapper(wrapper: ExecuteWrapper) -> None:
+    if wrapper not in _wrappers:
+        _wrappers.append(wrapper)
+    # 이미 열려있는 (현재 스레드의) 커넥션에도 적용
+    for connection in connections.all(initialized_only=True):
+        _install(connection)
+
+
+connection_created.connect(_on_connection_created)
@@ -0,0 +1,109 @@
+"""
+요청 단위 deadline (남은 시간 예산)
+
+- DeadlineMiddleware 가 요청 헤더 또는 route 별 기본값으로 deadline 을 설정
+- contextvar 로 usecase / 재시도 정책 / 영속성 어댑터까지 전달됨 (sync_to_async 스레드 포함)
+- DB 쿼리는 남은 시간을 서버측 실행 제한으로 걸어서, 클라이언트가 포기한 뒤에도
+  쿼리가 끝까지 도는 일이 없도록 함
+  - MySQL: SELECT 에 MAX_EXECUTION_TIME optimizer hint
+  - SQLite: progress handler 로 실행 중단
+"""
+
+import re
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from django.db import DatabaseError
+
+from common.db_hooks import register_execute_wrapper
+from common.exceptions import DeadlineExceeded
+
+# MySQL 에서 MAX_EXECUTION_TIME 초과로 중단된 쿼리의 에러 코드
+_MYSQL_EXECUTION_TIMEOUT_ERRORS = {3024, 1969}
+# SQLite progress handler 호출 간격 (VM instruction 수)
+_SQLITE_PROGRESS_STEPS = 1000
+_SELECT = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(timeout: float | None) -> Iterator[None]:
+    """timeout 초 후를 deadline 으로 설정. 바깥에 더 빠른 deadline 이 있으면 그대로 유지"""
+    if timeout is None:
+        yield
+        return
+    deadline = time.monotonic() + timeout
+    if (outer := _deadline.get()) is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """남은 시간(초). deadline 이 없으면 None"""
+    if (deadline := _deadline.get()) is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def has_budget(seconds: float) -> bool:
+    return (left := remaining()) is None or left >= seconds
+
+
+def check(operation: str = "") -> None:
+    if (left := remaining()) is not None and left <= 0:
+        raise DeadlineExceeded(operation or None)
+
+
+def with_max_execution_time(sql: str, timeout_ms: int) -> str:
+    """MySQL SELECT 에 실행 시간 제한 hint 추가 (SELECT 가 아니면 그대로)"""
+    if not _SELECT.match(sql):
+        return sql
+    return _SELECT.sub(f"SELECT /*+ MAX_EXECUTION_TIME({timeout_ms}) */", sql, count=1)
+
+
+def _deadline_execute(execute, sql, params, many, context):  # type: ignore[no-untyped-def]
+    if (deadline := _deadline.get()) is None:
+        return execute(sql, params, many, context)
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded("db query")
+
+    connection = context["connection"]
+    if connection.vendor == "mysql":
+        sql = with_max_execution_time(sql, max(1, int(left * 1000)))
+        try:
+            return execute(sql, params, many, context)
+        except DatabaseError as e:
+            if _mysql_error_code(e) in _MYSQL_EXECUTION_TIMEOUT_ERRORS:
+                raise DeadlineExceeded("db query") from e
+            raise
+    if connection.vendor == "sqlite":
+        raw = connection.connection
+        raw.set_progress_handler(
+            lambda: int(time.monotonic() > deadline), _SQLITE_PROGRESS_STEPS
+        )
+        try:
+            return execute(sql, params, many, context)
+        except DatabaseError as e:
+            if time.monotonic() > deadline:
+                raise DeadlineExceeded("db query") from e
+            raise
+        finally:
+            raw.set_progress_handler(None, 0)
+    return execute(sql, params, many, context)
+
+
+def _mysql_error_code(error: DatabaseError) -> Any:
+    cause = error.__cause__ or error
+    return cause.args[0] if cause.args else None
+
+
+register_execute_wrapper(_deadline_execute)
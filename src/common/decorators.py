@@ -3,19 +3,33 @@ from collections.abc import Callable
 from functools import wraps
 from typing import Any
 
+from asgiref.sync import iscoroutinefunction
 from django.http import HttpRequest
 
 
-# JSON body 파싱 데코레이터, 반복 줄이기 위해 추가
+def _load_json_body(request: HttpRequest) -> Any:
+    try:
+        return json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return {}
+
+
+# JSON body 파싱 데코레이터, 반복 줄이기 위해 추가 (async view 도 지원)
 def parse_json_form_body[T](func: Callable[..., T]) -> Callable[..., T]:
+    if iscoroutinefunction(func):
+
+        @wraps(func)
+        async def _async_wrapper(
+            request: HttpRequest, *args: Any, **kwargs: Any
+        ) -> Any:
+            return await func(request, _load_json_body(request), *args, **kwargs)  # type: ignore[misc]
+
+        return _async_wrapper  # type: ignore[return-value]
+
     @wraps(func)
     def _wrapper(
         request: HttpRequest, *args: dict[Any, Any], **kwargs: dict[Any, Any]
     ) -> T:
-        try:
-            payload = json.loads(request.body or "{}")
-        except json.JSONDecodeError:
-            payload = {}
-        return func(request, payload, *args, **kwargs)
+        return func(request, _load_json_body(request), *args, **kwargs)
 
     return _wrapper
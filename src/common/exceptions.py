@@ -60,3 +60,33 @@ class ParameterRequired(InvalidParameter):
 class Unauthenticated(ClientException):
     status = 401
     msg = "Unauthenticated"
+
+
+class DeadlineExceeded(MillyException):
+    status = 504
+    msg = "Request deadline exceeded"
+
+
+class ServiceUnavailable(MillyException):
+    status = 503
+    msg = "Service unavailable"
+
+
+class StreamingNotSupported(MillyException):
+    status = 501
+    msg = "Streaming requires an ASGI server"
+
+
+class IdempotentRequestInProgress(ClientException):
+    status = 409
+    msg = "Request with the same idempotency key is in progress"
+
+
+class IdempotencyKeyReused(ClientException):
+    status = 422
+    msg = "Idempotency key reused with a different request"
+
+
+class TooManyRequests(ClientException):
+    status = 429
+    msg = "Too many requests"
@@ -0,0 +1,178 @@
+"""
+Idempotency-Key 헤더로 재시도된 쓰기 요청을 한 번만 실행
+
+- (사용자, 요청 경로, 키) 별로 처음 성공한 응답을 캐시(Redis)에 저장하고, 같은 키로 다시 오면 저장된 응답을 반환
+- 같은 키의 요청이 실행 중이면 새로 실행하지 않고 끝날 때까지 기다렸다가 그 응답을 반환
+  (WAIT_SECONDS 또는 요청 deadline 까지 기다려도 끝나지 않으면 409)
+- 같은 키로 다른 body 를 보내면 422
+- 실패 응답(2xx 가 아닌 응답, 예외)은 저장하지 않으므로 같은 키로 다시 시도할 수 있음
+- Redis 에러시 프로세스 로컬 캐시로 대체 (best-effort)
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+import redis
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpRequest, HttpResponse
+
+from common import deadline
+from common.exceptions import IdempotencyKeyReused, IdempotentRequestInProgress
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDEMPOTENCY = {
+    "HEADER": "Idempotency-Key",
+    "CACHE_ALIAS": "default",
+    # 저장된 응답 보관 시간
+    "TTL_SECONDS": 24 * 60 * 60,
+    # 실행 중 표시 유지 시간 (프로세스가 죽어도 이 시간이 지나면 다시 실행 가능)
+    "LOCK_SECONDS": 30,
+    "WAIT_SECONDS": 10,
+    "POLL_SECONDS": 0.02,
+}
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+_PENDING = "pending"
+_DONE = "done"
+
+_fallback = LocMemCache("idempotency", {"OPTIONS": {"MAX_ENTRIES": 10_000}})
+
+
+def idempotency_settings() -> dict[str, Any]:
+    return {**DEFAULT_IDEMPOTENCY, **getattr(settings, "IDEMPOTENCY", {})}
+
+
+def _cache_call(alias: str, method: str, *args: Any) -> Any:
+    try:
+        return getattr(caches[alias], method)(*args)
+    except redis.RedisError:
+        logger.warning("idempotency store unavailable", exc_info=True)
+        return getattr(_fallback, method)(*args)
+
+
+class _Attempt:
+    """Idempotency-Key 가 있는 요청 하나의 처리 상태"""
+
+    def __init__(self, request: HttpRequest, key: str, user_id: str) -> None:
+        self.config = idempotency_settings()
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        self.cache_key = f"idempotency:{user_id}:{request.path}:{digest}"
+        self.fingerprint = hashlib.sha256(
+            request.method.encode() + b"\n" + request.body  # type: ignore[union-attr]
+        ).hexdigest()
+        self.started = time.monotonic()
+
+    def _store(self, method: str, *args: Any) -> Any:
+        return _cache_call(self.config["CACHE_ALIAS"], method, self.cache_key, *args)
+
+    def claim(self) -> HttpResponse | bool:
+        """
+        True: 이 요청이 실행, False: 다른 요청이 실행 중이므로 대기 후 다시 호출
+        HttpResponse: 저장된 응답
+        """
+        record = {"state": _PENDING, "fingerprint": self.fingerprint}
+        if self._store("add", record, self.config["LOCK_SECONDS"]):
+            return True
+        if (record := self._store("get")) is None:
+            # 그 사이에 실행 중 표시가 사라짐
+            return False
+        if record["fingerprint"] != self.fingerprint:
+            raise IdempotencyKeyReused
+        if record["state"] == _DONE:
+            response = HttpResponse(
+                record["content"],
+                status=record["status"],
+                content_type=record["content_type"],
+            )
+            response[REPLAYED_HEADER] = "true"
+            return response
+        waited = time.monotonic() - self.started
+        if waited >= self.config["WAIT_SECONDS"] or not deadline.has_budget(
+            self.config["POLL_SECONDS"]
+        ):
+            raise IdempotentRequestInProgress
+        return False
+
+    def finish(self, response: HttpResponse) -> HttpResponse:
+        if 200 <= response.status_code < 300:
+            self._store(
+                "set",
+                {
+                    "state": _DONE,
+                    "fingerprint": self.fingerprint,
+                    "status": response.status_code,
+                    "content": response.content,
+                    "content_type": response["Content-Type"],
+                },
+                self.config["TTL_SECONDS"],
+            )
+        else:
+            self.abort()
+        return response
+
+    def abort(self) -> None:
+        self._store("delete")
+
+
+def _key(request: HttpRequest) -> str | None:
+    return request.headers.get(idempotency_settings()["HEADER"]) or None
+
+
+def idempotent[T](func: Callable[..., T]) -> Callable[..., T]:
+    """쓰기 view 에 적용. Idempotency-Key 헤더가 없으면 그대로 실행 (async view 도 지원)"""
+    if iscoroutinefunction(func):
+
+        @wraps(func)
+        async def _async_wrapper(
+            request: HttpRequest, *args: Any, **kwargs: Any
+        ) -> Any:
+            if (key := _key(request)) is None:
+                return await func(request, *args, **kwargs)  # type: ignore[misc]
+            user = await request.auser()
+            attempt = _Attempt(
+                request, key, str(user.pk) if user.is_authenticated else "anonymous"
+            )
+            # 캐시(Redis) 호출은 동기이므로 이벤트 루프를 막지 않도록 스레드풀에서 실행
+            claim = sync_to_async(attempt.claim, thread_sensitive=False)
+            while (claimed := await claim()) is False:
+                await asyncio.sleep(attempt.config["POLL_SECONDS"])
+            if isinstance(claimed, HttpResponse):
+                return claimed
+            try:
+                response = await func(request, *args, **kwargs)  # type: ignore[misc]
+            except BaseException:
+                await sync_to_async(attempt.abort, thread_sensitive=False)()
+                raise
+            return await sync_to_async(attempt.finish, thread_sensitive=False)(response)
+
+        return _async_wrapper  # type: ignore[return-value]
+
+    @wraps(func)
+    def _wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+        if (key := _key(request)) is None:
+            return func(request, *args, **kwargs)
+        user = request.user
+        attempt = _Attempt(
+            request, key, str(user.pk) if user.is_authenticated else "anonymous"
+        )
+        while (claimed := attempt.claim()) is False:
+            time.sleep(attempt.config["POLL_SECONDS"])
+        if isinstance(claimed, HttpResponse):
+            return claimed
+        try:
+            response = func(request, *args, **kwargs)
+        except BaseException:
+            attempt.abort()
+            raise
+        return attempt.finish(response)  # type: ignore[arg-type]
+
+    return _wrapper
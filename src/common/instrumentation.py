@@ -0,0 +1,113 @@
+"""
+헥사고날 레이어(usecase, service, persistence adapter) 계측 훅
+
+메서드 실행 구간을 "<클래스>.<메서드>" 이름의 scope 로 감싸서
+- 쿼리 기록(common.query_budget) 에서 어느 레이어의 비용인지 구분하고
+- 레이어별 latency 히스토그램(common.metrics) 을 기록하고
+- 샘플링된 요청이면 trace span(common.tracing) 을 남김
+"""
+
+import inspect
+import time
+from collections.abc import Callable, Iterator
+from functools import wraps
+from typing import Any
+
+from common import metrics, tracing
+from common.query_budget import query_scope
+
+ADAPTER = tracing.ADAPTER
+USECASE = tracing.USECASE
+SERVICE = tracing.SERVICE
+
+_DURATIONS = {
+    ADAPTER: metrics.ADAPTER_DURATION,
+    USECASE: metrics.USECASE_DURATION,
+}
+
+
+def instrument[F: Callable[..., Any]](layer: str, name: str) -> Callable[[F], F]:
+    histogram = _DURATIONS[layer].labels(name) if layer in _DURATIONS else None
+
+    def decorator(func: F) -> F:
+        if inspect.isgeneratorfunction(func):
+
+            @wraps(func)
+            def _gen_wrapper(*args: Any, **kwargs: Any) -> Iterator[Any]:
+                # yield 사이(호출자 코드 실행중)에는 scope/span 이 풀려있도록 next() 단위로 감싸고,
+                # latency 는 next() 실행 시간의 합으로 기록
+                it = func(*args, **kwargs)
+                span = tracing.start_span(name, layer)
+                elapsed = 0.0
+                try:
+                    while True:
+                        started = time.perf_counter()
+                        with query_scope(name), tracing.use_span(span):
+                            try:
+                                item = next(it)
+                            except StopIteration:
+                                return
+                            except Exception as e:
+                                span.record_error(e)
+                                raise
+                            finally:
+                                elapsed += time.perf_counter() - started
+                        yield item
+                finally:
+                    it.close()
+                    span.end()
+                    if histogram is not None:
+                        histogram.observe(elapsed)
+
+            return _gen_wrapper  # type: ignore[return-value]
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def _async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    with query_scope(name), tracing.start_span(name, layer):
+                        return await func(*args, **kwargs)
+                finally:
+                    if histogram is not None:
+                        histogram.observe(time.perf_counter() - started)
+
+            return _async_wrapper  # type: ignore[return-value]
+
+        @wraps(func)
+        def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                with query_scope(name), tracing.start_span(name, layer):
+                    return func(*args, **kwargs)
+            finally:
+                if histogram is not None:
+                    histogram.observe(time.perf_counter() - started)
+
+        return _wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def instrument_adapter[T: type](cls: T) -> T:
+    """영속성 어댑터의 public 메서드 전체를 계측"""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not inspect.isfunction(value):
+            continue
+        setattr(cls, attr, instrument(ADAPTER, f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+def instrument_usecase[T: type](cls: T) -> T:
+    """유스케이스의 execute (비동기 버전 aexecute 가 있으면 함께) 를 계측"""
+    cls.execute = instrument(USECASE, cls.__name__)(cls.execute)  # type: ignore[attr-defined]
+    if aexecute := vars(cls).get("aexecute"):
+        cls.aexecute = instrument(USECASE, cls.__name__)(aexecute)  # type: ignore[attr-defined]
+    return cls
+
+
+def instrument_service[T: type](cls: T) -> T:
+    """도메인 서비스의 execute 를 계측 (span 만 기록)"""
+    cls.execute = instrument(SERVICE, cls.__name__)(cls.execute)  # type: ignore[attr-defined]
+    return cls
@@ -0,0 +1,130 @@
+"""
+구조화(JSON) 로그 파이프라인
+
+- AsyncQueueHandler: 요청 스레드에서는 record 를 큐에 넣기만 하고,
+  포맷팅(스택 트레이스 포함)과 출력은 QueueListener 스레드에서 처리
+- JsonFormatter: 한 줄 JSON (request_id, route, exception_class 등 extra 필드 포함)
+- ExceptionSamplingFilter: 예외 클래스별 샘플링 + 초당 허용량(token bucket) 제한.
+  버려진 개수는 다음으로 기록되는 같은 클래스 로그의 suppressed 필드로 남김
+
+settings.LOGGING (dictConfig) 에서 조합해서 사용
+"""
+
+import json
+import logging
+import random
+import threading
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+from common import metrics
+from common.rate_limit import TokenBucket
+from common.tracing import current_trace_id
+
+# LogRecord 기본 속성 (이외의 속성은 extra 로 보고 JSON 에 포함)
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    dictConfig 의 "handlers" 로 지정한 핸들러들을 QueueListener 스레드에서 실행
+    (Python 3.12+ dictConfig 가 listener 를 만들어 주고, 첫 emit 때 시작함)
+    """
+
+    listener: QueueListener | None
+
+    def __init__(self, queue: Any) -> None:
+        super().__init__(queue)
+        self.listener = None
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 기본 구현은 여기서 format (스택 트레이스 문자열화) 까지 하므로 override.
+        # 요청 스레드에서만 알 수 있는 값(request id) 만 붙이고 포맷팅은 listener 에 맡김
+        if getattr(record, "request_id", None) is None:
+            record.request_id = current_trace_id()
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not self._started:
+            self._start_listener()
+        super().emit(record)
+
+    def _start_listener(self) -> None:
+        with self._start_lock:
+            if self._started or self.listener is None:
+                return
+            self.listener.start()
+            self._started = True
+
+    def close(self) -> None:
+        # 종료시 logging.shutdown() 에서 호출됨. 큐에 남은 record 를 모두 출력한 뒤 닫음
+        with self._start_lock:
+            if self._started and self.listener is not None:
+                self.listener.stop()
+                self._started = False
+        super().close()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class ExceptionSamplingFilter(logging.Filter):
+    """
+    exception_class 필드가 있는 record 만 대상으로 샘플링/rate limit 적용
+
+    rules 키 우선순위: 예외 클래스 이름 > "4xx"/"5xx" (status 필드 기준) > "default"
+    값: {"sample_rate": 0~1, "rate": 초당 허용 개수, "burst": 순간 허용 개수}
+    """
+
+    DEFAULT_RULE = {"sample_rate": 1.0, "rate": 10.0, "burst": 20.0}
+
+    def __init__(self, rules: dict[str, dict[str, float]] | None = None) -> None:
+        super().__init__()
+        self._rules = rules or {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._suppressed: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _rule(self, exception_class: str, status: int | None) -> dict[str, float]:
+        family = f"{status // 100}xx" if status else None
+        for key in (exception_class, family, "default"):
+            if key in self._rules:
+                return {**self.DEFAULT_RULE, **self._rules[key]}
+        return self.DEFAULT_RULE
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if (exception_class := getattr(record, "exception_class", None)) is None:
+            return True
+        rule = self._rule(exception_class, getattr(record, "status", None))
+        with self._lock:
+            if (bucket := self._buckets.get(exception_class)) is None:
+                bucket = TokenBucket(rule["rate"], rule["burst"])
+                self._buckets[exception_class] = bucket
+            if random.random() >= rule["sample_rate"] or not bucket.take():
+                self._suppressed[exception_class] = (
+                    self._suppressed.get(exception_class, 0) + 1
+                )
+                metrics.LOGS_SUPPRESSED.labels(exception_class).inc()
+                return False
+            record.suppressed = self._suppressed.pop(exception_class, 0)
+        return True
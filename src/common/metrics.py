@@ -0,0 +1,116 @@
+"""
+Prometheus 메트릭 정의
+
+여러 워커 프로세스(gunicorn/uvicorn workers)로 실행할 때는 서버 시작 전에
+PROMETHEUS_MULTIPROC_DIR 환경변수를 비어있는 디렉터리로 지정해야 함.
+각 프로세스가 mmap 파일에 기록하고 /metrics 에서 MultiProcessCollector 로 합산함.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# 대부분 ms 단위 응답이라 기본 버킷보다 촘촘하게 설정
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+VIEW_DURATION = Histogram(
+    "milly_view_duration_seconds",
+    "View latency (middleware 포함)",
+    ["view", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+VIEW_RESPONSES = Counter(
+    "milly_view_responses_total",
+    "View responses by status code",
+    ["view", "method", "status"],
+)
+USECASE_DURATION = Histogram(
+    "milly_usecase_duration_seconds",
+    "Usecase execute latency",
+    ["usecase"],
+    buckets=LATENCY_BUCKETS,
+)
+ADAPTER_DURATION = Histogram(
+    "milly_adapter_duration_seconds",
+    "Persistence adapter method latency",
+    ["method"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "milly_cache_requests_total",
+    "Cache lookups by result (hit/miss/stale)",
+    ["cache", "result"],
+)
+CACHE_COALESCED = Counter(
+    "milly_cache_coalesced_total",
+    "Cache misses served by another request's loader (single-flight, scope=process/cluster)",
+    ["cache", "scope"],
+)
+OPTIMISTIC_LOCK_CONFLICTS = Counter(
+    "milly_optimistic_lock_conflicts_total",
+    "Optimistic lock conflicts (재시도 횟수가 남아있으면 재시도됨)",
+    ["usecase"],
+)
+RETRY_ATTEMPTS = Counter(
+    "milly_retry_attempts_total",
+    "Attempts made under a retry policy (첫 시도 포함)",
+    ["operation"],
+)
+RETRY_GIVE_UPS = Counter(
+    "milly_retry_give_ups_total",
+    "Operations that exhausted their retry attempts",
+    ["operation"],
+)
+LOGS_SUPPRESSED = Counter(
+    "milly_logs_suppressed_total",
+    "Exception logs dropped by sampling / rate limit",
+    ["exception"],
+)
+WINDOW_TRANSITIONS = Counter(
+    "milly_window_transitions_total",
+    "Discount/cupon rows activated or expired by the window scheduler",
+    ["target", "transition"],
+)
+
+ADMISSION_DECISIONS = Counter(
+    "milly_admission_decisions_total",
+    "Admission control decisions (admitted/rejected_rate/rejected_concurrency/error)",
+    ["route", "result"],
+)
+ADMISSION_LIMITS = Gauge(
+    "milly_admission_limit",
+    "Admission limits currently in effect (rate/burst/concurrency_per_key)",
+    ["route", "limit"],
+    multiprocess_mode="mostrecent",
+)
+
+
+def render_latest() -> tuple[bytes, str]:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,82 @@
+import math
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.urls import Resolver404, resolve
+
+from common.admission import Rejection, Slot, get_admission_controller
+from common.exceptions import TooManyRequests
+
+# 조회는 제한하지 않음
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class AdmissionControlMiddleware:
+    """
+    settings.ADMISSION_CONTROL ROUTES 의 쓰기 요청을 view 실행 전에 허용/거절 (common.admission)
+    거절된 요청은 429 + Retry-After 로 바로 응답
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:  # type: ignore[no-untyped-def]
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)  # type: ignore
+        admission = self._acquire(request)
+        if isinstance(admission, Rejection):
+            return self._reject(admission)
+        try:
+            return self.get_response(request)
+        finally:
+            if admission is not None:
+                get_admission_controller().release(admission)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        # Redis 호출이 이벤트 루프를 막지 않도록 스레드에서 실행
+        admission = await sync_to_async(self._acquire, thread_sensitive=False)(request)
+        if isinstance(admission, Rejection):
+            return self._reject(admission)
+        try:
+            return await self.get_response(request)
+        finally:
+            if admission is not None:
+                await sync_to_async(
+                    get_admission_controller().release, thread_sensitive=False
+                )(admission)
+
+    def _acquire(self, request: HttpRequest) -> Slot | Rejection | None:
+        if request.method not in WRITE_METHODS:
+            return None
+        controller = get_admission_controller()
+        if not controller.enabled():
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if (
+            match.url_name is None
+            or (limits := controller.limits(match.url_name)) is None
+        ):
+            return None
+        admission = controller.acquire(
+            match.url_name, match.kwargs.get(limits.key) if limits.key else None
+        )
+        if isinstance(admission, Rejection):
+            # view 를 실행하지 않아도 MetricsMiddleware 가 route 별로 기록하도록
+            request.resolver_match = match
+        return admission
+
+    def _reject(self, rejection: Rejection) -> JsonResponse:
+        response = JsonResponse(
+            {"msg": TooManyRequests.msg, "detail": rejection.reason},
+            status=TooManyRequests.status,
+        )
+        response["Retry-After"] = str(max(1, math.ceil(rejection.retry_after)))
+        return response
@@ -0,0 +1,76 @@
+import math
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.urls import Resolver404, resolve
+
+from common.deadline import deadline_scope
+
+DEFAULT_REQUEST_DEADLINE = {
+    "HEADER": "X-Request-Timeout-Ms",
+    "DEFAULT_MS": None,
+    # 클라이언트가 보낸 값이 너무 커도(작아도) 이 범위를 넘지 않음
+    "MIN_MS": 20,
+    "MAX_MS": 30_000,
+    # url name -> 기본 deadline(ms)
+    "ROUTES": {},
+}
+
+
+class DeadlineMiddleware:
+    """
+    요청 deadline 설정
+    - 헤더(기본 X-Request-Timeout-Ms) 가 있으면 그 값을, 없으면 route 별 기본값을 사용
+    - 남은 시간이 부족하면 재시도를 건너뛰고, DB 쿼리는 남은 시간만큼만 실행됨 (common.deadline)
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:  # type: ignore[no-untyped-def]
+        self.get_response = get_response
+        self.config = {
+            **DEFAULT_REQUEST_DEADLINE,
+            **getattr(settings, "REQUEST_DEADLINE", {}),
+        }
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)  # type: ignore
+        with deadline_scope(self._timeout(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        with deadline_scope(self._timeout(request)):
+            return await self.get_response(request)
+
+    def _timeout(self, request: HttpRequest) -> float | None:
+        timeout_ms: Any = request.headers.get(self.config["HEADER"])
+        if timeout_ms is not None:
+            try:
+                timeout_ms = float(timeout_ms)
+            except ValueError:
+                timeout_ms = None
+        # nan, inf, 0 이하는 잘못된 값으로 보고 무시 (route 기본값 사용)
+        if timeout_ms is not None and not (
+            math.isfinite(timeout_ms) and timeout_ms > 0
+        ):
+            timeout_ms = None
+        if timeout_ms is None:
+            timeout_ms = self._route_default(request)
+        if timeout_ms is None:
+            return None
+        return min(max(timeout_ms, self.config["MIN_MS"]), self.config["MAX_MS"]) / 1000
+
+    def _route_default(self, request: HttpRequest) -> float | None:
+        if not (routes := self.config["ROUTES"]):
+            return self.config["DEFAULT_MS"]
+        try:
+            url_name = resolve(request.path_info).url_name
+        except Resolver404:
+            url_name = None
+        return routes.get(url_name, self.config["DEFAULT_MS"])
@@ -22,7 +22,7 @@ class ExceptionMiddleware:
         self, request: HttpRequest, exception: Exception
     ) -> JsonResponse | None:
         if isinstance(exception, MillyException):
-            logger.exception(exception.msg)
+            self._log(request, exception)
             return JsonResponse(
                 {
                     "msg": exception.msg,
@@ -32,3 +32,19 @@ class ExceptionMiddleware:
             )
         else:
             return None
+
+    def _log(self, request: HttpRequest, exception: MillyException) -> None:
+        # 샘플링/rate limit 은 common.log.ExceptionSamplingFilter (settings.LOGGING) 에서 처리
+        match = request.resolver_match
+        extra = {
+            "exception_class": type(exception).__name__,
+            "status": exception.status,
+            "route": (match.view_name or match.route) if match else None,
+            "method": request.method,
+            "detail": exception.detail,
+        }
+        # 스택 트레이스는 서버 에러(5xx) 에만 남김
+        if exception.status >= 500:
+            logger.error(exception.msg, exc_info=exception, extra=extra)
+        else:
+            logger.warning(exception.msg, extra=extra)
@@ -0,0 +1,44 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest, HttpResponse
+
+from common import metrics
+
+UNMATCHED_VIEW = "unmatched"
+
+
+class MetricsMiddleware:
+    """view(url name) 별 latency 히스토그램과 status 별 응답 수를 기록"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:  # type: ignore[no-untyped-def]
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)  # type: ignore
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, time.perf_counter() - started)
+        return response
+
+    def _observe(
+        self, request: HttpRequest, response: HttpResponse, elapsed: float
+    ) -> None:
+        # url name 을 label 로 사용 (path 를 쓰면 product_id 마다 시계열이 생김)
+        match = request.resolver_match
+        view = (match.view_name or match.route) if match else UNMATCHED_VIEW
+        method = request.method or ""
+        metrics.VIEW_DURATION.labels(view, method).observe(elapsed)
+        metrics.VIEW_RESPONSES.labels(view, method, str(response.status_code)).inc()
@@ -0,0 +1,72 @@
+import json
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from common.query_budget import QueryRecorder, record_queries
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    """
+    요청별 SQL 쿼리 수/DB 시간/반복 쿼리를 기록
+    - DEBUG: X-DB-* 응답 헤더로 노출
+    - 운영: 쿼리가 많거나 반복 쿼리(N+1 의심)가 있으면 구조화 로그로 남김
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:  # type: ignore[no-untyped-def]
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)  # type: ignore
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        self._report(request, response, recorder)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        with record_queries() as recorder:
+            response = await self.get_response(request)
+        self._report(request, response, recorder)
+        return response
+
+    def _report(
+        self, request: HttpRequest, response: HttpResponse, recorder: QueryRecorder
+    ) -> None:
+        duplicates = recorder.duplicates()
+        if settings.DEBUG:
+            response["X-DB-Query-Count"] = str(recorder.count)
+            response["X-DB-Time-Ms"] = f"{recorder.total_time * 1000:.2f}"
+            response["X-DB-Duplicate-Queries"] = str(
+                sum(n - 1 for n in duplicates.values())
+            )
+            response["X-DB-Scopes"] = json.dumps(
+                {scope: int(s["count"]) for scope, s in recorder.by_scope().items()}
+            )
+            return
+
+        threshold = getattr(settings, "DB_QUERY_LOG_THRESHOLD", 10)
+        if recorder.count < threshold and not duplicates:
+            return
+        route = request.resolver_match.route if request.resolver_match else None
+        logger.warning(
+            "db query budget",
+            extra={
+                "route": route,
+                "method": request.method,
+                "status": response.status_code,
+                "query_count": recorder.count,
+                "db_time_ms": round(recorder.total_time * 1000, 2),
+                "by_scope": recorder.by_scope(),
+                "duplicates": duplicates,
+            },
+        )
@@ -0,0 +1,65 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest, HttpResponse
+
+from common import tracing
+
+TRACE_ID_HEADER = "X-Trace-Id"
+
+
+class TracingMiddleware:
+    """
+    요청 단위 root span 생성 (가장 바깥 미들웨어로 등록)
+    - 들어온 traceparent 헤더가 있으면 trace id 를 이어받음
+    - 샘플링 여부와 무관하게 X-Trace-Id 응답 헤더로 trace id 를 돌려줌
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:  # type: ignore[no-untyped-def]
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)  # type: ignore
+        trace_id, root = self._start(request)
+        with root:
+            response = self.get_response(request)
+            self._finish(request, response, root)
+        response[TRACE_ID_HEADER] = trace_id
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        trace_id, root = self._start(request)
+        with root:
+            response = await self.get_response(request)
+            self._finish(request, response, root)
+        response[TRACE_ID_HEADER] = trace_id
+        return response
+
+    def _start(
+        self, request: HttpRequest
+    ) -> tuple[str, tracing.Span | tracing.NoopSpan]:
+        return tracing.start_trace(
+            f"{request.method} {request.path}",
+            request.headers.get(tracing.TRACEPARENT_HEADER),
+            **{"http.method": request.method or ""},
+        )
+
+    def _finish(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        root: tracing.Span | tracing.NoopSpan,
+    ) -> None:
+        if not isinstance(root, tracing.Span):
+            return
+        # path 대신 url name 으로 이름을 바꿔서 trace 검색시 같은 view 끼리 묶이도록 함
+        if match := request.resolver_match:
+            root.name = f"{request.method} {match.view_name or match.route}"
+            root.set_attribute("http.route", match.route)
+        root.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 500:
+            root.status = tracing.STATUS_ERROR
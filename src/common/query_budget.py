@@ -0,0 +1,153 @@
+"""
+요청/어댑터 메서드 단위 SQL 쿼리 기록 (쿼리 수, DB 시간, 반복 쿼리 fingerprint)
+
+- record_queries(): 블록 안에서 실행된 쿼리를 기록 (미들웨어, 테스트에서 사용)
+- query_scope(): 쿼리를 어느 어댑터 메서드에서 실행했는지 표시 (common.instrumentation 에서 사용)
+- assert_query_budget(): 테스트에서 쿼리 예산을 선언하고 초과시 실패
+"""
+
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from common.db_hooks import register_execute_wrapper
+
+UNSCOPED = "-"
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """파라미터/리터럴/IN 목록 길이가 달라도 같은 모양의 쿼리는 같은 값이 되도록 정규화"""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class RecordedQuery:
+    sql: str
+    params: Any
+    duration: float
+    scope: str
+
+    @property
+    def fingerprint(self) -> str:
+        return fingerprint(self.sql)
+
+
+@dataclass
+class QueryRecorder:
+    queries: list[RecordedQuery] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_time(self) -> float:
+        return sum(q.duration for q in self.queries)
+
+    def by_scope(self) -> dict[str, dict[str, float]]:
+        stats: dict[str, dict[str, float]] = {}
+        for query in self.queries:
+            scope = stats.setdefault(query.scope, {"count": 0, "time": 0.0})
+            scope["count"] += 1
+            scope["time"] += query.duration
+        return stats
+
+    def duplicates(self) -> dict[str, int]:
+        """2번 이상 실행된 쿼리 fingerprint (N+1 의심)"""
+        counter = Counter(q.fingerprint for q in self.queries)
+        return {fp: n for fp, n in counter.most_common() if n > 1}
+
+    def filter(self, scope_prefix: str | None) -> "QueryRecorder":
+        if scope_prefix is None:
+            return self
+        return QueryRecorder(
+            [q for q in self.queries if q.scope.startswith(scope_prefix)]
+        )
+
+
+_current_recorder: ContextVar[QueryRecorder | None] = ContextVar(
+    "query_recorder", default=None
+)
+_current_scope: ContextVar[str] = ContextVar("query_scope", default=UNSCOPED)
+
+
+def _record_execute(execute, sql, params, many, context):  # type: ignore[no-untyped-def]
+    if (recorder := _current_recorder.get()) is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.queries.append(
+            RecordedQuery(
+                sql=sql,
+                params=params,
+                duration=time.perf_counter() - started,
+                scope=_current_scope.get(),
+            )
+        )
+
+
+register_execute_wrapper(_record_execute)
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryRecorder]:
+    recorder = QueryRecorder()
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+@contextmanager
+def query_scope(name: str) -> Iterator[None]:
+    token = _current_scope.set(name)
+    try:
+        yield
+    finally:
+        _current_scope.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_query_budget(
+    max_queries: int,
+    scope: str | None = None,
+    allow_duplicates: bool = True,
+) -> Iterator[QueryRecorder]:
+    """
+    with assert_query_budget(3, scope="DjangoORMPersistenceAdapter"):
+        client.get("/commerce/products/")
+    """
+    with record_queries() as recorder:
+        yield recorder
+    recorded = recorder.filter(scope)
+    if recorded.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{recorded.count} queries executed, budget is {max_queries}\n"
+            + "\n".join(f"[{q.scope}] {q.sql}" for q in recorded.queries)
+        )
+    if not allow_duplicates and (duplicates := recorded.duplicates()):
+        raise QueryBudgetExceeded(
+            "repeated queries (N+1?)\n"
+            + "\n".join(f"x{n} {fp}" for fp, n in duplicates.items())
+        )
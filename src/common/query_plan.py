@@ -0,0 +1,71 @@
+"""
+SQL 실행 계획(EXPLAIN) 확인 헬퍼 (쿼리 계획 회귀 테스트에서 사용)
+
+- 기록된 쿼리(common.query_budget.record_queries)를 같은 파라미터로 EXPLAIN 해서 단계별로 반환
+  - SQLite: EXPLAIN QUERY PLAN. "SCAN <table>" 이면 전체 스캔 (인덱스 전체를 읽는 경우 포함)
+  - MySQL: EXPLAIN. type 이 ALL(테이블 전체) / index(인덱스 전체) 이면 전체 스캔
+- SELECT/UPDATE/DELETE 만 대상 (INSERT, SAVEPOINT 등은 계획이 의미 없음)
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from django.db import connections
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|UPDATE|DELETE)\b", re.IGNORECASE)
+_SQLITE_STEP = re.compile(r"^(SCAN|SEARCH) (\S+)")
+_SQLITE_INDEX = re.compile(
+    r"USING (?:COVERING )?INDEX (\S+)|USING (?:INTEGER )?PRIMARY KEY"
+)
+_MYSQL_FULL_SCAN_TYPES = {"ALL", "index"}
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    # 테이블을 읽지 않는 단계(서브쿼리 표시, 정렬용 임시 B-tree 등)는 None
+    table: str | None
+    index: str | None
+    full_scan: bool
+    detail: str
+
+
+def explainable(sql: str) -> bool:
+    return bool(_EXPLAINABLE.match(sql))
+
+
+def explain(sql: str, params: Any = None, using: str = "default") -> list[PlanStep]:
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [_sqlite_step(row[-1]) for row in cursor.fetchall()]
+        if connection.vendor == "mysql":
+            cursor.execute(f"EXPLAIN {sql}", params)
+            columns = [column[0] for column in cursor.description]
+            return [
+                _mysql_step(dict(zip(columns, row, strict=True)))
+                for row in cursor.fetchall()
+            ]
+    raise NotImplementedError(f"EXPLAIN is not supported for {connection.vendor}")
+
+
+def _sqlite_step(detail: str) -> PlanStep:
+    if not (step := _SQLITE_STEP.match(detail)):
+        return PlanStep(table=None, index=None, full_scan=False, detail=detail)
+    operation, table = step.groups()
+    index = None
+    if using := _SQLITE_INDEX.search(detail):
+        index = using.group(1) or "PRIMARY"
+    return PlanStep(
+        table=table, index=index, full_scan=operation == "SCAN", detail=detail
+    )
+
+
+def _mysql_step(row: dict[str, Any]) -> PlanStep:
+    return PlanStep(
+        table=row.get("table"),
+        index=row.get("key"),
+        full_scan=row.get("type") in _MYSQL_FULL_SCAN_TYPES,
+        detail=" ".join(f"{k}={v}" for k, v in row.items() if v is not None),
+    )
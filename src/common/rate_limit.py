@@ -0,0 +1,48 @@
+import math
+import threading
+import time
+
+
+class TokenBucket:
+    """초당 rate 개씩 채워지고 최대 burst 개까지 쌓이는 토큰 버킷 (thread-safe)"""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self) -> bool:
+        """토큰이 있으면 1개 사용하고 True, 없으면 False"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def retry_after(self) -> float:
+        """토큰 1개가 생길 때까지 남은 시간(초). 지금 사용할 수 있으면 0"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                return 0.0
+            return (1 - self._tokens) / self.rate if self.rate > 0 else math.inf
+
+    def wait(self) -> float:
+        """토큰이 생길 때까지 대기 후 1개 사용 (rate > 0 이어야 함). 대기한 시간(초) 반환"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
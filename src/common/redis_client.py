@@ -0,0 +1,12 @@
+from functools import cache
+
+import redis
+from django.conf import settings
+
+
+@cache
+def get_redis() -> redis.Redis | None:
+    """settings.REDIS_URL 의 Redis 클라이언트 (프로세스당 1개, 커넥션 풀 공유). 미설정시 None"""
+    if not (url := getattr(settings, "REDIS_URL", None)):
+        return None
+    return redis.Redis.from_url(url)
@@ -0,0 +1,120 @@
+"""
+경합(conflict) 적응형 재시도 정책
+
+- 대기 시간은 decorrelated jitter (sleep = min(cap, uniform(base, prev * 3))) 로 분산시켜서
+  같은 상품에 몰린 요청들이 같은 타이밍에 다시 충돌하지 않도록 함
+- 키(상품 id) 별 충돌률을 EWMA 로 추적해서 경합이 심한 키는 재시도 횟수를 줄임
+  (이미 경합중인 row 에 재시도를 더 쏟으면 충돌만 늘어남)
+- ASGI 에서는 arun() 을 사용해 asyncio.sleep 으로 대기 (워커 스레드를 붙잡지 않음)
+- 요청 deadline(common.deadline) 까지 남은 시간이 대기 + 한번 더 시도할 시간보다 적으면 재시도하지 않음
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from common import deadline, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ConflictTracker:
+    """키별 충돌률 EWMA (오래 안 쓰인 키부터 버림)"""
+
+    def __init__(self, alpha: float = 0.2, max_keys: int = 10_000) -> None:
+        self._alpha = alpha
+        self._max_keys = max_keys
+        self._rates: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, conflicted: bool) -> None:
+        with self._lock:
+            prev = self._rates.pop(key, 0.0)
+            self._rates[key] = prev + self._alpha * (float(conflicted) - prev)
+            if len(self._rates) > self._max_keys:
+                self._rates.popitem(last=False)
+
+    def rate(self, key: str) -> float:
+        with self._lock:
+            return self._rates.get(key, 0.0)
+
+
+@dataclass
+class RetryPolicy:
+    name: str
+    exceptions: tuple[type[BaseException], ...]
+    max_attempts: int = 5
+    # 충돌률이 1 에 가까운 키도 최소 이만큼은 시도
+    min_attempts: int = 2
+    base_delay: float = 0.01
+    max_delay: float = 0.2
+    # 한번 시도하는데 드는 예상 시간 (deadline 이 이보다 적게 남았으면 재시도 안함)
+    min_attempt_time: float = 0.05
+    tracker: ConflictTracker = field(default_factory=ConflictTracker)
+
+    def attempts_for(self, key: str) -> int:
+        rate = self.tracker.rate(key)
+        span = self.max_attempts - self.min_attempts
+        return self.min_attempts + round(span * (1.0 - rate))
+
+    def next_delay(self, prev: float) -> float:
+        return min(self.max_delay, random.uniform(self.base_delay, prev * 3))
+
+    def run[T](self, key: str, func: Callable[[], T]) -> T:
+        attempts = self.attempts_for(key)
+        delay = self.base_delay
+        for attempt in range(1, attempts + 1):
+            deadline.check(self.name)
+            metrics.RETRY_ATTEMPTS.labels(self.name).inc()
+            try:
+                result = func()
+            except self.exceptions:
+                delay = self.next_delay(delay)
+                self._on_conflict(key, attempt, attempts, delay)
+                time.sleep(delay)
+                continue
+            self.tracker.observe(key, conflicted=False)
+            return result
+        raise AssertionError("unreachable")
+
+    async def arun[T](self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        attempts = self.attempts_for(key)
+        delay = self.base_delay
+        for attempt in range(1, attempts + 1):
+            deadline.check(self.name)
+            metrics.RETRY_ATTEMPTS.labels(self.name).inc()
+            try:
+                result = await func()
+            except self.exceptions:
+                delay = self.next_delay(delay)
+                self._on_conflict(key, attempt, attempts, delay)
+                await asyncio.sleep(delay)
+                continue
+            self.tracker.observe(key, conflicted=False)
+            return result
+        raise AssertionError("unreachable")
+
+    def _on_conflict(self, key: str, attempt: int, attempts: int, delay: float) -> None:
+        """더 재시도할 수 없으면 예외를 그대로 다시 던짐 (except 블록 안에서 호출)"""
+        self.tracker.observe(key, conflicted=True)
+        out_of_time = not deadline.has_budget(delay + self.min_attempt_time)
+        if attempt < attempts and not out_of_time:
+            return
+        metrics.RETRY_GIVE_UPS.labels(self.name).inc()
+        # 상품 id 는 label 로 쓰면 시계열이 무한히 늘어나므로 로그로 남김
+        logger.warning(
+            "retry give up",
+            extra={
+                "operation": self.name,
+                "key": key,
+                "attempts": attempt,
+                "out_of_time": out_of_time,
+                "conflict_rate": round(self.tracker.rate(key), 3),
+            },
+        )
+        raise
@@ -49,7 +49,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "common.middlewares.tracing_middleware.TracingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "common.middlewares.metrics_middleware.MetricsMiddleware",
+    "common.middlewares.admission_middleware.AdmissionControlMiddleware",
+    "common.middlewares.deadline_middleware.DeadlineMiddleware",
+    "common.middlewares.query_budget_middleware.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -130,18 +135,142 @@ USE_TZ = True
 # Redis Cache Configuration
 # https://docs.djangoproject.com/en/5.2/topics/cache/
 
+REDIS_URL: str | None = "redis://redis:6379/0"
+
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.redis.RedisCache",
-        "LOCATION": "redis://redis:6379/0",
-        "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
-        },
+        "LOCATION": REDIS_URL,
         "KEY_PREFIX": "milly",
         "TIMEOUT": 300,
     }
 }
 
+# 상품 상세/목록 캐시 TTL(초) (commerce.adapter.persistence.cache)
+PRODUCT_CACHE = {
+    "DETAIL_TTL": 300,
+    "LISTING_TTL": 30,
+    "DETAIL_STALE_TTL": 300,
+    "LISTING_STALE_TTL": 60,
+}
+
+# 요청당 쿼리 수가 이 값 이상이거나 반복 쿼리가 있으면 로그로 남김 (DEBUG 에서는 X-DB-* 헤더)
+DB_QUERY_LOG_THRESHOLD = 10
+
+# 로그는 JSON 한 줄씩, 포맷팅/출력은 큐 listener 스레드에서 처리 (common.log)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "common.log.JsonFormatter"},
+    },
+    "filters": {
+        # 예외 클래스별 샘플링/초당 허용량. 잦은 클라이언트 에러(4xx)는 일부만 기록
+        "exception_sampling": {
+            "()": "common.log.ExceptionSamplingFilter",
+            "rules": {
+                "4xx": {"sample_rate": 0.1, "rate": 5, "burst": 10},
+                "5xx": {"sample_rate": 1.0, "rate": 20, "burst": 50},
+            },
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "json",
+        },
+        "queue": {
+            "class": "common.log.AsyncQueueHandler",
+            "handlers": ["console"],
+        },
+    },
+    "loggers": {
+        "common.middlewares.exception_middleware": {
+            "filters": ["exception_sampling"],
+        },
+    },
+    "root": {
+        "handlers": ["queue"],
+        "level": "INFO",
+    },
+}
+
+# 재고 변경 SSE 스트림 (commerce.adapter.stream.stock_broker)
+STOCK_STREAM = {
+    "CHANNEL": "milly:stock",
+    "HEARTBEAT_SECONDS": 15.0,
+    "MAX_PRODUCTS": 100,
+    "MAX_SUBSCRIBERS": 50_000,
+}
+
+# 쓰기 경로 admission control (common.admission)
+# 넘치는 요청은 view 실행 전에 429 + Retry-After, 한도는 admission_limits 명령으로 런타임에 변경
+ADMISSION_CONTROL = {
+    "RELOAD_SECONDS": 5,
+    "ROUTES": {
+        "update-product-stock": {
+            "RATE": 500,
+            "BURST": 1_000,
+            # 한 상품의 재고 version 체인은 직렬로만 쓸 수 있으므로 상품별 동시 실행 수 제한
+            "CONCURRENCY_PER_KEY": 4,
+            "KEY": "product_id",
+        },
+    },
+}
+
+# 쓰기 요청 중복 실행 방지 (common.idempotency)
+IDEMPOTENCY = {
+    "HEADER": "Idempotency-Key",
+    "TTL_SECONDS": 24 * 60 * 60,
+    "LOCK_SECONDS": 30,
+    "WAIT_SECONDS": 10,
+}
+
+# 주문 진행 중 재고 홀드 (commerce.adapter.reservation)
+# 확정된 예약은 reconcile_stock_reservations 명령이 재고 이벤트로 기록
+STOCK_RESERVATION = {
+    "TTL_SECONDS": 600,
+    "KEY_PREFIX": "milly:{stock}",
+    "CLAIM_LEASE_SECONDS": 60,
+}
+
+# 재고 이력 조회 (commerce.adapter.persistence.django_orm)
+# 읽기 replica 가 있으면 DB_ALIAS 로 지정해서 재고 쓰기와 같은 DB 를 쓰지 않도록 함
+STOCK_HISTORY = {
+    "DB_ALIAS": "default",
+    "PAGE_SIZE": 100,
+    "MAX_PAGE_SIZE": 1_000,
+    "STREAM_CHUNK_SIZE": 1_000,
+}
+
+# 요청 deadline (common.deadline)
+# X-Request-Timeout-Ms 헤더가 없으면 route(url name) 별 기본값, 그것도 없으면 DEFAULT_MS 사용
+REQUEST_DEADLINE = {
+    "HEADER": "X-Request-Timeout-Ms",
+    "DEFAULT_MS": 5_000,
+    "MIN_MS": 20,
+    "MAX_MS": 30_000,
+    "ROUTES": {
+        "products": 3_000,
+        "get-product-detail": 2_000,
+        "get-product-details": 2_000,
+        "quote-checkout": 2_000,
+        "reserve-stock": 2_000,
+        "update-product-stock": 2_000,
+        # 상품 수에 비례해서 오래 걸리는 일괄 작업
+        "bulk-upsert-product-discount": 30_000,
+    },
+}
+
+# 요청 트레이싱 (common.tracing)
+# 샘플링된 요청만 span 을 기록하고 EXPORT_PATH 에 OTLP JSON lines 로 남김
+TRACING = {
+    "SAMPLE_RATE": 0.01,
+    "RESPECT_PARENT_SAMPLED": True,
+    "EXPORT_PATH": str(BASE_DIR.parent / "traces.jsonl"),
+    "SERVICE_NAME": "milly",
+}
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
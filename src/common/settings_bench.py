@@ -0,0 +1,26 @@
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR
+
+# 로컬 부하 테스트용 설정 (MySQL/Redis 없이 SQLite 파일 + 로컬 메모리 캐시 사용)
+# 로컬 MySQL 로 측정하려면 common.settings 를 그대로 사용하면 됨
+DEBUG = False
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": str(BASE_DIR.parent / "bench.sqlite3"),
+        "OPTIONS": {
+            # 동시 쓰기시 database is locked 에러를 줄이기 위해 대기 시간을 늘림
+            "timeout": 20,
+        },
+    }
+}
+
+REDIS_URL = None
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "KEY_PREFIX": "milly",
+        "TIMEOUT": 300,
+    }
+}
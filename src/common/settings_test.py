@@ -12,6 +12,18 @@ DATABASES = {
     },
 }
 
+# 테스트는 Redis 없이 프로세스 메모리 캐시 사용
+REDIS_URL = None
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "KEY_PREFIX": "milly",
+    }
+}
+
+# 테스트에서는 명시적으로 켠 경우에만 trace 를 기록
+TRACING = {**TRACING, "SAMPLE_RATE": 0.0, "EXPORT_PATH": None}  # noqa: F405
+
 # 테스트 설정 파일이 로드되었음을 확인하는 변수
 TEST_SETTINGS_LOADED = True
 print("🧪 TEST SETTINGS LOADED: Using settings.test.py")
@@ -0,0 +1,303 @@
+"""
+경량 요청 트레이싱 (web -> usecase -> service/adapter -> DB query, cache)
+
+- 진입점(TracingMiddleware)에서 W3C traceparent 헤더의 trace id 를 이어받고 샘플링 여부를 결정
+- 샘플링된 요청만 Span 을 만들고, 아닌 경우 start_span() 은 contextvar 1회 조회 후 no-op 을 반환
+- 요청이 끝나면 OTLP JSON(ResourceSpans) 형식으로 파일에 한줄씩 기록
+  (OpenTelemetry Collector 의 otlpjsonfile receiver 로 그대로 수집 가능)
+"""
+
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any
+
+from django.conf import settings
+
+from common.db_hooks import register_execute_wrapper
+
+WEB = "web"
+USECASE = "usecase"
+SERVICE = "service"
+ADAPTER = "adapter"
+DB = "db"
+CACHE = "cache"
+
+# OTLP SpanKind
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP StatusCode
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_MAX_STATEMENT_LENGTH = 1000
+
+DEFAULT_TRACING = {
+    "SAMPLE_RATE": 0.0,
+    # 상위 서비스에서 샘플링된(flags=01) 요청은 SAMPLE_RATE 와 무관하게 샘플링
+    "RESPECT_PARENT_SAMPLED": True,
+    "EXPORT_PATH": None,
+    "SERVICE_NAME": "milly",
+}
+
+
+def tracing_settings() -> dict[str, Any]:
+    return {**DEFAULT_TRACING, **getattr(settings, "TRACING", {})}
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    spans: list["Span"] = field(default_factory=list)
+
+
+@dataclass(eq=False)
+class Span:
+    trace: Trace
+    name: str
+    layer: str
+    span_id: str
+    parent_id: str | None
+    kind: int = SPAN_KIND_INTERNAL
+    attributes: dict[str, Any] = field(default_factory=dict)
+    is_local_root: bool = False
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    status: int = STATUS_UNSET
+    status_message: str = ""
+    _token: Token | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        self.trace.spans.append(self)
+        if self.is_local_root:
+            export(self.trace)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc is not None:
+            self.record_error(exc)
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        self.end()
+
+
+class NoopSpan:
+    """샘플링되지 않은 요청에서 사용하는 span (아무것도 기록하지 않음)"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "NoopSpan":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_current_trace_id: ContextVar[str | None] = ContextVar("trace_id", default=None)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def current_trace_id() -> str | None:
+    """샘플링 여부와 무관한 현재 요청의 trace id (로그 연계용)"""
+    return _current_trace_id.get()
+
+
+def _new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+def start_span(
+    name: str, layer: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any
+) -> Span | NoopSpan:
+    if (parent := _current_span.get()) is None:
+        return NOOP_SPAN
+    return Span(
+        trace=parent.trace,
+        name=name,
+        layer=layer,
+        span_id=_new_span_id(),
+        parent_id=parent.span_id,
+        kind=kind,
+        attributes=attributes,
+    )
+
+
+class use_span:
+    """이미 만든 span 을 현재 span 으로 지정 (제너레이터처럼 여러 구간에 걸친 span 용)"""
+
+    def __init__(self, span: Span | NoopSpan) -> None:
+        self._span = span
+        self._token: Token | None = None
+
+    def __enter__(self) -> None:
+        if isinstance(self._span, Span):
+            self._token = _current_span.set(self._span)
+
+    def __exit__(self, *args: Any) -> None:
+        if self._token is not None:
+            _current_span.reset(self._token)
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    """traceparent 헤더 -> (trace_id, parent span_id, sampled)"""
+    if not header or not (match := _TRACEPARENT.match(header.strip().lower())):
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def start_trace(
+    name: str, traceparent: str | None = None, **attributes: Any
+) -> tuple[str, Span | NoopSpan]:
+    """요청 진입점에서 호출. (trace_id, root span) 반환, 샘플링되지 않으면 root 는 no-op"""
+    config = tracing_settings()
+    trace_id, parent_id = secrets.token_hex(16), None
+    parent_sampled = False
+    if parsed := parse_traceparent(traceparent):
+        trace_id, parent_id, parent_sampled = parsed
+    _current_trace_id.set(trace_id)
+
+    sampled = (parent_sampled and config["RESPECT_PARENT_SAMPLED"]) or (
+        random.random() < config["SAMPLE_RATE"]
+    )
+    if not sampled:
+        return trace_id, NOOP_SPAN
+    return trace_id, Span(
+        trace=Trace(trace_id),
+        name=name,
+        layer=WEB,
+        span_id=_new_span_id(),
+        parent_id=parent_id,
+        kind=SPAN_KIND_SERVER,
+        attributes=attributes,
+        is_local_root=True,
+    )
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    data: dict[str, Any] = {
+        "traceId": span.trace.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [
+            {"key": key, "value": _otlp_value(value)}
+            for key, value in {"milly.layer": span.layer, **span.attributes}.items()
+        ],
+        "status": {"code": span.status},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    if span.status_message:
+        data["status"]["message"] = span.status_message
+    return data
+
+
+def to_otlp_json(trace: Trace) -> dict[str, Any]:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {
+                            "key": "service.name",
+                            "value": {
+                                "stringValue": tracing_settings()["SERVICE_NAME"]
+                            },
+                        }
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "common.tracing"},
+                        "spans": [_otlp_span(span) for span in trace.spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+_export_lock = threading.Lock()
+
+
+def export(trace: Trace) -> None:
+    if not (path := tracing_settings()["EXPORT_PATH"]):
+        return
+    line = json.dumps(to_otlp_json(trace), ensure_ascii=False)
+    with _export_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def _trace_execute(execute, sql, params, many, context):  # type: ignore[no-untyped-def]
+    if _current_span.get() is None:
+        return execute(sql, params, many, context)
+    with start_span(
+        "db.query",
+        DB,
+        kind=SPAN_KIND_CLIENT,
+        **{
+            "db.system": context["connection"].vendor,
+            "db.statement": sql[:_MAX_STATEMENT_LENGTH],
+        },
+    ):
+        return execute(sql, params, many, context)
+
+
+register_execute_wrapper(_trace_execute)
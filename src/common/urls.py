@@ -18,7 +18,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from common.views import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("commerce/", include("commerce.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -0,0 +1,11 @@
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.http import require_http_methods
+
+from common.metrics import render_latest
+
+
+@require_http_methods(["GET"])
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Prometheus text format 메트릭 (내부망에서만 접근 가능하도록 LB 에서 막아야 함)"""
+    body, content_type = render_latest()
+    return HttpResponse(body, content_type=content_type)
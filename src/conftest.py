@@ -1,8 +1,33 @@
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.db import transaction
 from django.test import Client
 
+from commerce.adapter.persistence.cache.access_stats import access_stats
+from commerce.adapter.reservation.stock_reservation_store import (
+    InMemoryStockReservationStore,
+    get_stock_reservation_store,
+)
+from common.admission import InMemoryAdmissionBackend, get_admission_controller
+from common.query_budget import assert_query_budget
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """테스트간 캐시/조회수 집계/재고 홀드/admission 한도가 공유되지 않도록 비움"""
+    cache.clear()
+    access_stats.clear()
+    if isinstance(
+        store := get_stock_reservation_store(), InMemoryStockReservationStore
+    ):
+        store.clear()
+    controller = get_admission_controller()
+    if isinstance(controller.backend, InMemoryAdmissionBackend):
+        controller.backend.clear()
+    controller.reload()
+    yield
+
 
 @pytest.fixture
 def api_client():
@@ -27,3 +52,9 @@ def authed_client(api_client, test_user):
     """인증된 클라이언트"""
     api_client.force_login(test_user)
     return api_client
+
+
+@pytest.fixture
+def query_budget():
+    """엔드포인트별 쿼리 예산 선언, 초과하면 실패 (common.query_budget.assert_query_budget)"""
+    return assert_query_budget